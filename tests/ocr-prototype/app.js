@@ -220,11 +220,11 @@ class OCRTester {
 
         while (attempts < maxAttempts) {
             try {
-                const statusResponse = await fetch(`${this.apiBaseUrl}/api/status/${processId}`);
+                const statusResponse = await fetch(`${this.apiBaseUrl}/api/status/${processId}?fields=status,error`);
                 const statusData = await statusResponse.json();
 
                 if (statusData.status === 'completed') {
-                    const resultResponse = await fetch(`${this.apiBaseUrl}/api/result/${processId}`);
+                    const resultResponse = await fetch(`${this.apiBaseUrl}/api/result/${processId}?fields=text,confidence,error`);
                     return await resultResponse.json();
                 } else if (statusData.status === 'failed') {
                     throw new Error(statusData.error || 'Processing failed');
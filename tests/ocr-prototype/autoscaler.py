@@ -0,0 +1,194 @@
+"""
+Autoscaler Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Grows and shrinks an OCR worker pool between configured bounds.
+
+Every AUTOSCALE_INTERVAL seconds the autoscaler samples the pool (queued
+jobs, how long the oldest one has waited, busy workers) and host CPU
+utilisation:
+- Scale up when queued jobs exceed AUTOSCALE_QUEUE_PER_WORKER per worker,
+  or the oldest queued job has waited AUTOSCALE_WAIT_UP_SECONDS. The pool
+  grows by the excess queue, not one worker at a time. Growth is blocked
+  while host CPU is above AUTOSCALE_CPU_HIGH, since more threads would
+  only slow down the jobs already running.
+- Scale down by one worker when nothing is queued and some workers are
+  idle.
+
+Hysteresis keeps the pool from flapping. A condition has to hold for
+several consecutive samples (more for shrinking than for growing), and
+no change is made within AUTOSCALE_COOLDOWN seconds of the last one.
+
+Pools implement load() -> {'workers', 'busy', 'queued', 'oldest_wait'}
+and resize(workers). Every decision is logged and counted in
+ocr_autoscale_decisions_total.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CpuSampler:
+    """Host CPU utilisation (0-1) since the previous sample"""
+
+    def __init__(self, stat_path: str = '/proc/stat'):
+        self.stat_path = stat_path
+        self._last = self._read_stat()
+
+    def _read_stat(self):
+        try:
+            with open(self.stat_path, 'r') as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        return sum(fields), idle
+
+    def sample(self) -> Optional[float]:
+        """Utilisation from /proc/stat, else load average per CPU; None when neither is available"""
+        current = self._read_stat()
+        if current and self._last:
+            total = current[0] - self._last[0]
+            idle = current[1] - self._last[1]
+            self._last = current
+            if total > 0:
+                return max(0.0, min(1.0, 1 - idle / total))
+            return None
+        try:
+            return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+        except (AttributeError, OSError):
+            return None
+
+
+class Autoscaler:
+    """Resizes one pool from its load and host CPU, with hysteresis"""
+
+    def __init__(self, name: str, pool, min_workers: int, max_workers: int, interval: float = 5,
+                 queue_per_worker: float = 2, wait_up_seconds: float = 10, cpu_high: float = 0.85,
+                 up_samples: int = 2, down_samples: int = 6, cooldown: float = 30,
+                 cpu_sampler: CpuSampler = None):
+        """
+        Args:
+            name: Pool name used in logs and metric labels
+            pool: Object with load() and resize(workers)
+            min_workers, max_workers: Bounds for the pool size
+            interval: Seconds between samples
+            queue_per_worker: Queued jobs per worker above which the pool grows
+            wait_up_seconds: Oldest queued job wait above which the pool grows
+            cpu_high: Host CPU utilisation (0-1) above which the pool does not grow
+            up_samples, down_samples: Consecutive samples a condition must hold
+            cooldown: Seconds after a change before the next one
+        """
+        if min_workers < 1 or max_workers < min_workers:
+            raise ValueError(f"Invalid autoscale bounds: min={min_workers}, max={max_workers}")
+        self.name = name
+        self.pool = pool
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.interval = interval
+        self.queue_per_worker = queue_per_worker
+        self.wait_up_seconds = wait_up_seconds
+        self.cpu_high = cpu_high
+        self.up_samples = max(1, up_samples)
+        self.down_samples = max(1, down_samples)
+        self.cooldown = cooldown
+        self.cpu_sampler = cpu_sampler or CpuSampler()
+        self.decisions = deque(maxlen=20)
+        self._up_streak = 0
+        self._down_streak = 0
+        self._last_change = float('-inf')
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # Start inside the bounds
+        workers = self.pool.load()['workers']
+        bounded = max(min_workers, min(max_workers, workers))
+        if bounded != workers:
+            self.pool.resize(bounded)
+        metrics.POOL_WORKERS.set(bounded, pool=name)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f'autoscale-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.step()
+            except Exception as e:
+                logger.error("Autoscaler %s failed to sample: %s", self.name, e)
+
+    def step(self, now: float = None) -> Optional[Dict[str, Any]]:
+        """Take one sample and resize if warranted; returns the decision, if any"""
+        now = time.monotonic() if now is None else now
+        load = self.pool.load()
+        cpu = self.cpu_sampler.sample()
+        if cpu is not None:
+            metrics.HOST_CPU_UTILIZATION.set(round(cpu, 3))
+
+        workers, queued, oldest_wait = load['workers'], load['queued'], load['oldest_wait'] or 0.0
+        if queued > workers * self.queue_per_worker:
+            grow_reason = 'queue_depth'
+        elif queued and oldest_wait >= self.wait_up_seconds:
+            grow_reason = 'queue_wait'
+        else:
+            grow_reason = None
+        if grow_reason and cpu is not None and cpu >= self.cpu_high:
+            logger.debug("Autoscaler %s: %s but CPU at %.0f%%; not growing", self.name, grow_reason, cpu * 100)
+            grow_reason = None
+        shrink = not queued and load['busy'] < workers
+
+        self._up_streak = self._up_streak + 1 if grow_reason else 0
+        self._down_streak = self._down_streak + 1 if shrink else 0
+        if now - self._last_change < self.cooldown:
+            return None
+
+        if grow_reason and self._up_streak >= self.up_samples and workers < self.max_workers:
+            excess = max(1, -(-(queued - workers * self.queue_per_worker) // self.queue_per_worker))
+            target, direction, reason = min(self.max_workers, workers + int(excess)), 'up', grow_reason
+        elif self._down_streak >= self.down_samples and workers > self.min_workers:
+            target, direction, reason = workers - 1, 'down', 'idle'
+        else:
+            return None
+
+        self.pool.resize(target)
+        self._last_change = now
+        self._up_streak = self._down_streak = 0
+        decision = {
+            'at': time.time(),
+            'direction': direction,
+            'reason': reason,
+            'from': workers,
+            'to': target,
+            'queued': queued,
+            'oldest_wait': round(oldest_wait, 2),
+            'busy': load['busy'],
+            'cpu': None if cpu is None else round(cpu, 3)
+        }
+        self.decisions.append(decision)
+        metrics.POOL_WORKERS.set(target, pool=self.name)
+        metrics.AUTOSCALE_DECISIONS.inc(pool=self.name, direction=direction, reason=reason)
+        logger.info("Autoscaler %s: %s -> %s workers (%s; queued=%s, oldest_wait=%.1fs, busy=%s, cpu=%s)",
+                    self.name, workers, target, reason, queued, oldest_wait, load['busy'],
+                    'n/a' if cpu is None else f'{cpu:.0%}')
+        return decision
+
+    def status(self) -> Dict[str, Any]:
+        """Bounds and recent decisions for health and debug endpoints"""
+        return {
+            'min_workers': self.min_workers,
+            'max_workers': self.max_workers,
+            'decisions': list(self.decisions)
+        }
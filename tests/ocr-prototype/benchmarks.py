@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark Suite for OCR Testing Backend
+Times FileHandler and OCRServices hot paths and stores results as JSON
+
+Usage:
+    python benchmarks.py                          # run everything
+    python benchmarks.py --filter pdf             # only benchmarks whose name contains 'pdf'
+    python benchmarks.py --compare benchmark-results/<old>.json
+
+Each run is written to benchmark-results/<timestamp>-<commit>.json so runs
+can be compared across commits.
+"""
+
+import io
+import os
+import atexit
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageDraw
+from werkzeug.datastructures import FileStorage
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from file_handler import FileHandler
+from rasterizer import Rasterizer
+from ocr_services import parse_tesseract_data
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark-results')
+
+
+def create_test_image(size=(1240, 1754), lines: int = 40) -> Image.Image:
+    """Create a bill-like page image"""
+    img = Image.new('RGB', size, color='white')
+    draw = ImageDraw.Draw(img)
+    for i in range(lines):
+        draw.text((40, 40 + i * 40), f"LINE {i + 1}  Account 123456789  Amount RM {i * 3}.50", fill='black')
+    return img
+
+
+def create_test_png(size=(1240, 1754)) -> bytes:
+    buffer = io.BytesIO()
+    create_test_image(size).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def create_test_pdf(path: str, pages: int):
+    """Create a multi-page PDF with Pillow (no reportlab needed)"""
+    images = [create_test_image() for _ in range(pages)]
+    images[0].save(path, 'PDF', resolution=150, save_all=True, append_images=images[1:])
+
+
+def fake_tesseract_data(words: int) -> Dict[str, List]:
+    """Build pytesseract image_to_data output with blank separator rows"""
+    data = {'text': [], 'conf': []}
+    for i in range(words):
+        if i % 8 == 0:
+            data['text'].append('')
+            data['conf'].append('-1')
+        data['text'].append(f"word{i}")
+        data['conf'].append(str(random.randint(40, 99)))
+    return data
+
+
+def run_benchmark(name: str, function: Callable, iterations: int, warmup: int = 1,
+                  setup: Optional[Callable] = None) -> Dict:
+    """Time function() over several iterations, with optional per-iteration setup"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        function()
+
+    timings = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    ordered = sorted(timings)
+    mean = statistics.mean(timings)
+    return {
+        'name': name,
+        'iterations': iterations,
+        'mean_ms': round(mean * 1000, 4),
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'p95_ms': round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 4),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'stdev_ms': round(statistics.stdev(timings) * 1000, 4) if len(timings) > 1 else 0.0,
+        'ops_per_sec': round(1.0 / mean, 2) if mean else None
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def build_benchmarks(workdir: str, quick: bool) -> List[Dict]:
+    """Define the benchmark cases"""
+    handler = FileHandler(workdir)
+    png_bytes = create_test_png()
+    cases = []
+
+    # save_file
+    counter = {'n': 0}
+
+    def save_file():
+        counter['n'] += 1
+        storage = FileStorage(stream=io.BytesIO(png_bytes), filename='bill.png')
+        handler.save_file(storage, f"bench-{counter['n']}")
+
+    cases.append({'name': 'file_handler.save_file[png 1240x1754]', 'function': save_file, 'iterations': 50})
+
+    # file_exists / get_file_path for present and missing ids
+    existing_id = 'bench-lookup'
+    with open(os.path.join(workdir, f"{existing_id}.png"), 'wb') as f:
+        f.write(png_bytes)
+    cases.append({'name': 'file_handler.file_exists[hit]',
+                  'function': lambda: handler.file_exists(existing_id), 'iterations': 2000})
+    cases.append({'name': 'file_handler.file_exists[miss]',
+                  'function': lambda: handler.file_exists('missing-id'), 'iterations': 2000})
+    cases.append({'name': 'file_handler.get_file_path[hit]',
+                  'function': lambda: handler.get_file_path(existing_id), 'iterations': 2000})
+
+    # get_file_info for image and PDF
+    image_path = os.path.join(workdir, f"{existing_id}.png")
+    cases.append({'name': 'file_handler.get_file_info[png]',
+                  'function': lambda: handler.get_file_info(image_path), 'iterations': 500})
+
+    pdf_pages = [1, 5] if quick else [1, 5, 20]
+    pdf_paths = {}
+    for pages in pdf_pages:
+        pdf_paths[pages] = os.path.join(workdir, f"doc-{pages}p.pdf")
+        create_test_pdf(pdf_paths[pages], pages)
+    cases.append({'name': 'file_handler.get_file_info[pdf]',
+                  'function': lambda: handler.get_file_info(pdf_paths[1]), 'iterations': 500})
+
+    # convert_pdf_to_images across DPI and page count
+    if shutil.which('pdftoppm'):
+        for pages in pdf_pages:
+            for dpi in ([100, 200] if quick else [100, 200, 300]):
+                path = pdf_paths[pages]
+                cases.append({
+                    'name': f'file_handler.convert_pdf_to_images[{pages}p@{dpi}dpi]',
+                    'function': lambda path=path, dpi=dpi: handler.convert_pdf_to_images(path, dpi=dpi),
+                    'iterations': 3
+                })
+        
+        # Rasterizer backends against the single-call path
+        backends = {
+            'single/png': Rasterizer('single'),
+            'parallel/ppm': Rasterizer('parallel', fmt='ppm'),
+            'parallel/pgm': Rasterizer('parallel', fmt='ppm', grayscale=True),
+            'parallel/png': Rasterizer('parallel', fmt='png')
+        }
+        raster_folder = os.path.join(workdir, 'raster')
+        os.makedirs(raster_folder, exist_ok=True)
+        # Page buffers: the same render into shared memory instead of the work folder
+        shm_folder = tempfile.mkdtemp(prefix='sme-bench-', dir='/dev/shm') if os.path.isdir('/dev/shm') else None
+        if shm_folder:
+            atexit.register(shutil.rmtree, shm_folder, True)
+        
+        def render_and_clean(backend, path, pages, folder=raster_folder):
+            for page_path in backend.render(path, folder, 200, pages, handler.get_page_points(path)):
+                os.remove(page_path)
+        
+        for pages in pdf_pages:
+            for name, backend in backends.items():
+                cases.append({
+                    'name': f'rasterizer[{name}][{pages}p@200dpi]',
+                    'function': lambda backend=backend, pages=pages: render_and_clean(backend, pdf_paths[pages], pages),
+                    'iterations': 3
+                })
+            if shm_folder:
+                backend = backends['parallel/ppm']
+                cases.append({
+                    'name': f'rasterizer[parallel/ppm->shm][{pages}p@200dpi]',
+                    'function': lambda backend=backend, pages=pages: render_and_clean(
+                        backend, pdf_paths[pages], pages, shm_folder),
+                    'iterations': 3
+                })
+    else:
+        cases.append({'name': 'file_handler.convert_pdf_to_images', 'skipped': 'pdftoppm (poppler) not installed'})
+        cases.append({'name': 'rasterizer', 'skipped': 'pdftoppm (poppler) not installed'})
+
+    # Tesseract output parsing
+    for words in (200, 2000):
+        data = fake_tesseract_data(words)
+        cases.append({'name': f'ocr_services.parse_tesseract_data[{words} words]',
+                      'function': lambda data=data: parse_tesseract_data(data), 'iterations': 500})
+
+    # Result serialization (job record as returned by /api/result)
+    for pages in (1, 50):
+        record = {
+            'file_id': 'f' * 36, 'service': 'tesseract', 'status': 'success',
+            'created_at': datetime.utcnow().isoformat(), 'processing_time': 1.23,
+            'text': '\n\n'.join(' '.join(f"word{i}" for i in range(300)) for _ in range(pages)),
+            'confidence': 0.91, 'error': None, 'words_found': 300 * pages, 'pages_processed': pages,
+            'file_info': handler.get_file_info(image_path)
+        }
+        cases.append({'name': f'result.json_dumps[{pages}p]',
+                      'function': lambda record=record: json.dumps(record), 'iterations': 200})
+
+    return cases
+
+
+def compare(current: Dict, baseline_path: str):
+    """Print median ratios against an earlier run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {r['name']: r for r in baseline['results'] if 'median_ms' in r}
+
+    print(f"\n📈 Compared with {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for result in current['results']:
+        old = previous.get(result['name'])
+        if not old or 'median_ms' not in result:
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else float('inf')
+        marker = '🔴' if ratio > 1.1 else ('🟢' if ratio < 0.9 else '⚪')
+        print(f"   {marker} {result['name']:<55} {old['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run FileHandler/OCRServices micro-benchmarks')
+    parser.add_argument('--filter', help='Only run benchmarks whose name contains this string')
+    parser.add_argument('--quick', action='store_true', help='Fewer PDF sizes and DPIs')
+    parser.add_argument('--output', help='Result file (default: benchmark-results/<timestamp>-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier result file to compare against')
+    args = parser.parse_args()
+
+    print("⏱️  OCR Backend Micro-Benchmarks")
+    print("=" * 78)
+
+    workdir = tempfile.mkdtemp(prefix='sme-bench-')
+    results = []
+    try:
+        for case in build_benchmarks(workdir, args.quick):
+            if args.filter and args.filter not in case['name']:
+                continue
+            if 'skipped' in case:
+                print(f"   ⏭️  {case['name']}: skipped ({case['skipped']})")
+                results.append({'name': case['name'], 'skipped': case['skipped']})
+                continue
+            result = run_benchmark(case['name'], case['function'], case['iterations'])
+            results.append(result)
+            print(f"   {result['name']:<55} median {result['median_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    run = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{commit}.json")
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n📁 Results written to {output}")
+
+    if args.compare:
+        compare(run, args.compare)
+
+
+if __name__ == '__main__':
+    main()
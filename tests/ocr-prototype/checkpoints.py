@@ -0,0 +1,236 @@
+"""
+Checkpoints Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Page-level checkpoints for resumable OCR jobs.
+
+Every finished page is appended to a JSON lines file per (file, engine) as
+soon as its batch completes, so a job that fails or is interrupted on page
+38 of 40 keeps the 37 pages already done. Processing the same file with
+the same engine again (a retry, or a new request after a restart) restores
+those pages and only sends the rest to the engine. Pages that fail are not
+checkpointed and are retried next time.
+
+A checkpoint is tied to the file's size and modification time and is
+deleted once a job finishes with every page done.
+
+Each job gets a PageJournal that tracks per-page state
+(pending/processing/done/failed) and reports it to the job record. The
+journal also keeps an ordered event log (engine switches, finished and
+failed pages) that streaming clients read while the job runs.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_STATES = ('pending', 'processing', 'done', 'failed')
+
+
+class CheckpointStore:
+    """Directory of per-(file, engine) page checkpoints"""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, file_id: str, engine: str) -> str:
+        return os.path.join(self.folder, f"{file_id}.{engine}.jsonl")
+
+    @staticmethod
+    def fingerprint(file_path: str) -> str:
+        """Identifies the file version a checkpoint belongs to"""
+        stat = os.stat(file_path)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    def load(self, file_id: str, engine: str, fingerprint: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Pages checkpointed for this file version, keyed by page number
+
+        A checkpoint for another version of the file is discarded. A torn
+        last line (crash mid-write) is ignored.
+        """
+        path = self._path(file_id, engine)
+        if not os.path.exists(path):
+            return {}
+
+        pages = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get('fingerprint') != fingerprint:
+            logger.info("Discarding stale checkpoint: %s", path)
+            self.delete(file_id, engine)
+            return {}
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            pages[entry['page']] = entry
+        return pages
+
+    def append(self, file_id: str, engine: str, fingerprint: str, entries: List[Dict[str, Any]]):
+        """Persist finished page entries"""
+        path = self._path(file_id, engine)
+        with self._lock:
+            is_new = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8') as f:
+                if is_new:
+                    f.write(json.dumps({'fingerprint': fingerprint, 'created_at': time.time()}) + '\n')
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def delete(self, file_id: str, engine: str):
+        try:
+            os.remove(self._path(file_id, engine))
+        except OSError:
+            pass
+
+    def cleanup(self, age_hours: int = 24) -> int:
+        """Delete checkpoints not written to for age_hours; returns the count"""
+        cutoff = time.time() - age_hours * 3600
+        deleted = 0
+        for filename in os.listdir(self.folder):
+            path = os.path.join(self.folder, filename)
+            try:
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    deleted += 1
+            except OSError:
+                pass
+        return deleted
+
+
+class PageJournal:
+    """
+    Per-job page bookkeeping handed to OCRServices.process
+
+    Restores checkpointed pages, persists pages as they finish and reports
+    per-page state through listener(states) after every change.
+    """
+
+    def __init__(self, store: Optional[CheckpointStore], file_id: str, file_path: str,
+                 resume: bool = True, listener: Callable[[List[Dict[str, Any]]], None] = None):
+        self.store = store
+        self.file_id = file_id
+        self.fingerprint = CheckpointStore.fingerprint(file_path)
+        self.resume = resume
+        self.listener = listener
+        self.engine = None
+        self.restored = {}
+        self._states = {}
+        self._events = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def begin(self, engine: str) -> Dict[int, Dict[str, Any]]:
+        """Start (or fall back to) an engine; returns its restored pages"""
+        with self._lock:
+            self.engine = engine
+            self.restored = {}
+            if self.store:
+                if self.resume:
+                    self.restored = self.store.load(self.file_id, engine, self.fingerprint)
+                else:
+                    self.store.delete(self.file_id, engine)
+            self._states = {page: {'page': page, 'state': 'done', 'restored': True}
+                            for page in sorted(self.restored)}
+            self._events.append({'type': 'engine', 'engine': engine, 'restart': bool(self._events)})
+            self._events.extend(dict(self.restored[page], type='page', engine=engine, restored=True)
+                                for page in sorted(self.restored))
+            self._changed.notify_all()
+        if self.restored:
+            logger.info("Resuming %s with %s checkpointed pages", engine, len(self.restored))
+        self._notify()
+        return dict(self.restored)
+
+    def _set(self, pages: Iterable[int], state: str, error: str = None):
+        with self._lock:
+            for page in pages:
+                entry = {'page': page, 'state': state}
+                if error:
+                    entry['error'] = error
+                self._states[page] = entry
+
+    def planned(self, pages: Iterable[int]):
+        """Pages the engine is about to process"""
+        self._set(pages, 'pending')
+        self._notify()
+
+    def started(self, pages: Iterable[int]):
+        self._set(pages, 'processing')
+        self._notify()
+
+    def finished(self, entries: List[Dict[str, Any]], failed: Dict[int, str] = None):
+        """Record a finished batch; failed maps page numbers to errors and is not checkpointed"""
+        failed = failed or {}
+        done = [entry for entry in entries if entry['page'] not in failed]
+        if done and self.store:
+            self.store.append(self.file_id, self.engine, self.fingerprint, done)
+        self._set([entry['page'] for entry in done], 'done')
+        for page, error in failed.items():
+            self._set([page], 'failed', error)
+        self._emit([dict(entry, type='page', engine=self.engine) for entry in done] +
+                   [{'type': 'page_error', 'engine': self.engine, 'page': page, 'error': error}
+                    for page, error in failed.items()])
+        self._notify()
+
+    def failed(self, pages: Iterable[int], error: str):
+        pages = list(pages)
+        self._set(pages, 'failed', error)
+        self._emit([{'type': 'page_error', 'engine': self.engine, 'page': page, 'error': error}
+                    for page in pages])
+        self._notify()
+
+    def close(self):
+        """The job is over; wakes up stream readers"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    def _emit(self, events: List[Dict[str, Any]]):
+        if events:
+            with self._changed:
+                self._events.extend(events)
+                self._changed.notify_all()
+
+    def events_since(self, index: int, timeout: float = 0) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Events after the first index, waiting up to timeout for new ones
+
+        Returns:
+            (events, next_index, closed)
+        """
+        with self._changed:
+            if index >= len(self._events) and not self._closed and timeout:
+                self._changed.wait(timeout)
+            events = self._events[index:]
+            return events, index + len(events), self._closed
+
+    def complete(self):
+        """Job finished: drop the checkpoint unless some pages still need a retry"""
+        if self.store and self.engine and not any(state['state'] == 'failed' for state in self.states()):
+            self.store.delete(self.file_id, self.engine)
+
+    def states(self) -> List[Dict[str, Any]]:
+        """Per-page state snapshot in page order"""
+        with self._lock:
+            return [dict(self._states[page]) for page in sorted(self._states)]
+
+    def _notify(self):
+        if self.listener:
+            self.listener(self.states())
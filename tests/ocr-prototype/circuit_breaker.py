@@ -0,0 +1,210 @@
+"""
+Circuit Breaker Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Tracks the recent health of each OCR engine and stops sending work to an
+engine that is failing or too slow, so callers fail fast (or fall back to
+Tesseract) instead of paying a full timeout on every request.
+
+States:
+- closed: calls flow normally, outcomes are recorded in a rolling window
+- open: calls are rejected until the cool-down expires
+- half_open: a limited number of probe calls decide whether to close again
+
+Latency is judged per page, so a long document is not mistaken for a slow
+engine.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the engine's breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit breaker open for {name}, retry after {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Rolling error-rate and latency circuit breaker for one engine"""
+
+    def __init__(self, name: str, window_seconds: float = 60.0, min_calls: int = 5,
+                 error_rate_threshold: float = 0.5, slow_call_seconds: float = 10.0,
+                 slow_rate_threshold: float = 0.5, open_seconds: float = 30.0,
+                 half_open_probes: int = 1):
+        """Initialize breaker thresholds"""
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (timestamp, success, latency per page)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _trim(self, now: float):
+        """Drop outcomes that have left the rolling window"""
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _update_state(self, now: float):
+        """Move from open to half_open once the cool-down has expired"""
+        if self._state == STATE_OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            logger.info("Circuit breaker %s: open -> half_open", self.name)
+
+    def _trip(self, now: float, reason: str):
+        """Open the breaker"""
+        previous = self._state
+        self._state = STATE_OPEN
+        self._opened_at = now
+        self._calls.clear()
+        logger.warning("Circuit breaker %s: %s -> open (%s)", self.name, previous, reason)
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        with self._lock:
+            self._update_state(time.time())
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may proceed
+
+        In half_open state this reserves one of the probe slots, so every
+        allowed call must be followed by record_success, record_failure or
+        record_ignored.
+        """
+        with self._lock:
+            now = time.time()
+            self._update_state(now)
+
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will allow a probe call"""
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.time() - self._opened_at))
+
+    def record_success(self, latency: float, pages: int = 1):
+        """Record a successful call and its latency over pages pages"""
+        self._record(True, latency / max(1, pages))
+
+    def record_failure(self, latency: float, pages: int = 1):
+        """Record a failed call and its latency over pages pages"""
+        self._record(False, latency / max(1, pages))
+
+    def record_ignored(self):
+        """End an allowed call that failed for reasons that are not the engine's (e.g. a corrupt upload)"""
+        with self._lock:
+            self._update_state(time.time())
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, success: bool, latency: float):
+        with self._lock:
+            now = time.time()
+            self._update_state(now)
+            slow = latency >= self.slow_call_seconds
+
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if not success or slow:
+                    self._trip(now, 'probe failed' if not success else f'probe slow ({latency:.1f}s/page)')
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._state = STATE_CLOSED
+                    self._calls.clear()
+                    logger.info("Circuit breaker %s: half_open -> closed", self.name)
+                return
+
+            if self._state == STATE_OPEN:
+                # Late result from a call started before the breaker opened
+                return
+
+            self._calls.append((now, success, latency))
+            self._trim(now)
+
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, _, lat in self._calls if lat >= self.slow_call_seconds)
+
+            if failures / total >= self.error_rate_threshold:
+                self._trip(now, f'error rate {failures}/{total}')
+            elif slow_calls / total >= self.slow_rate_threshold:
+                self._trip(now, f'slow calls {slow_calls}/{total}')
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get breaker state and rolling-window statistics"""
+        with self._lock:
+            now = time.time()
+            self._update_state(now)
+            self._trim(now)
+
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            latencies = [lat for _, _, lat in self._calls]
+
+            return {
+                'state': self._state,
+                'calls': total,
+                'error_rate': round(failures / total, 2) if total else 0.0,
+                'avg_page_latency': round(sum(latencies) / total, 2) if total else None,
+                'retry_after': round(max(0.0, self.open_seconds - (now - self._opened_at)), 1)
+                               if self._state == STATE_OPEN else 0.0
+            }
+
+
+class BreakerRegistry:
+    """Holds one circuit breaker per OCR engine"""
+
+    def __init__(self, names, **breaker_options):
+        """Create a breaker for every engine name"""
+        self._breakers = {name: CircuitBreaker(name, **breaker_options) for name in names}
+
+    def get(self, name: str) -> Optional[CircuitBreaker]:
+        """Get breaker for an engine"""
+        return self._breakers.get(name)
+
+    def is_open(self, name: str) -> bool:
+        """True if the engine's breaker currently rejects calls"""
+        breaker = self._breakers.get(name)
+        return breaker is not None and breaker.state == STATE_OPEN
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get state of all breakers"""
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
@@ -0,0 +1,148 @@
+"""
+Request Coalescing Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Deduplicates /api/process requests so retries and double submits don't OCR
+the same document several times at once.
+
+- Singleflight: a request identical to one whose job is still queued or
+  running attaches to that job. Identical means the same file, engine,
+  allow_fallback and resume. The request gets the job's process_id
+  instead of starting another run.
+- Idempotency keys: a request that repeats an Idempotency-Key header
+  gets the original request's process_id, whether or not that job has
+  finished, for IDEMPOTENCY_TTL_SECONDS. Reusing a key for a different
+  request raises IdempotencyConflict.
+
+Both tables are kept in the API process. In distributed mode with several
+API nodes, route a client's retries to the same node to get idempotency
+across retries.
+
+Usage:
+    jobs = RequestDeduplicator(is_running=lambda pid: job_status(pid) in ('queued', 'processing'))
+    process_id, reason = jobs.claim(new_id, flight_key(file_id, engine, fallback, resume),
+                                    idempotency_key=key, fingerprint=request_fingerprint(file_id, body))
+    if reason is None:
+        start_job(process_id)
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# claim() reasons for reusing an existing job
+REASON_IDEMPOTENCY_KEY = 'idempotency_key'
+REASON_IN_FLIGHT = 'in_flight'
+
+
+class IdempotencyConflict(ValueError):
+    """An Idempotency-Key was reused with a different request"""
+
+
+def flight_key(file_id: str, engine: str, allow_fallback: bool, resume: bool) -> Tuple:
+    """Requests with the same key produce the same result"""
+    return (file_id, engine, bool(allow_fallback), bool(resume))
+
+
+def request_fingerprint(file_id: str, body: Dict[str, Any]) -> str:
+    """Digest of a request, to tell a retry from a different request under the same key"""
+    return hashlib.sha256(json.dumps([file_id, body], sort_keys=True, default=str).encode()).hexdigest()
+
+
+class RequestDeduplicator:
+    """Singleflight table of running jobs plus idempotency keys with a TTL"""
+
+    def __init__(self, is_running: Callable[[str], bool], ttl_seconds: float = 86400,
+                 max_keys: int = 10000, coalesce: bool = True):
+        """
+        Args:
+            is_running: True while a process_id's job is queued or running, or not created yet
+            ttl_seconds: How long idempotency keys (and flight entries at most) are kept
+            max_keys: Idempotency keys kept at most; the oldest go first
+            coalesce: Attach identical requests to running jobs
+        """
+        self.is_running = is_running
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max(1, max_keys)
+        self.coalesce = coalesce
+        self._keys = OrderedDict()     # idempotency key -> (process_id, fingerprint, created)
+        self._flights = OrderedDict()  # flight key -> (process_id, created)
+        self._lock = threading.Lock()
+
+    def claim(self, process_id: str, key: Optional[Tuple], idempotency_key: Optional[str] = None,
+              fingerprint: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """
+        Register a new job or find the one this request repeats
+
+        A key of None never coalesces (e.g. profiled requests need their own run).
+
+        Returns:
+            (process_id, reason): the new process_id and None when the caller
+            should start the job, else the existing job's process_id and
+            REASON_IDEMPOTENCY_KEY or REASON_IN_FLIGHT
+
+        Raises:
+            IdempotencyConflict: idempotency_key was used for a different request
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            existing, reason = self._find(key, idempotency_key, fingerprint)
+            if reason is None:
+                existing = process_id
+                if self.coalesce and key is not None:
+                    self._flights[key] = (process_id, now)
+            if idempotency_key is not None and reason != REASON_IDEMPOTENCY_KEY:
+                self._keys[idempotency_key] = (existing, fingerprint, now)
+                while len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+
+        if reason is not None:
+            metrics.REQUESTS_DEDUPLICATED.inc(reason=reason)
+            logger.info("Request reuses job %s (%s)", existing, reason)
+        return existing, reason
+
+    def _find(self, key: Tuple, idempotency_key: Optional[str], fingerprint: Optional[str]):
+        """Existing job this request repeats, as (process_id, reason), or (None, None)"""
+        if idempotency_key is not None and idempotency_key in self._keys:
+            existing, existing_fingerprint, _ = self._keys[idempotency_key]
+            if existing_fingerprint != fingerprint:
+                raise IdempotencyConflict(f"{IDEMPOTENCY_HEADER} was already used for a different request")
+            return existing, REASON_IDEMPOTENCY_KEY
+        if self.coalesce and key is not None and key in self._flights:
+            running = self._flights[key][0]
+            if self.is_running(running):
+                return running, REASON_IN_FLIGHT
+            del self._flights[key]
+        return None, None
+
+    def _expire(self, now: float):
+        for table in (self._keys, self._flights):
+            while table and now - next(iter(table.values()))[-1] > self.ttl_seconds:
+                table.popitem(last=False)
+
+    def finished(self, process_id: str):
+        """Drop a job's flight entry once it is done (its idempotency keys stay)"""
+        with self._lock:
+            for key, (running, _) in list(self._flights.items()):
+                if running == process_id:
+                    del self._flights[key]
+
+    def forget(self, process_id: str):
+        """Drop every entry of a job that failed to start, so a retry starts it again"""
+        with self._lock:
+            for table in (self._keys, self._flights):
+                for key, entry in list(table.items()):
+                    if entry[0] == process_id:
+                        del table[key]
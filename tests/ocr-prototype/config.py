@@ -46,7 +46,130 @@ class Config:
     # Processing configuration
     PDF_DPI = int(os.getenv('PDF_DPI', '200'))  # DPI for PDF to image conversion
     CLEANUP_AGE_HOURS = int(os.getenv('CLEANUP_AGE_HOURS', '24'))  # Auto-cleanup age
+
+    # Circuit breaker configuration (per OCR engine)
+    BREAKER_WINDOW_SECONDS = float(os.getenv('BREAKER_WINDOW_SECONDS', '60'))  # Rolling window length
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '5'))  # Calls needed before the breaker can trip
+    BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', '0.5'))  # Error rate that opens the breaker
+    BREAKER_SLOW_CALL_SECONDS = float(os.getenv('BREAKER_SLOW_CALL_SECONDS', '10'))  # Calls slower than this per page count as slow
+    BREAKER_SLOW_RATE = float(os.getenv('BREAKER_SLOW_RATE', '0.5'))  # Slow-call rate that opens the breaker
+    BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '30'))  # Cool-down before half-open probes
+    BREAKER_HALF_OPEN_PROBES = int(os.getenv('BREAKER_HALF_OPEN_PROBES', '1'))  # Probe calls allowed when half-open
+    
+    # Engine router configuration (service 'auto')
+    ROUTER_TARGET = os.getenv('ROUTER_TARGET', 'cheapest')  # 'cheapest' under SLO or 'fastest' under budget
+    ROUTER_LATENCY_SLO = float(os.getenv('ROUTER_LATENCY_SLO', '30'))  # Seconds per document
+    ROUTER_BUDGET = float(os.getenv('ROUTER_BUDGET', '0.05'))  # Cost per document (USD)
+    ROUTER_UPLOAD_SECONDS_PER_MB = float(os.getenv('ROUTER_UPLOAD_SECONDS_PER_MB', '0.5'))  # Cloud upload time
+    COST_PER_PAGE_TESSERACT = float(os.getenv('COST_PER_PAGE_TESSERACT', '0'))
+    COST_PER_PAGE_GOOGLE = float(os.getenv('COST_PER_PAGE_GOOGLE', '0.0015'))
+    COST_PER_PAGE_AWS = float(os.getenv('COST_PER_PAGE_AWS', '0.0015'))
+    PAGE_LATENCY_TESSERACT = float(os.getenv('PAGE_LATENCY_TESSERACT', '3.0'))  # Prior until history exists
+    PAGE_LATENCY_GOOGLE = float(os.getenv('PAGE_LATENCY_GOOGLE', '1.0'))
+    PAGE_LATENCY_AWS = float(os.getenv('PAGE_LATENCY_AWS', '1.5'))
+    
+    # Tracing configuration
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', 'none')  # 'none', 'file' or 'collector'
+    TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')  # JSON lines output for 'file'
+    TRACE_COLLECTOR_URL = os.getenv('TRACE_COLLECTOR_URL')  # Endpoint receiving span batches for 'collector'
+    TRACE_MAX_TRACES = int(os.getenv('TRACE_MAX_TRACES', '1000'))  # Recent traces kept in memory
     
+    # Logging configuration
+    LOG_MODE = os.getenv('LOG_MODE', 'sync')  # 'sync' or 'async' (queue + background writer)
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'text' or 'json'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')  # e.g. '/api/process/<file_id>=0.1,/api/upload=0.1'
+    LOG_DEFAULT_SAMPLE_RATE = float(os.getenv('LOG_DEFAULT_SAMPLE_RATE', '1.0'))  # Routes not listed above
+    
+    # Fake engines for load tests and benchmarks (no OCR dependencies needed)
+    FAKE_ENGINES = os.getenv('FAKE_ENGINES', 'False').lower() == 'true'
+    FAKE_PAGE_LATENCY = float(os.getenv('FAKE_PAGE_LATENCY', '0.05'))  # Simulated seconds per page
+    FAKE_ERROR_RATE = float(os.getenv('FAKE_ERROR_RATE', '0'))  # Fraction of fake calls that fail
+    
+    # Debug / profiling configuration
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')  # Required in X-Admin-Token for debug features; unset disables them
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', 'profiles')  # Per-request profiles, named by process_id
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))  # Seconds between stack samples
+
+    # Engine startup: 'background' (probe on a daemon thread), 'eager' (probe before serving) or 'off'
+    ENGINE_WARMUP = os.getenv('ENGINE_WARMUP', 'background')
+
+    # Engine scheduling
+    ENGINE_PAGE_WORKERS = int(os.getenv('ENGINE_PAGE_WORKERS', '16'))  # Threads running page batches across engines
+    ENGINE_CONCURRENCY = os.getenv('ENGINE_CONCURRENCY', '')  # Override declared max_concurrency, e.g. 'tesseract=2,aws=10'
+
+    # CPU budget for Tesseract: processes x OpenMP threads per process within the cores
+    CPU_BUDGET_CORES = int(os.getenv('CPU_BUDGET_CORES', '0'))  # Cores to use; 0 = every core this process may use
+    TESSERACT_THREADS = int(os.getenv('TESSERACT_THREADS', '1'))  # OMP_THREAD_LIMIT of each Tesseract process
+    TESSERACT_PROCESSES = int(os.getenv('TESSERACT_PROCESSES', '0'))  # Tesseract processes at once; 0 = cores / threads
+    CPU_AFFINITY = os.getenv('CPU_AFFINITY', 'False').lower() == 'true'  # Pin each Tesseract process to its own cores
+
+    # Memory budget for decoded page pixels, shared by all jobs in the process
+    RASTER_MEMORY_BUDGET_MB = float(os.getenv('RASTER_MEMORY_BUDGET_MB', '1024'))  # 0 disables the limit
+    RASTER_PAGES_IN_FLIGHT = int(os.getenv('RASTER_PAGES_IN_FLIGHT', '4'))  # Pages rendered per reservation
+    RASTER_MEMORY_WAIT_TIMEOUT = float(os.getenv('RASTER_MEMORY_WAIT_TIMEOUT', '300'))  # Seconds before a job gives up
+
+    # PDF rasterization: 'single' (one pdftoppm call, PNG pages) or 'parallel' (page ranges in parallel processes)
+    RASTER_BACKEND = os.getenv('RASTER_BACKEND', 'single')
+    RASTER_PROCESSES = int(os.getenv('RASTER_PROCESSES', '0')) or None  # pdftoppm processes; 0 = CPU count
+    RASTER_FORMAT = os.getenv('RASTER_FORMAT', 'ppm')  # 'parallel' page format: 'ppm', 'png' or 'jpeg'
+    RASTER_GRAYSCALE = os.getenv('RASTER_GRAYSCALE', 'False').lower() == 'true'  # One channel (PGM with ppm)
+
+    # Shared-memory page buffers: rendered pages go to named segments instead of UPLOAD_FOLDER
+    PAGE_BUFFERS = os.getenv('PAGE_BUFFERS', 'False').lower() == 'true'
+    PAGE_BUFFER_FOLDER = os.getenv('PAGE_BUFFER_FOLDER', '/dev/shm/sme-pages')  # Must be on tmpfs to stay in memory
+    PAGE_BUFFER_MAX_MB = float(os.getenv('PAGE_BUFFER_MAX_MB', '512'))  # Documents that don't fit render to disk
+
+    # Page checkpoints: finished pages survive failures and restarts, and retries skip them
+    CHECKPOINTS_ENABLED = os.getenv('CHECKPOINTS_ENABLED', 'True').lower() == 'true'
+    CHECKPOINT_FOLDER = os.getenv('CHECKPOINT_FOLDER', 'checkpoints')
+
+    # Job results: page text of finished jobs is kept out of job records, in one blob per job
+    RESULT_FOLDER = os.getenv('RESULT_FOLDER', 'job_results')
+    RESULT_CACHE_MB = float(os.getenv('RESULT_CACHE_MB', '64'))  # LRU memory tier in front of RESULT_FOLDER
+
+    # Streaming /api/result: seconds between heartbeat lines while no page finishes
+    RESULT_STREAM_HEARTBEAT = float(os.getenv('RESULT_STREAM_HEARTBEAT', '15'))
+
+    # Job dispatch: priority lanes ('interactive', 'bulk') share the job workers by weight
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '8'))  # Concurrent OCR jobs (server.py; server_async.py uses ASYNC_OCR_WORKERS)
+    LANE_WEIGHTS = os.getenv('LANE_WEIGHTS', 'interactive=4,bulk=1')  # Job starts per lane while both have work
+    LANE_RESERVED_WORKERS = os.getenv('LANE_RESERVED_WORKERS', 'interactive=1')  # Workers only serving a lane
+    PRIORITY_INTERACTIVE_MAX_PAGES = int(os.getenv('PRIORITY_INTERACTIVE_MAX_PAGES', '3'))  # Larger jobs default to bulk
+
+    # Request deduplication for /api/process
+    COALESCE_REQUESTS = os.getenv('COALESCE_REQUESTS', 'True').lower() == 'true'  # Attach identical requests to running jobs
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))  # How long Idempotency-Key replays work
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000'))  # Oldest keys are dropped beyond this
+
+    # Autoscaling of the OCR job pool between bounds (JOB_WORKERS, ASYNC_OCR_WORKERS or
+    # worker.py --concurrency is the starting size)
+    AUTOSCALE_ENABLED = os.getenv('AUTOSCALE_ENABLED', 'False').lower() == 'true'
+    AUTOSCALE_MIN_WORKERS = int(os.getenv('AUTOSCALE_MIN_WORKERS', '2'))
+    AUTOSCALE_MAX_WORKERS = int(os.getenv('AUTOSCALE_MAX_WORKERS', '32'))
+    AUTOSCALE_INTERVAL = float(os.getenv('AUTOSCALE_INTERVAL', '5'))  # Seconds between samples
+    AUTOSCALE_QUEUE_PER_WORKER = float(os.getenv('AUTOSCALE_QUEUE_PER_WORKER', '2'))  # Grow above this backlog
+    AUTOSCALE_WAIT_UP_SECONDS = float(os.getenv('AUTOSCALE_WAIT_UP_SECONDS', '10'))  # Grow when the oldest job waits this long
+    AUTOSCALE_CPU_HIGH = float(os.getenv('AUTOSCALE_CPU_HIGH', '0.85'))  # No growth above this host CPU utilisation
+    AUTOSCALE_UP_SAMPLES = int(os.getenv('AUTOSCALE_UP_SAMPLES', '2'))  # Consecutive samples before growing
+    AUTOSCALE_DOWN_SAMPLES = int(os.getenv('AUTOSCALE_DOWN_SAMPLES', '6'))  # Consecutive idle samples before shrinking
+    AUTOSCALE_COOLDOWN = float(os.getenv('AUTOSCALE_COOLDOWN', '30'))  # Seconds between pool changes
+
+    # Distributed mode: API nodes enqueue jobs on a shared queue and worker.py processes run them.
+    # UPLOAD_FOLDER, CHECKPOINT_FOLDER and RESULT_FOLDER must then be shared storage visible to every node.
+    JOB_MODE = os.getenv('JOB_MODE', 'local')  # 'local' (jobs run in the API process) or 'distributed'
+    QUEUE_BACKEND = os.getenv('QUEUE_BACKEND', 'sqlite')  # Shared queue backend (see shared_queue.py)
+    QUEUE_PATH = os.getenv('QUEUE_PATH', 'shared/queue.db')  # Queue location for the backend
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))  # Lease expiries before a job is failed
+    WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '1'))  # Jobs one worker process runs at once
+    WORKER_LANES = os.getenv('WORKER_LANES', 'interactive,bulk')  # Lanes a worker takes jobs from
+    WORKER_LEASE_SECONDS = float(os.getenv('WORKER_LEASE_SECONDS', '60'))  # A dead worker's job is retried after this
+    WORKER_POLL_SECONDS = float(os.getenv('WORKER_POLL_SECONDS', '1'))  # Idle queue polling interval
+
+    # Async server (server_async.py) executors
+    ASYNC_IO_WORKERS = int(os.getenv('ASYNC_IO_WORKERS', '16'))  # Threads for file I/O and status probes
+    ASYNC_OCR_WORKERS = int(os.getenv('ASYNC_OCR_WORKERS', str(os.cpu_count() or 4)))  # Concurrent OCR jobs
+
     @classmethod
     def get_api_key_status(cls) -> dict:
         """Check which API keys are configured"""
@@ -102,6 +225,91 @@ class Config:
             'max_file_size': f"{cls.MAX_CONTENT_LENGTH / (1024*1024):.1f}MB"
         }
 
+    @classmethod
+    def get_breaker_options(cls) -> dict:
+        """Get circuit breaker settings as CircuitBreaker keyword arguments"""
+        return {
+            'window_seconds': cls.BREAKER_WINDOW_SECONDS,
+            'min_calls': cls.BREAKER_MIN_CALLS,
+            'error_rate_threshold': cls.BREAKER_ERROR_RATE,
+            'slow_call_seconds': cls.BREAKER_SLOW_CALL_SECONDS,
+            'slow_rate_threshold': cls.BREAKER_SLOW_RATE,
+            'open_seconds': cls.BREAKER_OPEN_SECONDS,
+            'half_open_probes': cls.BREAKER_HALF_OPEN_PROBES
+        }
+    
+    @classmethod
+    def get_autoscale_options(cls) -> dict:
+        """Get autoscaler settings as Autoscaler keyword arguments"""
+        return {
+            'min_workers': cls.AUTOSCALE_MIN_WORKERS,
+            'max_workers': cls.AUTOSCALE_MAX_WORKERS,
+            'interval': cls.AUTOSCALE_INTERVAL,
+            'queue_per_worker': cls.AUTOSCALE_QUEUE_PER_WORKER,
+            'wait_up_seconds': cls.AUTOSCALE_WAIT_UP_SECONDS,
+            'cpu_high': cls.AUTOSCALE_CPU_HIGH,
+            'up_samples': cls.AUTOSCALE_UP_SAMPLES,
+            'down_samples': cls.AUTOSCALE_DOWN_SAMPLES,
+            'cooldown': cls.AUTOSCALE_COOLDOWN
+        }
+    
+    @classmethod
+    def get_engine_concurrency(cls) -> dict:
+        """Parse ENGINE_CONCURRENCY into {engine: max_concurrency}"""
+        overrides = {}
+        for item in cls.ENGINE_CONCURRENCY.split(','):
+            if not item.strip():
+                continue
+            name, _, value = item.partition('=')
+            try:
+                overrides[name.strip()] = int(value)
+            except ValueError:
+                raise ValueError(f"Invalid ENGINE_CONCURRENCY entry: {item!r} (expected engine=count)")
+        return overrides
+    
+    @classmethod
+    def get_lane_weights(cls) -> dict:
+        """Parse LANE_WEIGHTS into {lane: weight}"""
+        return cls._parse_lane_counts('LANE_WEIGHTS', cls.LANE_WEIGHTS)
+    
+    @classmethod
+    def get_lane_reserved_workers(cls) -> dict:
+        """Parse LANE_RESERVED_WORKERS into {lane: workers}"""
+        return cls._parse_lane_counts('LANE_RESERVED_WORKERS', cls.LANE_RESERVED_WORKERS)
+    
+    @staticmethod
+    def _parse_lane_counts(setting: str, value: str) -> dict:
+        counts = {}
+        for item in value.split(','):
+            if not item.strip():
+                continue
+            name, _, count = item.partition('=')
+            try:
+                counts[name.strip()] = int(count)
+            except ValueError:
+                raise ValueError(f"Invalid {setting} entry: {item!r} (expected lane=count)")
+        return counts
+    
+    @classmethod
+    def get_router_options(cls) -> dict:
+        """Get engine router settings as EngineRouter keyword arguments"""
+        return {
+            'unit_costs': {
+                'tesseract': cls.COST_PER_PAGE_TESSERACT,
+                'google': cls.COST_PER_PAGE_GOOGLE,
+                'aws': cls.COST_PER_PAGE_AWS
+            },
+            'default_page_latency': {
+                'tesseract': cls.PAGE_LATENCY_TESSERACT,
+                'google': cls.PAGE_LATENCY_GOOGLE,
+                'aws': cls.PAGE_LATENCY_AWS
+            },
+            'target': cls.ROUTER_TARGET,
+            'latency_slo': cls.ROUTER_LATENCY_SLO,
+            'budget': cls.ROUTER_BUDGET,
+            'upload_seconds_per_mb': cls.ROUTER_UPLOAD_SECONDS_PER_MB
+        }
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
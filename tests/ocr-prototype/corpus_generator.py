@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Synthetic Document Corpus Generator
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Renders invoices, receipts and purchase orders as PDF and image files with
+matching ground-truth JSON, so benchmarks and scale tests can run offline
+on thousands of documents.
+
+Usage:
+    python corpus_generator.py --count 100
+    python corpus_generator.py --count 1000 --types invoice,receipt --quality poor --seed 7
+    python corpus_generator.py --count 50 --types invoice --vendor "ABC Corporation" --prefix abc_corp \
+        --format pdf --flat --output test-documents/invoices/various-vendors
+
+Output (default test-documents/generated/):
+    <type>/<name>.pdf | <name>.png | <name>_p<N>.png   (--flat drops <type>/)
+    <type>/<name>.json          ground truth: fields, per-page text, degradation
+    manifest.json               one entry per document
+
+Field names follow tests/ai-mockup/configs so those suites can point at
+generated files.
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import argparse
+from datetime import date, timedelta
+from typing import Dict, Any, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test-documents', 'generated')
+
+DOCUMENT_TYPES = ['invoice', 'receipt', 'purchase_order']
+
+# Degradation presets: gaussian noise sigma, skew degrees (max abs), blur radius, JPEG quality
+QUALITY_PRESETS = {
+    'clear': {'noise': 0.0, 'skew': 0.0, 'blur': 0.0, 'jpeg_quality': 95},
+    'medium': {'noise': 8.0, 'skew': 1.0, 'blur': 0.6, 'jpeg_quality': 80},
+    'poor': {'noise': 20.0, 'skew': 3.0, 'blur': 1.2, 'jpeg_quality': 60},
+    'very_poor': {'noise': 40.0, 'skew': 6.0, 'blur': 2.0, 'jpeg_quality': 35}
+}
+
+VENDORS = ['ABC Corporation', 'XYZ Industries', 'ACME Corporation', 'Supply Chain Co',
+           'Tenaga Nasional Berhad', 'Global Tech Solutions', 'Kuala Office Supplies']
+STORES = ['Target', "Joe's Pizza", 'Mydin', 'Tesco Extra', 'Starbucks', '7-Eleven', 'Guardian Pharmacy']
+ITEMS = ['Consulting Services', 'Printer Paper A4', 'Toner Cartridge', 'Office Chair', 'Software License',
+         'Cloud Hosting', 'Delivery Charge', 'Maintenance Fee', 'USB-C Cable', 'Desk Lamp',
+         'Coffee Latte', 'Chicken Rice', 'Mineral Water', 'Notebook', 'Stapler']
+PAYMENT_METHODS = ['Credit Card', 'Cash', 'Debit Card', 'E-Wallet']
+CURRENCIES = ['USD', 'MYR']
+
+PAGE_SIZE = (1240, 1754)      # A4 at 150 DPI
+RECEIPT_WIDTH = 576           # 80mm thermal paper at ~180 DPI
+LINE_HEIGHT = 34
+MARGIN = 80
+
+
+def load_font(size: int):
+    """Best available font; Pillow < 10.1 has no sized default font"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        pass
+    for name in ('DejaVuSans.ttf', 'Arial.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def money(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def random_date(rng: random.Random) -> date:
+    return date(2024, 1, 1) + timedelta(days=rng.randint(0, 365))
+
+
+def make_line_items(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    items = []
+    for _ in range(count):
+        quantity = rng.randint(1, 10)
+        unit_price = round(rng.uniform(1, 500), 2)
+        items.append({
+            'description': rng.choice(ITEMS),
+            'quantity': quantity,
+            'unit_price': money(unit_price),
+            'amount': money(quantity * unit_price)
+        })
+    return items
+
+
+def build_invoice(rng: random.Random, index: int, vendor: str = None) -> Dict[str, Any]:
+    vendor = vendor or rng.choice(VENDORS)
+    prefix = ''.join(word[0] for word in vendor.split()[:3]).upper()
+    items = make_line_items(rng, rng.randint(3, 90))
+    subtotal = sum(float(item['amount']) for item in items)
+    tax = round(subtotal * 0.06, 2)
+    issued = random_date(rng)
+
+    fields = {
+        'invoice_number': f"{prefix}-2024-{index:03d}",
+        'date': issued.isoformat(),
+        'due_date': (issued + timedelta(days=30)).isoformat(),
+        'vendor': vendor,
+        'customer': f"Customer {rng.randint(100, 999)} Sdn Bhd",
+        'subtotal': money(subtotal),
+        'tax': money(tax),
+        'amount': money(subtotal + tax),
+        'currency': rng.choice(CURRENCIES)
+    }
+    header = [
+        vendor.upper(),
+        'INVOICE',
+        f"Invoice Number: {fields['invoice_number']}",
+        f"Date: {fields['date']}",
+        f"Due Date: {fields['due_date']}",
+        f"Bill To: {fields['customer']}",
+        ''
+    ]
+    footer = [
+        '',
+        f"Subtotal: {fields['subtotal']}",
+        f"Tax (6%): {fields['tax']}",
+        f"Total Amount: {fields['currency']} {fields['amount']}"
+    ]
+    return {'type': 'invoice', 'fields': fields, 'header': header, 'items': items, 'footer': footer}
+
+
+def build_receipt(rng: random.Random, index: int, vendor: str = None) -> Dict[str, Any]:
+    store = vendor or rng.choice(STORES)
+    items = make_line_items(rng, rng.randint(2, 15))
+    for item in items:
+        item['quantity'] = 1
+        item['amount'] = money(float(item['unit_price']) / 10)
+    subtotal = sum(float(item['amount']) for item in items)
+    tip = round(subtotal * 0.2, 2) if rng.random() < 0.3 else 0.0
+
+    fields = {
+        'store_name': store,
+        'receipt_number': f"R{index:06d}",
+        'date': random_date(rng).isoformat(),
+        'total': money(subtotal + tip),
+        'payment_method': rng.choice(PAYMENT_METHODS)
+    }
+    if tip:
+        fields['tip'] = money(tip)
+
+    header = [store.upper(), f"Receipt: {fields['receipt_number']}", f"Date: {fields['date']}", '']
+    footer = ['']
+    if tip:
+        footer.append(f"Tip: {fields['tip']}")
+    footer += [f"TOTAL: {fields['total']}", f"Paid by: {fields['payment_method']}", 'THANK YOU']
+    return {'type': 'receipt', 'fields': fields, 'header': header, 'items': items, 'footer': footer}
+
+
+def build_purchase_order(rng: random.Random, index: int, vendor: str = None) -> Dict[str, Any]:
+    vendor = vendor or rng.choice(VENDORS)
+    items = make_line_items(rng, rng.randint(3, 60))
+    total = sum(float(item['amount']) for item in items)
+
+    fields = {
+        'po_number': f"PO-2024-{1000 + index}",
+        'date': random_date(rng).isoformat(),
+        'vendor': vendor,
+        'ship_to': f"Warehouse {rng.randint(1, 9)}, Shah Alam",
+        'total': money(total)
+    }
+    header = [
+        'PURCHASE ORDER',
+        f"PO Number: {fields['po_number']}",
+        f"Date: {fields['date']}",
+        f"Vendor: {vendor}",
+        f"Ship To: {fields['ship_to']}",
+        ''
+    ]
+    footer = ['', f"Total: {fields['total']}", 'Authorized Signature: ____________']
+    return {'type': 'purchase_order', 'fields': fields, 'header': header, 'items': items, 'footer': footer}
+
+
+BUILDERS = {
+    'invoice': build_invoice,
+    'receipt': build_receipt,
+    'purchase_order': build_purchase_order
+}
+
+
+def layout_pages(document: Dict[str, Any]) -> List[List[str]]:
+    """Split the document's text lines into pages"""
+    if document['type'] == 'receipt':
+        item_lines = [f"{item['description']:<22}{item['amount']:>10}" for item in document['items']]
+        return [document['header'] + item_lines + document['footer']]
+
+    item_lines = [f"{item['quantity']:>3} x {item['description']:<24} @ {item['unit_price']:>9} = {item['amount']:>10}"
+                  for item in document['items']]
+    lines_per_page = (PAGE_SIZE[1] - 2 * MARGIN) // LINE_HEIGHT
+
+    pages = []
+    current = list(document['header'])
+    for line in item_lines:
+        if len(current) >= lines_per_page - 1:
+            pages.append(current)
+            current = [f"{document['header'][0]} (continued)", '']
+        current.append(line)
+    if len(current) + len(document['footer']) > lines_per_page:
+        pages.append(current)
+        current = []
+    current.extend(document['footer'])
+    pages.append(current)
+
+    total = len(pages)
+    for number, page in enumerate(pages, start=1):
+        page.append(f"Page {number} of {total}")
+    return pages
+
+
+def render_page(lines: List[str], receipt: bool, font) -> Image.Image:
+    """Render text lines onto a white page"""
+    if receipt:
+        size = (RECEIPT_WIDTH, 2 * MARGIN + LINE_HEIGHT * len(lines))
+        x_offset = 30
+    else:
+        size = PAGE_SIZE
+        x_offset = MARGIN
+
+    img = Image.new('L', size, color=255)
+    draw = ImageDraw.Draw(img)
+    y_position = MARGIN
+    for line in lines:
+        draw.text((x_offset, y_position), line, fill=0, font=font)
+        y_position += LINE_HEIGHT
+    return img
+
+
+def degrade(img: Image.Image, rng: random.Random, noise: float, skew: float, blur: float) -> Tuple[Image.Image, Dict]:
+    """Apply skew, blur and gaussian noise; returns the image and the parameters used"""
+    applied = {'noise': noise, 'skew_degrees': 0.0, 'blur': blur}
+
+    if skew:
+        angle = round(rng.uniform(-skew, skew), 2)
+        img = img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        applied['skew_degrees'] = angle
+
+    if blur:
+        img = img.filter(ImageFilter.GaussianBlur(radius=blur))
+
+    if noise:
+        noise_img = Image.effect_noise(img.size, noise)
+        # effect_noise is centred on 128; shift it to be centred on 0 and add
+        img = Image.eval(Image.blend(img, noise_img, 0.5), lambda v: max(0, min(255, int((v - 64) * 2))))
+
+    return img, applied
+
+
+def generate_document(rng: random.Random, doc_type: str, index: int, name: str, output_dir: str,
+                      quality: str, image_format: str, vendor: str, font,
+                      overrides: Dict[str, float], flat: bool = False) -> Dict[str, Any]:
+    """Render one document and write its files and ground truth"""
+    document = BUILDERS[doc_type](rng, index, vendor)
+    pages = layout_pages(document)
+
+    preset = dict(QUALITY_PRESETS[quality])
+    preset.update({key: value for key, value in overrides.items() if value is not None})
+
+    type_dir = output_dir if flat else os.path.join(output_dir, doc_type)
+    os.makedirs(type_dir, exist_ok=True)
+
+    images = []
+    degradation = []
+    for lines in pages:
+        img = render_page(lines, doc_type == 'receipt', font)
+        img, applied = degrade(img, rng, preset['noise'], preset['skew'], preset['blur'])
+        images.append(img)
+        degradation.append(applied)
+
+    files = []
+    if image_format in ('pdf', 'both'):
+        pdf_path = os.path.join(type_dir, f"{name}.pdf")
+        images[0].save(pdf_path, 'PDF', resolution=150, save_all=True, append_images=images[1:])
+        files.append(os.path.relpath(pdf_path, output_dir))
+    if image_format in ('png', 'jpg', 'both'):
+        extension = 'jpg' if image_format == 'jpg' else 'png'
+        for number, img in enumerate(images, start=1):
+            suffix = '' if len(images) == 1 else f"_p{number}"
+            image_path = os.path.join(type_dir, f"{name}{suffix}.{extension}")
+            if extension == 'jpg':
+                img.save(image_path, 'JPEG', quality=int(preset['jpeg_quality']))
+            else:
+                img.save(image_path, 'PNG')
+            files.append(os.path.relpath(image_path, output_dir))
+
+    truth = {
+        'name': name,
+        'type': doc_type,
+        'quality': quality,
+        'files': files,
+        'page_count': len(pages),
+        'fields': document['fields'],
+        'line_items': document['items'],
+        'pages': [{'page': number, 'text': '\n'.join(line for line in lines if line)}
+                  for number, lines in enumerate(pages, start=1)],
+        'text': '\n\n'.join('\n'.join(line for line in lines if line) for lines in pages),
+        'degradation': degradation
+    }
+    truth_path = os.path.join(type_dir, f"{name}.json")
+    with open(truth_path, 'w') as f:
+        json.dump(truth, f, indent=2)
+
+    return {
+        'name': name,
+        'type': doc_type,
+        'quality': quality,
+        'page_count': len(pages),
+        'files': files,
+        'ground_truth': os.path.relpath(truth_path, output_dir)
+    }
+
+
+def generate_corpus(output_dir: str, count: int, types: List[str], qualities: List[str],
+                    image_format: str = 'both', seed: int = 42, vendor: str = None,
+                    prefix: str = None, overrides: Dict[str, float] = None,
+                    flat: bool = False) -> Dict[str, Any]:
+    """Generate count documents cycling through types and qualities"""
+    rng = random.Random(seed)
+    font = load_font(22)
+    overrides = overrides or {}
+    os.makedirs(output_dir, exist_ok=True)
+
+    width = max(3, int(math.log10(max(1, count))) + 1)
+    documents = []
+    for index in range(1, count + 1):
+        doc_type = types[(index - 1) % len(types)]
+        quality = qualities[(index - 1) % len(qualities)]
+        name = f"{prefix or doc_type}_{index:0{width}d}"
+        documents.append(generate_document(rng, doc_type, index, name, output_dir, quality,
+                                           image_format, vendor, font, overrides, flat))
+        if index % 100 == 0:
+            print(f"   ... {index}/{count} documents")
+
+    manifest = {
+        'seed': seed,
+        'count': count,
+        'types': types,
+        'qualities': qualities,
+        'format': image_format,
+        'documents': documents
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic invoice/receipt/PO corpus with ground truth')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Output directory')
+    parser.add_argument('--count', type=int, default=30, help='Number of documents')
+    parser.add_argument('--types', default=','.join(DOCUMENT_TYPES), help='Comma-separated document types')
+    parser.add_argument('--quality', default='clear,medium,poor',
+                        help=f"Comma-separated quality presets ({', '.join(QUALITY_PRESETS)})")
+    parser.add_argument('--format', default='both', choices=['pdf', 'png', 'jpg', 'both'],
+                        help="Output format; 'both' writes PDF and PNG")
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same corpus)')
+    parser.add_argument('--vendor', help='Use one vendor/store for every document')
+    parser.add_argument('--prefix', help='File name prefix (default: document type)')
+    parser.add_argument('--flat', action='store_true', help='Write all files directly into --output')
+    parser.add_argument('--noise', type=float, help='Override gaussian noise sigma')
+    parser.add_argument('--skew', type=float, help='Override max skew in degrees')
+    parser.add_argument('--blur', type=float, help='Override blur radius')
+    args = parser.parse_args()
+
+    types = [t.strip() for t in args.types.split(',') if t.strip()]
+    qualities = [q.strip() for q in args.quality.split(',') if q.strip()]
+    for doc_type in types:
+        if doc_type not in BUILDERS:
+            parser.error(f"Unknown document type: {doc_type}")
+    for quality in qualities:
+        if quality not in QUALITY_PRESETS:
+            parser.error(f"Unknown quality preset: {quality}")
+
+    print(f"📄 Generating {args.count} documents into {args.output}")
+    manifest = generate_corpus(
+        args.output, args.count, types, qualities, args.format, args.seed, args.vendor, args.prefix,
+        {'noise': args.noise, 'skew': args.skew, 'blur': args.blur}, args.flat
+    )
+    pages = sum(doc['page_count'] for doc in manifest['documents'])
+    print(f"✅ Done: {manifest['count']} documents, {pages} pages, manifest at "
+          f"{os.path.join(args.output, 'manifest.json')}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+CPU Budget Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Splits the host's cores between concurrent Tesseract processes and the
+OpenMP threads inside each one.
+
+Tesseract runs parts of recognition on OpenMP threads, by default one per
+core. With pages of several jobs running in parallel, N processes each
+starting one thread per core oversubscribe the CPU many times over, and
+throughput drops below the sequential path. The budget keeps
+processes x threads within the cores:
+- threads: OMP_THREAD_LIMIT, inherited by every Tesseract subprocess
+- processes: the max_concurrency of engines that declare uses_cpu_budget
+  (unless ENGINE_CONCURRENCY overrides it)
+- affinity (optional): each running Tesseract is pinned to its own set of
+  `threads` cores, so processes do not migrate onto each other's cores
+
+The best split depends on the host and the documents; cpu_split_benchmark.py
+measures it.
+
+Configured once at startup, before OCRServices is created:
+    cpu_budget.configure(cores=0, threads=1, processes=0, affinity=False)
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+THREAD_LIMIT_VARIABLE = 'OMP_THREAD_LIMIT'
+
+
+def available_cores() -> List[int]:
+    """Cores this process may run on (its affinity mask, else all of them)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CpuBudget:
+    """Processes x threads split of the cores, with optional per-process pinning"""
+
+    def __init__(self, cores: int = 0, threads: int = 1, processes: int = 0, affinity: bool = False):
+        """
+        Args:
+            cores: Cores to use; 0 uses every available core
+            threads: OpenMP threads per Tesseract process
+            processes: Concurrent Tesseract processes; 0 fits as many as the cores allow
+            affinity: Pin each running process to its own cores (Linux only)
+        """
+        usable = available_cores()
+        self.cores = max(1, min(cores or len(usable), len(usable)))
+        self.threads = max(1, min(threads, self.cores))
+        self.processes = max(1, processes or self.cores // self.threads)
+        self.oversubscribed = self.processes * self.threads > self.cores
+        if self.oversubscribed:
+            logger.warning("CPU budget oversubscribed: %s processes x %s threads on %s cores",
+                           self.processes, self.threads, self.cores)
+
+        self._full_mask = set(usable)
+        self._core_sets = []
+        if affinity and not hasattr(os, 'sched_setaffinity'):
+            logger.warning("CPU affinity is not supported on this platform; not pinning")
+        elif affinity and self.oversubscribed:
+            logger.warning("CPU affinity needs processes x threads <= cores; not pinning")
+        elif affinity:
+            self._core_sets = [set(usable[index * self.threads:(index + 1) * self.threads])
+                               for index in range(self.processes)]
+        self.affinity = bool(self._core_sets)
+        self._condition = threading.Condition()
+
+    def apply_environment(self):
+        """Set the per-process thread limit for Tesseract subprocesses started from now on"""
+        os.environ[THREAD_LIMIT_VARIABLE] = str(self.threads)
+
+    @contextmanager
+    def pinned(self):
+        """
+        Pin the calling thread, and the processes it starts, to a free core set
+
+        Yields the core set, or None when affinity is off. Linux applies the
+        mask to the calling thread only, and child processes inherit it.
+        """
+        if not self.affinity:
+            yield None
+            return
+        with self._condition:
+            # Engine slots normally keep this from waiting; ENGINE_CONCURRENCY may allow more
+            while not self._core_sets:
+                self._condition.wait()
+            core_set = self._core_sets.pop()
+        try:
+            os.sched_setaffinity(0, core_set)
+            yield core_set
+        finally:
+            os.sched_setaffinity(0, self._full_mask)
+            with self._condition:
+                self._core_sets.append(core_set)
+                self._condition.notify()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'cores': self.cores,
+            'threads': self.threads,
+            'processes': self.processes,
+            'affinity': self.affinity,
+            'oversubscribed': self.oversubscribed
+        }
+
+
+# Until configure(): one process per core, OMP_THREAD_LIMIT left as it is
+budget = CpuBudget()
+
+
+def configure(cores: int = 0, threads: int = 1, processes: int = 0, affinity: bool = False) -> CpuBudget:
+    """Configure the module-level budget and export OMP_THREAD_LIMIT"""
+    global budget
+    budget = CpuBudget(cores, threads, processes, affinity)
+    budget.apply_environment()
+    for setting in ('cores', 'threads', 'processes'):
+        metrics.CPU_BUDGET.set(getattr(budget, setting), setting=setting)
+    logger.info("CPU budget: %s Tesseract processes x %s threads on %s cores%s", budget.processes,
+                budget.threads, budget.cores, ' (pinned)' if budget.affinity else '')
+    return budget
+
+
+def pinned():
+    """Pin with the module-level budget"""
+    return budget.pinned()
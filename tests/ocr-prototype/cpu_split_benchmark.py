@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+CPU Split Benchmark for OCR Testing Backend
+Finds the Tesseract processes x threads split with the best page throughput on this host
+
+Usage:
+    python cpu_split_benchmark.py                      # 24 generated pages, every split
+    python cpu_split_benchmark.py --pages 60 --affinity
+    python cpu_split_benchmark.py --images test-documents/generated --json split.json
+
+Every split OCRs the same pages with the tesseract CLI, through
+cpu_budget.CpuBudget like the server does. Two reference runs are added:
+'sequential' (one process, Tesseract's default threads) and 'unbounded'
+(one process per core, default threads), which is what the server did
+before the CPU budget. Results are written to
+benchmark-results/cpu-split-<timestamp>-<commit>.json.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmarks import RESULTS_FOLDER, create_test_image, git_commit
+from cpu_budget import THREAD_LIMIT_VARIABLE, CpuBudget, available_cores
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.pgm', '.ppm')
+
+
+def candidate_splits(cores: int) -> List[Dict]:
+    """Splits that use every core: threads in powers of two, processes = cores // threads"""
+    splits = [{'name': 'sequential', 'processes': 1, 'threads': None},
+              {'name': 'unbounded', 'processes': cores, 'threads': None}]
+    threads = 1
+    while threads <= cores:
+        splits.append({'name': f'{cores // threads}x{threads}', 'processes': cores // threads, 'threads': threads})
+        threads *= 2
+    return splits
+
+
+def prepare_pages(workdir: str, count: int, images: Optional[str]) -> List[str]:
+    """Page images to OCR: files from a folder, or generated bill-like pages"""
+    if images:
+        paths = sorted(os.path.join(images, name) for name in os.listdir(images)
+                       if name.lower().endswith(IMAGE_EXTENSIONS))
+        return paths[:count] if paths else []
+    paths = []
+    for index in range(count):
+        path = os.path.join(workdir, f'page-{index}.png')
+        create_test_image().save(path, 'PNG')
+        paths.append(path)
+    return paths
+
+
+def run_split(split: Dict, pages: List[str], cores: int, affinity: bool, tesseract_cmd: str) -> Dict:
+    """OCR every page with one split; returns throughput and per-page latency"""
+    env = dict(os.environ)
+    env.pop(THREAD_LIMIT_VARIABLE, None)
+    if split['threads']:
+        env[THREAD_LIMIT_VARIABLE] = str(split['threads'])
+    # Reference runs keep Tesseract's own threading, so they are never pinned
+    budget = CpuBudget(cores, split['threads'] or 1, split['processes'], affinity and bool(split['threads']))
+
+    def ocr(path):
+        start = time.perf_counter()
+        with budget.pinned():
+            subprocess.run([tesseract_cmd, path, 'stdout', '--psm', '6'], env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=split['processes']) as pool:
+        latencies = list(pool.map(ocr, pages))
+    elapsed = time.perf_counter() - start
+    return dict(
+        split,
+        pinned=budget.affinity,
+        seconds=round(elapsed, 3),
+        pages_per_sec=round(len(pages) / elapsed, 3),
+        page_median_ms=round(statistics.median(latencies) * 1000, 1)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the best Tesseract processes x threads split')
+    parser.add_argument('--pages', type=int, default=24, help='Pages OCRed per split')
+    parser.add_argument('--images', help='Folder of page images to use instead of generated pages')
+    parser.add_argument('--cores', type=int, default=0, help='Cores to budget (default: all available)')
+    parser.add_argument('--affinity', action='store_true', help='Pin each process to its own cores')
+    parser.add_argument('--tesseract-cmd', default='tesseract', help='Tesseract executable')
+    parser.add_argument('--json', help='Result file (default: benchmark-results/cpu-split-<timestamp>-<commit>.json)')
+    args = parser.parse_args()
+
+    print("⏱️  Tesseract CPU Split Benchmark")
+    print("=" * 78)
+
+    if not shutil.which(args.tesseract_cmd):
+        print(f"❌ {args.tesseract_cmd} not found; install Tesseract or pass --tesseract-cmd")
+        sys.exit(1)
+
+    cores = max(1, min(args.cores or len(available_cores()), len(available_cores())))
+    workdir = tempfile.mkdtemp(prefix='sme-cpu-split-')
+    results = []
+    try:
+        pages = prepare_pages(workdir, args.pages, args.images)
+        if not pages:
+            print(f"❌ No page images in {args.images}")
+            sys.exit(1)
+        print(f"   {len(pages)} pages, {cores} cores{', pinned' if args.affinity else ''}\n")
+
+        for split in candidate_splits(cores):
+            result = run_split(split, pages, cores, args.affinity, args.tesseract_cmd)
+            results.append(result)
+            threads = result['threads'] or 'default'
+            print(f"   {result['name']:<12} {result['processes']:>3} processes x {threads!s:>7} threads"
+                  f"   {result['pages_per_sec']:>7.2f} pages/s   page median {result['page_median_ms']:>8.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    budgeted = [result for result in results if result['threads']]
+    best = max(budgeted, key=lambda result: result['pages_per_sec'])
+    unbounded = next(result for result in results if result['name'] == 'unbounded')
+    print(f"\n🏆 Best split: {best['processes']} processes x {best['threads']} threads "
+          f"({best['pages_per_sec'] / unbounded['pages_per_sec']:.2f}x unbounded)")
+    print(f"   TESSERACT_PROCESSES={best['processes']} TESSERACT_THREADS={best['threads']}"
+          f"{' CPU_AFFINITY=true' if best['pinned'] else ''}")
+
+    commit = git_commit()
+    run = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'cores': cores,
+        'pages': len(pages),
+        'affinity': args.affinity,
+        'results': results,
+        'best': best['name']
+    }
+
+    output = args.json
+    if not output:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"cpu-split-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{commit}.json")
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n📁 Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
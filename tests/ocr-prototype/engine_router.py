@@ -0,0 +1,202 @@
+"""
+Engine Router Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Picks an OCR engine per document for the 'auto' service option.
+
+Each candidate engine gets an estimated latency (historical per-page
+latency x page count, plus upload time for cloud engines) and an estimated
+cost (unit cost per page x page count). The router then optimises for the
+configured target:
+- cheapest: lowest cost whose estimated latency fits the latency SLO
+- fastest: lowest latency whose estimated cost fits the budget
+
+When no engine is available with a closed (or half-open) breaker, the
+decision's 'chosen' is None and the request should be rejected.
+
+Every decision is returned as a plain dict so it can be stored in the job
+record and audited later.
+"""
+
+import math
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+TARGET_CHEAPEST = 'cheapest'
+TARGET_FASTEST = 'fastest'
+TARGETS = [TARGET_CHEAPEST, TARGET_FASTEST]
+
+
+def _limit(name: str, value: Any) -> float:
+    """A per-request routing limit as a float; ValueError for anything but a non-negative number"""
+    try:
+        limit = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}: {value!r} (expected a number)")
+    if not math.isfinite(limit) or limit < 0:
+        raise ValueError(f"Invalid {name}: {value!r} (expected a non-negative number)")
+    return limit
+
+
+class EngineRouter:
+    """Cost- and latency-aware engine selection with per-engine latency history"""
+
+    CLOUD_ENGINES = {'google', 'aws'}
+
+    def __init__(self, unit_costs: Dict[str, float], default_page_latency: Dict[str, float],
+                 target: str = TARGET_CHEAPEST, latency_slo: float = 30.0,
+                 budget: float = 0.05, upload_seconds_per_mb: float = 0.5,
+                 smoothing: float = 0.2):
+        """
+        Initialize router
+
+        Args:
+            unit_costs: Cost per page for each engine
+            default_page_latency: Per-page latency prior (seconds) used until
+                an engine has history
+            target: 'cheapest' (under latency SLO) or 'fastest' (under budget)
+            latency_slo: Maximum estimated seconds per document for 'cheapest'
+            budget: Maximum estimated cost per document for 'fastest'
+            upload_seconds_per_mb: Transfer time added for cloud engines
+            smoothing: Weight of the newest sample in the latency average
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Invalid routing target: {target}")
+
+        self.unit_costs = dict(unit_costs)
+        self.default_page_latency = dict(default_page_latency)
+        self.target = target
+        self.latency_slo = latency_slo
+        self.budget = budget
+        self.upload_seconds_per_mb = upload_seconds_per_mb
+        self.smoothing = smoothing
+
+        self._lock = threading.Lock()
+        self._history = {}  # engine -> {'page_latency': float, 'samples': int}
+
+    def record_latency(self, engine: str, seconds: float, pages: int):
+        """Fold one finished job into the engine's per-page latency average"""
+        if seconds is None or seconds < 0:
+            return
+        page_latency = seconds / max(1, pages or 1)
+
+        with self._lock:
+            history = self._history.get(engine)
+            if history is None:
+                self._history[engine] = {'page_latency': page_latency, 'samples': 1}
+            else:
+                history['page_latency'] += self.smoothing * (page_latency - history['page_latency'])
+                history['samples'] += 1
+
+    def get_page_latency(self, engine: str) -> Dict[str, Any]:
+        """Get per-page latency estimate and how many samples it is based on"""
+        with self._lock:
+            history = self._history.get(engine)
+            if history:
+                return {'page_latency': history['page_latency'], 'samples': history['samples']}
+        return {'page_latency': self.default_page_latency.get(engine, 1.0), 'samples': 0}
+
+    def estimate(self, engine: str, file_size: int, page_count: int) -> Dict[str, Any]:
+        """Estimate latency and cost of running one document on an engine"""
+        pages = max(1, page_count or 1)
+        latency = self.get_page_latency(engine)
+
+        est_latency = latency['page_latency'] * pages
+        if engine in self.CLOUD_ENGINES:
+            est_latency += (file_size / (1024 * 1024)) * self.upload_seconds_per_mb
+
+        return {
+            'engine': engine,
+            'page_latency': round(latency['page_latency'], 3),
+            'latency_samples': latency['samples'],
+            'unit_cost': self.unit_costs.get(engine, 0.0),
+            'est_latency': round(est_latency, 3),
+            'est_cost': round(self.unit_costs.get(engine, 0.0) * pages, 6)
+        }
+
+    def choose(self, file_size: int, page_count: int, candidates: Dict[str, Dict[str, Any]],
+               target: Optional[str] = None, latency_slo: Optional[float] = None,
+               budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Choose an engine for one document
+
+        Args:
+            file_size: Document size in bytes
+            page_count: Number of pages
+            candidates: engine -> {'available': bool, 'breaker_state': str}
+            target, latency_slo, budget: Per-request overrides
+
+        Returns:
+            Routing decision with the chosen engine (None when no candidate
+            is eligible), the reason and every candidate's estimates
+        """
+        target = target or self.target
+        if target not in TARGETS:
+            raise ValueError(f"Invalid routing target: {target}. Choose: {', '.join(TARGETS)}")
+        latency_slo = self.latency_slo if latency_slo is None else _limit('latency_slo', latency_slo)
+        budget = self.budget if budget is None else _limit('budget', budget)
+
+        estimates = []
+        for engine, state in candidates.items():
+            estimate = self.estimate(engine, file_size, page_count)
+            estimate['available'] = bool(state.get('available'))
+            estimate['breaker_state'] = state.get('breaker_state')
+            estimate['eligible'] = estimate['available'] and estimate['breaker_state'] != 'open'
+            estimates.append(estimate)
+
+        eligible = [e for e in estimates if e['eligible']]
+
+        if not eligible:
+            chosen = None
+            reason = 'no engine available (unavailable or circuit breaker open)'
+        elif target == TARGET_CHEAPEST:
+            within = [e for e in eligible if e['est_latency'] <= latency_slo]
+            if within:
+                best = min(within, key=lambda e: (e['est_cost'], e['est_latency']))
+                reason = f"cheapest engine within latency SLO {latency_slo}s"
+            else:
+                best = min(eligible, key=lambda e: (e['est_latency'], e['est_cost']))
+                reason = f"no engine within latency SLO {latency_slo}s, chose fastest"
+            chosen = best['engine']
+        else:
+            within = [e for e in eligible if e['est_cost'] <= budget]
+            if within:
+                best = min(within, key=lambda e: (e['est_latency'], e['est_cost']))
+                reason = f"fastest engine within budget {budget}"
+            else:
+                best = min(eligible, key=lambda e: (e['est_cost'], e['est_latency']))
+                reason = f"no engine within budget {budget}, chose cheapest"
+            chosen = best['engine']
+
+        decision = {
+            'chosen': chosen,
+            'reason': reason,
+            'target': target,
+            'latency_slo': latency_slo,
+            'budget': budget,
+            'inputs': {
+                'file_size': file_size,
+                'page_count': page_count
+            },
+            'candidates': estimates,
+            'decided_at': datetime.utcnow().isoformat()
+        }
+
+        logger.info("Router chose %s (%s) for %s pages, %s bytes", chosen, reason, page_count, file_size)
+        return decision
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get router settings and latency history"""
+        with self._lock:
+            history = {engine: dict(h) for engine, h in self._history.items()}
+        return {
+            'target': self.target,
+            'latency_slo': self.latency_slo,
+            'budget': self.budget,
+            'unit_costs': self.unit_costs,
+            'history': history
+        }
@@ -0,0 +1,512 @@
+"""
+OCR Engines Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Engine plugin interface and the built-in Tesseract, Google Vision and AWS
+Textract engines.
+
+An engine declares what it can do in EngineCapabilities:
+- max_concurrency: calls allowed at once across all jobs
+- input_kinds: 'pdf' (whole document), 'image_file' (page image on disk),
+  'image_bytes' (encoded page image), 'page' (in-memory PIL image)
+- batch_size: inputs accepted per recognize() call
+- max_pages / max_bytes: limits for a single 'pdf' input
+
+The scheduler in OCRServices reads these declarations to decide whether to
+send a PDF whole or rasterize it, how to batch pages and how many batches
+to run in parallel. Engines only turn inputs into page results; reading
+files, PDF handling and result shaping live in the scheduler.
+
+New engines subclass OCREngine and are added with register_engine().
+"""
+
+import io
+import os
+import time
+import logging
+import importlib
+import importlib.util
+import threading
+from typing import Dict, Any, List, Optional
+
+from PIL import Image
+
+import metrics
+import tracing
+import cpu_budget
+
+logger = logging.getLogger(__name__)
+
+INPUT_PDF = 'pdf'
+INPUT_IMAGE_FILE = 'image_file'
+INPUT_IMAGE_BYTES = 'image_bytes'
+INPUT_PAGE = 'page'
+INPUT_KINDS = [INPUT_PDF, INPUT_IMAGE_FILE, INPUT_IMAGE_BYTES, INPUT_PAGE]
+
+# Page files that need re-encoding before upload
+RAW_IMAGE_EXTENSIONS = ('.ppm', '.pgm', '.pbm')
+
+_engine_modules = {}
+_engine_modules_lock = threading.Lock()
+
+
+def _sdk_installed(module_name: str) -> bool:
+    """Check whether an engine SDK is installed without importing it"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Installed-ness only; the SDKs themselves are imported lazily below
+TESSERACT_AVAILABLE = _sdk_installed('pytesseract')
+GOOGLE_VISION_AVAILABLE = _sdk_installed('google.cloud.vision')
+AWS_AVAILABLE = _sdk_installed('boto3')
+
+
+def load_engine_module(module_name: str):
+    """
+    Import an engine SDK on first use
+
+    Returns the module, or None if it is not installed. The result is cached,
+    so only the first caller pays the import cost.
+    """
+    with _engine_modules_lock:
+        if module_name not in _engine_modules:
+            start_time = time.perf_counter()
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                logger.info("Engine SDK %s not available: %s", module_name, e)
+                module = None
+            _engine_modules[module_name] = module
+            logger.info("Imported %s in %.0fms", module_name, (time.perf_counter() - start_time) * 1000)
+        return _engine_modules[module_name]
+
+
+def get_pytesseract():
+    return load_engine_module('pytesseract')
+
+
+def get_vision():
+    return load_engine_module('google.cloud.vision')
+
+
+def get_boto3():
+    return load_engine_module('boto3')
+
+
+def parse_tesseract_data(data: Dict[str, List]):
+    """
+    Extract words and their confidences from pytesseract image_to_data output
+
+    Returns:
+        (words, confidences) for non-empty words; a confidence of -1
+        (no confidence available) is reported as 0
+    """
+    page_text = []
+    confidences = []
+
+    for i, word in enumerate(data['text']):
+        if word.strip():  # Only non-empty words
+            page_text.append(word)
+            conf = int(data['conf'][i]) if data['conf'][i] != '-1' else 0
+            confidences.append(conf)
+
+    return page_text, confidences
+
+
+class EngineCapabilities:
+    """What an engine accepts and how hard it may be driven"""
+
+    def __init__(self, input_kinds, max_concurrency: int = 1, batch_size: int = 1,
+                 max_pages: Optional[int] = None, max_bytes: Optional[int] = None):
+        unknown = set(input_kinds) - set(INPUT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown input kinds: {', '.join(sorted(unknown))}")
+        if not (set(input_kinds) - {INPUT_PDF}):
+            raise ValueError("Engines must accept at least one page input kind")
+        self.input_kinds = list(input_kinds)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+
+    def accepts_pdf(self, page_count: int, size: int) -> bool:
+        """True if a PDF of this size can be sent as one input"""
+        if INPUT_PDF not in self.input_kinds:
+            return False
+        if self.max_pages is not None and page_count > self.max_pages:
+            return False
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+        return True
+
+    def page_input_kind(self) -> str:
+        """Preferred kind for single pages: files avoid copies, then bytes, then in-memory"""
+        for kind in (INPUT_IMAGE_FILE, INPUT_IMAGE_BYTES, INPUT_PAGE):
+            if kind in self.input_kinds:
+                return kind
+        raise ValueError("Engine accepts no page input kind")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'input_kinds': self.input_kinds,
+            'max_concurrency': self.max_concurrency,
+            'batch_size': self.batch_size,
+            'max_pages': self.max_pages,
+            'max_bytes': self.max_bytes
+        }
+
+
+class EngineInput:
+    """One unit of work for an engine: a whole PDF or a single page"""
+
+    __slots__ = ('kind', 'page_number', 'page_count', 'path', 'data', 'buffer')
+
+    def __init__(self, kind: str, page_number: int = 1, page_count: int = 1,
+                 path: str = None, data: Any = None, buffer=None):
+        self.kind = kind
+        self.page_number = page_number
+        self.page_count = page_count
+        self.path = path
+        self.data = data
+        self.buffer = buffer  # PageBuffer holding the page at path, if any
+
+    def release(self):
+        """Drop the input's in-memory page and its page buffer reference"""
+        self.data = None
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+
+    def read_bytes(self) -> bytes:
+        """Encoded content for engines that upload bytes"""
+        if isinstance(self.data, bytes):
+            return self.data
+        if self.data is not None:
+            encoded = io.BytesIO()
+            self.data.save(encoded, 'PNG')
+            content = encoded.getvalue()
+        elif self.path.lower().endswith(RAW_IMAGE_EXTENSIONS):
+            # Cloud APIs take PNG/JPEG, not the raw pages the parallel rasterizer writes
+            encoded = io.BytesIO()
+            with Image.open(self.path) as img:
+                img.save(encoded, 'PNG')
+            content = encoded.getvalue()
+        else:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        metrics.PAGE_BYTES_COPIED.inc(len(content), stage='read')
+        return content
+
+
+def page_result(text: str, confidence: float, words: int = None, pages: int = 1,
+                error: str = None) -> Dict[str, Any]:
+    """Result of recognizing one input; confidence is 0-1, error marks a page that failed"""
+    result = {
+        'text': text or '',
+        'confidence': confidence,
+        'words': len(text.split()) if words is None and text else (words or 0),
+        'pages': pages
+    }
+    if error:
+        result['error'] = error
+    return result
+
+
+class OCREngine:
+    """
+    Base class for OCR engine plugins
+
+    Subclasses set name, display_name, result_service and capabilities and
+    implement is_available() and recognize().
+    """
+
+    name = None             # API service name (tesseract, google, aws)
+    display_name = None     # Used in error messages
+    result_service = None   # 'service' field of the OCR result
+    capabilities = None     # EngineCapabilities
+    uses_cpu_budget = False  # Local engine; max_concurrency comes from cpu_budget
+
+    def __init__(self, capabilities: EngineCapabilities = None):
+        if capabilities is not None:
+            self.capabilities = capabilities
+        self.slots = threading.BoundedSemaphore(self.capabilities.max_concurrency)
+
+    def is_available(self) -> bool:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Import SDKs / create clients ahead of the first call"""
+
+    def recognize(self, inputs: List[EngineInput]) -> List[Dict[str, Any]]:
+        """Recognize a batch of inputs, returning one page_result per input"""
+        raise NotImplementedError
+
+    def unavailable_result(self, file_path: str) -> Dict[str, Any]:
+        """Result when the engine is unavailable; raises unless the engine offers a mock"""
+        raise RuntimeError(f"{self.display_name} is not available")
+
+
+_engine_types = {}
+
+
+def register_engine(engine_class):
+    """Register an engine class under its name (replaces any existing one)"""
+    if not engine_class.name:
+        raise ValueError("Engine classes must set name")
+    _engine_types[engine_class.name] = engine_class
+    return engine_class
+
+
+def engine_types() -> Dict[str, type]:
+    """Registered engine classes by service name"""
+    return dict(_engine_types)
+
+
+@register_engine
+class TesseractEngine(OCREngine):
+    """Local Tesseract; pages only, one page per call, parallel within the CPU budget"""
+
+    name = 'tesseract'
+    display_name = 'Tesseract'
+    result_service = 'tesseract'
+    capabilities = EngineCapabilities(
+        input_kinds=[INPUT_IMAGE_FILE, INPUT_PAGE],
+        max_concurrency=os.cpu_count() or 2,
+        batch_size=1
+    )
+    uses_cpu_budget = True
+
+    def is_available(self) -> bool:
+        pytesseract = get_pytesseract()
+        if not pytesseract:
+            return False
+        try:
+            pytesseract.get_tesseract_version()
+            return True
+        except Exception as e:
+            logger.error("Tesseract not available: %s", e)
+            return False
+
+    def warm_up(self):
+        pytesseract = get_pytesseract()
+        if pytesseract:
+            try:
+                logger.info("Tesseract available: %s", pytesseract.get_tesseract_version())
+            except Exception as e:
+                logger.warning("Tesseract setup issue: %s", e)
+
+    def recognize(self, inputs: List[EngineInput]) -> List[Dict[str, Any]]:
+        pytesseract = get_pytesseract()
+        results = []
+        for item in inputs:
+            try:
+                with cpu_budget.pinned(), metrics.PAGE_OCR_SECONDS.time(engine=self.name), \
+                        tracing.span('tesseract.image_to_data', page=item.page_number):
+                    data = pytesseract.image_to_data(
+                        item.data if item.kind == INPUT_PAGE else item.path,
+                        output_type=pytesseract.Output.DICT,
+                        config='--psm 6'  # Uniform block of text
+                    )
+                words, confidences = parse_tesseract_data(data)
+                confidence = (sum(confidences) / len(confidences) / 100.0) if words and confidences else 0.0
+                logger.info("Tesseract processed page: %s words", len(words))
+                results.append(page_result(' '.join(words), confidence, len(words)))
+            except Exception as e:
+                # A bad page should not fail the whole document
+                logger.error("Error processing page %s: %s", item.page_number, e)
+                results.append(page_result('', 0.0, 0, error=str(e)))
+        return results
+
+
+@register_engine
+class GoogleVisionEngine(OCREngine):
+    """
+    Google Cloud Vision
+
+    Small PDFs go in one call; otherwise pages are sent in
+    batch_annotate_images requests of up to 16 images.
+    """
+
+    name = 'google'
+    display_name = 'Google Vision'
+    result_service = 'google_vision'
+    capabilities = EngineCapabilities(
+        input_kinds=[INPUT_PDF, INPUT_IMAGE_BYTES],
+        max_concurrency=8,
+        batch_size=16,
+        max_pages=5,
+        max_bytes=20 * 1024 * 1024
+    )
+
+    def __init__(self, capabilities: EngineCapabilities = None):
+        super().__init__(capabilities)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        """Create the Vision client once and reuse it"""
+        with self._client_lock:
+            if self._client is None:
+                self._client = get_vision().ImageAnnotatorClient()
+            return self._client
+
+    def is_available(self) -> bool:
+        if not GOOGLE_VISION_AVAILABLE or not get_vision():
+            return False
+        try:
+            if os.getenv('GOOGLE_VISION_API_KEY') or os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+                self.client()
+                return True
+            logger.info("No Google Vision credentials found")
+            return False
+        except Exception as e:
+            logger.error("Google Vision not available: %s", e)
+            return False
+
+    def warm_up(self):
+        if GOOGLE_VISION_AVAILABLE:
+            if os.getenv('GOOGLE_APPLICATION_CREDENTIALS') or os.getenv('GOOGLE_CLOUD_PROJECT'):
+                get_vision()
+                logger.info("Google Vision API credentials found")
+            else:
+                logger.info("Google Vision API available but no credentials configured")
+
+    def recognize(self, inputs: List[EngineInput]) -> List[Dict[str, Any]]:
+        vision = get_vision()
+        with tracing.span('google.client_init'):
+            client = self.client()
+
+        if len(inputs) == 1 and inputs[0].kind == INPUT_PDF:
+            content = inputs[0].read_bytes()
+            with tracing.span('google.document_text_detection', bytes=len(content)):
+                response = client.document_text_detection(image=vision.Image(content=content))
+            if response.error.message:
+                raise Exception(f"Google Vision PDF error: {response.error.message}")
+            annotation = response.full_text_annotation
+            text = annotation.text if annotation else ''
+            pages = len(annotation.pages) if annotation and annotation.pages else 1
+            logger.info("Google Vision processed PDF: %s chars, %s pages", len(text), pages)
+            return [page_result(text, 0.95 if text.strip() else 0.0, pages=pages)]
+
+        requests = []
+        total_bytes = 0
+        for item in inputs:
+            content = item.read_bytes()
+            total_bytes += len(content)
+            requests.append(vision.AnnotateImageRequest(
+                image=vision.Image(content=content),
+                features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)]
+            ))
+        with metrics.PAGE_OCR_SECONDS.time(engine=self.name), \
+                tracing.span('google.batch_annotate_images', images=len(requests), bytes=total_bytes):
+            response = client.batch_annotate_images(requests=requests)
+
+        results = []
+        for item, annotated in zip(inputs, response.responses):
+            if annotated.error.message:
+                raise Exception(f"Google Vision image error (page {item.page_number}): {annotated.error.message}")
+            text = annotated.text_annotations[0].description if annotated.text_annotations else ''
+            results.append(page_result(text, 0.95 if text.strip() else 0.0))
+        logger.info("Google Vision processed %s image(s)", len(results))
+        return results
+
+    def unavailable_result(self, file_path: str) -> Dict[str, Any]:
+        """Mock response when the API is not configured"""
+        logger.info("Generating mock Google Vision response (API not configured)")
+        return {
+            'text': 'MOCK RESPONSE - Google Vision API\n\nThis is a simulated OCR result for testing purposes.\n\nActual file: ' + os.path.basename(file_path) + '\n\nTo get real results, configure Google Vision API credentials.',
+            'confidence': 0.0,
+            'service': 'google_vision_mock',
+            'processing_time': 0.5,
+            'pages_processed': 1,
+            'words_found': 20
+        }
+
+
+@register_engine
+class TextractEngine(OCREngine):
+    """
+    AWS Textract (synchronous DetectDocumentText)
+
+    The synchronous API takes single-page PDFs only, so multi-page PDFs
+    are rasterized and their pages sent in parallel.
+    """
+
+    name = 'aws'
+    display_name = 'AWS Textract'
+    result_service = 'aws_textract'
+    capabilities = EngineCapabilities(
+        input_kinds=[INPUT_PDF, INPUT_IMAGE_BYTES],
+        max_concurrency=5,
+        batch_size=1,
+        max_pages=1,
+        max_bytes=10 * 1024 * 1024
+    )
+
+    def __init__(self, capabilities: EngineCapabilities = None):
+        super().__init__(capabilities)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def client(self):
+        """Create the Textract client once and reuse it"""
+        with self._client_lock:
+            if self._client is None:
+                self._client = get_boto3().client('textract')
+            return self._client
+
+    def is_available(self) -> bool:
+        if not AWS_AVAILABLE or not get_boto3():
+            return False
+        try:
+            self.client()
+            return True
+        except Exception as e:
+            logger.error("AWS Textract not available: %s", e)
+            return False
+
+    def warm_up(self):
+        if AWS_AVAILABLE:
+            if os.getenv('AWS_ACCESS_KEY_ID') or os.path.exists(os.path.expanduser('~/.aws/credentials')):
+                get_boto3()
+                logger.info("AWS credentials found")
+            else:
+                logger.info("AWS Textract available but no credentials configured")
+
+    def recognize(self, inputs: List[EngineInput]) -> List[Dict[str, Any]]:
+        with tracing.span('aws.client_init'):
+            client = self.client()
+
+        results = []
+        for item in inputs:
+            with metrics.PAGE_OCR_SECONDS.time(engine=self.name), \
+                    tracing.span('aws.detect_document_text', page=item.page_number):
+                response = client.detect_document_text(Document={'Bytes': item.read_bytes()})
+
+            lines = []
+            total_confidence = 0
+            word_count = 0
+            for block in response['Blocks']:
+                if block['BlockType'] == 'LINE':
+                    lines.append(block['Text'])
+                elif block['BlockType'] == 'WORD':
+                    total_confidence += block['Confidence']
+                    word_count += 1
+            confidence = (total_confidence / word_count / 100.0) if word_count else 0.0
+            results.append(page_result('\n'.join(lines), confidence, word_count, pages=item.page_count))
+        return results
+
+    def unavailable_result(self, file_path: str) -> Dict[str, Any]:
+        """Mock response when AWS is not configured"""
+        logger.info("Generating mock AWS Textract response (API not configured)")
+        return {
+            'text': 'MOCK RESPONSE - AWS Textract\n\nThis is a simulated OCR result for testing purposes.\n\nActual file: ' + os.path.basename(file_path) + '\n\nTo get real results, configure AWS credentials.',
+            'confidence': 0.0,
+            'service': 'aws_textract_mock',
+            'processing_time': 0.7,
+            'pages_processed': 1,
+            'words_found': 18
+        }
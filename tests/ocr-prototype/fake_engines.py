@@ -0,0 +1,86 @@
+"""
+Fake OCR Engines Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Drop-in replacement for OCRServices that never calls Tesseract or a cloud
+API. Each engine sleeps for a configurable per-page latency and returns a
+canned result, so load tests and benchmarks exercise the real HTTP,
+storage, scheduling and bookkeeping paths without OCR dependencies.
+
+Fake engines accept whole PDFs (no Poppler needed) and page image files.
+
+Enabled in server.py with FAKE_ENGINES=true.
+"""
+
+import os
+import time
+import random
+import logging
+from typing import Dict, Any, List
+
+from ocr_services import OCRServices
+from engines import OCREngine, EngineCapabilities, EngineInput, page_result, INPUT_PDF, INPUT_IMAGE_FILE
+
+logger = logging.getLogger(__name__)
+
+RESULT_SERVICES = {
+    'tesseract': 'tesseract',
+    'google': 'google_vision',
+    'aws': 'aws_textract'
+}
+
+
+class FakeEngine(OCREngine):
+    """Engine that sleeps page_latency per page"""
+
+    capabilities = EngineCapabilities(
+        input_kinds=[INPUT_PDF, INPUT_IMAGE_FILE],
+        max_concurrency=64,
+        batch_size=1
+    )
+
+    def __init__(self, name: str, page_latency: float, error_rate: float,
+                 capabilities: EngineCapabilities = None):
+        self.name = name
+        self.display_name = f"Fake {name}"
+        self.result_service = RESULT_SERVICES.get(name, name)
+        self.page_latency = page_latency
+        self.error_rate = error_rate
+        super().__init__(capabilities)
+
+    def is_available(self) -> bool:
+        return True
+
+    def recognize(self, inputs: List[EngineInput]) -> List[Dict[str, Any]]:
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError(f"Fake {self.name} failure")
+
+        results = []
+        for item in inputs:
+            time.sleep(self.page_latency * item.page_count)
+            text = '\n\n'.join(
+                f"FAKE {self.name.upper()} PAGE {page} {os.path.basename(item.path or '')}"
+                for page in range(item.page_number, item.page_number + item.page_count)
+            )
+            results.append(page_result(text, 0.9, pages=item.page_count))
+        return results
+
+
+class FakeOCRServices(OCRServices):
+    """OCRServices with simulated engines"""
+
+    def __init__(self, page_latency: float = 0.05, error_rate: float = 0.0):
+        """
+        Args:
+            page_latency: Simulated seconds per page
+            error_rate: Fraction of calls that raise, for breaker testing
+        """
+        self.page_latency = page_latency
+        self.error_rate = error_rate
+        super().__init__()
+
+    def _create_engines(self) -> Dict[str, OCREngine]:
+        return {name: FakeEngine(name, self.page_latency, self.error_rate) for name in self.SERVICES}
+
+    def _setup_services(self):
+        logger.info("Using fake OCR engines (page_latency=%.3fs)", self.page_latency)
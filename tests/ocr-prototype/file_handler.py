@@ -3,20 +3,26 @@ File Handler Module
 Smart Data Extractor (SME) - OCR Testing Backend
 
 Handles file uploads, conversions, and temporary storage management.
-Supports PDF to image conversion using pdf2image.
+Supports PDF to image conversion using pdf2image (see rasterizer.py).
 """
 
 import os
+import re
 import time
 import logging
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
-from pdf2image import convert_from_path
+from pdf2image import pdfinfo_from_path
 from PIL import Image
 import tempfile
 
+import metrics
+import tracing
+import memory_budget
+import rasterizer
+
 logger = logging.getLogger(__name__)
 
 class FileHandler:
@@ -24,6 +30,7 @@ class FileHandler:
     
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    RENDER_DPI = 200  # PDF pages are rasterized at this resolution for OCR
     
     def __init__(self, upload_folder: str):
         """Initialize file handler with upload directory"""
@@ -33,7 +40,7 @@ class FileHandler:
     def ensure_upload_folder(self):
         """Create upload folder if it doesn't exist"""
         os.makedirs(self.upload_folder, exist_ok=True)
-        logger.info(f"Upload folder ready: {self.upload_folder}")
+        logger.info("Upload folder ready: %s", self.upload_folder)
     
     def allowed_file(self, filename: str) -> bool:
         """Check if file extension is allowed"""
@@ -67,19 +74,22 @@ class FileHandler:
             file_path = os.path.join(self.upload_folder, secure_name)
             
             # Save file
-            file.save(file_path)
-            
-            # Verify file size
-            file_size = os.path.getsize(file_path)
+            with tracing.span('save_file', file_id=file_id) as span:
+                file.save(file_path)
+                
+                # Verify file size
+                file_size = os.path.getsize(file_path)
+                if span:
+                    span.set_attribute('bytes', file_size)
             if file_size > self.MAX_FILE_SIZE:
                 os.remove(file_path)
                 raise ValueError(f"File too large: {file_size} bytes > {self.MAX_FILE_SIZE} bytes")
             
-            logger.info(f"File saved: {file_path} ({file_size} bytes)")
+            logger.info("File saved: %s (%s bytes)", file_path, file_size)
             return file_path
             
         except Exception as e:
-            logger.error(f"File save error: {str(e)}")
+            logger.error("File save error: %s", e)
             raise
     
     def file_exists(self, file_id: str) -> bool:
@@ -103,48 +113,85 @@ class FileHandler:
         """Check if file is a PDF"""
         return file_path.lower().endswith('.pdf')
     
-    def convert_pdf_to_images(self, pdf_path: str, dpi: int = 200) -> List[str]:
+    def get_page_count(self, file_path: str) -> int:
+        """
+        Get number of pages in a file
+        
+        Uses pdfinfo for PDFs and falls back to counting page objects
+        when Poppler is not installed. Images always count as one page.
+        """
+        if not self.is_pdf(file_path):
+            return 1
+        
+        try:
+            return int(pdfinfo_from_path(file_path)['Pages'])
+        except Exception as e:
+            logger.warning("pdfinfo failed, counting page objects instead: %s", e)
+        
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        return max(1, len(re.findall(rb'/Type\s*/Page(?!s)', content)))
+    
+    def get_page_points(self, file_path: str) -> Tuple[float, float]:
+        """
+        Largest page size of a PDF in points (width, height)
+        
+        Reads /MediaBox entries directly and falls back to pdfinfo (first
+        page only), then to US Letter.
+        """
+        with open(file_path, 'rb') as f:
+            points = memory_budget.pdf_page_points(f.read())
+        if points:
+            return points
+        
+        try:
+            match = re.match(r'([\d.]+) x ([\d.]+)', pdfinfo_from_path(file_path).get('Page size', ''))
+            if match:
+                return float(match.group(1)), float(match.group(2))
+        except Exception as e:
+            logger.warning("pdfinfo failed, assuming Letter page size: %s", e)
+        return memory_budget.DEFAULT_PAGE_POINTS
+    
+    def convert_pdf_to_images(self, pdf_path: str, dpi: int = RENDER_DPI, pages: Optional[List[int]] = None,
+                              output_folder: Optional[str] = None) -> List[str]:
         """
         Convert PDF to images and return list of image paths
         
+        Rendering is done by the configured rasterizer backend (see
+        rasterizer.py) under the process-wide memory budget.
+        
         Args:
             pdf_path: Path to PDF file
             dpi: Resolution for conversion (default 200)
+            pages: Page numbers to convert (default all)
+            output_folder: Where page images go (default the upload folder)
             
         Returns:
-            List of image file paths
+            List of image file paths, in page order
         """
         try:
             if not os.path.exists(pdf_path):
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            logger.info(f"Converting PDF to images: {pdf_path}")
-            
-            # Convert PDF to images
-            images = convert_from_path(pdf_path, dpi=dpi)
-            
-            if not images:
-                raise ValueError("No pages found in PDF")
+            logger.info("Converting PDF to images: %s", pdf_path)
             
-            # Save images temporarily
-            image_paths = []
-            base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+            page_count = self.get_page_count(pdf_path)
             
-            for i, image in enumerate(images):
-                image_filename = f"{base_name}_page_{i+1}.png"
-                image_path = os.path.join(self.upload_folder, image_filename)
+            with tracing.span('convert_pdf_to_images', dpi=dpi) as span:
+                image_paths = rasterizer.render(pdf_path, output_folder or self.upload_folder, dpi, page_count,
+                                                self.get_page_points(pdf_path), pages)
                 
-                # Save as PNG for better OCR quality
-                image.save(image_path, 'PNG', optimize=True)
-                image_paths.append(image_path)
+                if not image_paths and pages is None:
+                    raise ValueError("No pages found in PDF")
                 
-                logger.info(f"Saved PDF page {i+1}: {image_path}")
+                if span:
+                    span.set_attribute('pages', len(image_paths))
             
-            logger.info(f"PDF conversion completed: {len(images)} pages")
+            logger.info("PDF conversion completed: %s pages", len(image_paths))
             return image_paths
             
         except Exception as e:
-            logger.error(f"PDF conversion error: {str(e)}")
+            logger.error("PDF conversion error: %s", e)
             raise
     
     def prepare_file_for_ocr(self, file_path: str) -> List[str]:
@@ -170,15 +217,15 @@ class FileHandler:
                 return [file_path]
                 
         except Exception as e:
-            logger.error(f"File preparation error: {str(e)}")
+            logger.error("File preparation error: %s", e)
             raise
     
     def validate_image(self, image_path: str):
         """Validate image file can be opened"""
         try:
-            with Image.open(image_path) as img:
+            with metrics.STAGE_SECONDS.time(stage='preprocess'), Image.open(image_path) as img:
                 img.verify()  # Verify image integrity
-            logger.info(f"Image validated: {image_path}")
+            logger.info("Image validated: %s", image_path)
         except Exception as e:
             raise ValueError(f"Invalid image file: {str(e)}")
     
@@ -212,7 +259,7 @@ class FileHandler:
             return info
             
         except Exception as e:
-            logger.error(f"Get file info error: {str(e)}")
+            logger.error("Get file info error: %s", e)
             raise
     
     def cleanup_old_files(self, age_hours: int = 24) -> int:
@@ -242,15 +289,15 @@ class FileHandler:
                         try:
                             os.remove(file_path)
                             deleted_count += 1
-                            logger.info(f"Deleted old file: {filename}")
+                            logger.info("Deleted old file: %s", filename)
                         except Exception as e:
-                            logger.error(f"Failed to delete {filename}: {str(e)}")
+                            logger.error("Failed to delete %s: %s", filename, e)
             
-            logger.info(f"Cleanup completed: {deleted_count} files deleted")
+            logger.info("Cleanup completed: %s files deleted", deleted_count)
             return deleted_count
             
         except Exception as e:
-            logger.error(f"Cleanup error: {str(e)}")
+            logger.error("Cleanup error: %s", e)
             return 0
     
     def delete_file(self, file_path: str) -> bool:
@@ -258,11 +305,11 @@ class FileHandler:
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                logger.info(f"File deleted: {file_path}")
+                logger.info("File deleted: %s", file_path)
                 return True
             return False
         except Exception as e:
-            logger.error(f"Delete file error: {str(e)}")
+            logger.error("Delete file error: %s", e)
             return False
     
     def delete_files_by_id(self, file_id: str) -> int:
@@ -281,6 +328,6 @@ class FileHandler:
                     if self.delete_file(file_path):
                         deleted_count += 1
         except Exception as e:
-            logger.error(f"Error deleting page images: {str(e)}")
+            logger.error("Error deleting page images: %s", e)
         
         return deleted_count
\ No newline at end of file
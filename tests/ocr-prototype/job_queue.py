@@ -0,0 +1,219 @@
+"""
+Job Queue Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Priority lanes for OCR jobs. Jobs are queued per lane and a fixed set of
+worker threads picks the next job with smooth weighted round-robin across
+the lanes that have work: with weights interactive=4, bulk=1, four
+interactive jobs start for every bulk job while both lanes are busy, and
+either lane gets every worker when the other is empty. A client uploading
+hundreds of PDFs then delays a single receipt by at most a few job
+starts instead of the whole backlog.
+
+Workers can also be reserved for a lane so a burst of long bulk jobs never
+occupies every thread. The shared workers can be resized at runtime (see
+autoscaler.py); reserved workers stay.
+
+Lanes:
+- interactive: short documents a person is waiting on
+- bulk: batch uploads and long documents
+
+Usage:
+    dispatcher = LaneDispatcher(workers=8, weights={'interactive': 4, 'bulk': 1},
+                                reserved={'interactive': 1})
+    future = dispatcher.submit('bulk', run_job, process_id)
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+LANES = ('interactive', 'bulk')
+
+
+def infer_lane(page_count: int, interactive_max_pages: int) -> str:
+    """Lane for a job that did not ask for one: short documents are interactive"""
+    return 'interactive' if page_count <= interactive_max_pages else 'bulk'
+
+
+class LanePicker:
+    """Smooth weighted round-robin over the lanes that have work"""
+
+    def __init__(self, weights: Optional[Dict[str, int]] = None):
+        weights = weights or {}
+        for lane in weights:
+            if lane not in LANES:
+                raise ValueError(f"Unknown lane: {lane!r} (expected one of {', '.join(LANES)})")
+        self.weights = {lane: max(1, int(weights.get(lane, 1))) for lane in LANES}
+        self._credit = {lane: 0 for lane in LANES}
+
+    def pick(self, ready) -> Optional[str]:
+        """Next lane among ready (lanes with queued jobs); None when none are ready"""
+        ready = list(ready)
+        if len(ready) <= 1:
+            return ready[0] if ready else None
+        total = sum(self.weights[lane] for lane in ready)
+        for lane in ready:
+            self._credit[lane] += self.weights[lane]
+        chosen = max(ready, key=lambda lane: self._credit[lane])
+        self._credit[chosen] -= total
+        return chosen
+
+
+class LaneDispatcher:
+    """Worker threads serving per-lane FIFO queues by weight"""
+
+    def __init__(self, workers: int, weights: Optional[Dict[str, int]] = None,
+                 reserved: Optional[Dict[str, int]] = None, name: str = 'job'):
+        """
+        Args:
+            workers: Worker threads (jobs running at once)
+            weights: Relative share of job starts per lane while lanes compete (default 1 each)
+            reserved: Workers that only take jobs from the given lane
+            name: Worker thread name prefix
+        """
+        reserved = reserved or {}
+        for lane in reserved:
+            if lane not in LANES:
+                raise ValueError(f"Unknown lane: {lane!r} (expected one of {', '.join(LANES)})")
+
+        self.workers = max(1, workers)
+        self.name = name
+        self._picker = LanePicker(weights)
+        self.weights = self._picker.weights
+        self._queues = {lane: deque() for lane in LANES}
+        self._busy = 0
+        self._retiring = 0
+        self._started = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Reserved workers come first; at least one worker always serves every lane
+        lane_sets = []
+        for lane in LANES:
+            lane_sets += [(lane,)] * max(0, int(reserved.get(lane, 0)))
+        if len(lane_sets) >= self.workers:
+            logger.warning("%s reserved workers leave none for every lane; keeping %s",
+                           len(lane_sets), self.workers - 1)
+            lane_sets = lane_sets[:self.workers - 1]
+        lane_sets += [LANES] * (self.workers - len(lane_sets))
+        self.reserved = {lane: lane_sets.count((lane,)) for lane in LANES}
+
+        for lane in LANES:
+            metrics.LANE_QUEUE_DEPTH.set_function(lambda lane=lane: len(self._queues[lane]), lane=lane)
+
+        self._threads = []
+        for lanes in lane_sets:
+            self._start_worker(lanes)
+
+    def _start_worker(self, lanes):
+        thread = threading.Thread(target=self._worker, args=(lanes,), name=f'{self.name}-{self._started}',
+                                  daemon=True)
+        self._started += 1
+        self._threads.append(thread)
+        thread.start()
+
+    def submit(self, lane: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on a lane; it runs in the caller's context (trace, log sampling)"""
+        if lane not in self._queues:
+            raise ValueError(f"Unknown lane: {lane!r} (expected one of {', '.join(LANES)})")
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Dispatcher is shut down')
+            self._queues[lane].append((future, copy_context(), fn, args, kwargs, time.monotonic()))
+            self._condition.notify_all()
+        return future
+
+    def _next_lane(self, lanes) -> Optional[str]:
+        return self._picker.pick(lane for lane in lanes if self._queues[lane])
+
+    def _worker(self, lanes):
+        while True:
+            with self._condition:
+                if self._retiring and lanes == LANES:
+                    self._retiring -= 1
+                    self.workers -= 1
+                    self._threads.remove(threading.current_thread())
+                    return
+                lane = self._next_lane(lanes)
+                while lane is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    if self._retiring and lanes == LANES:
+                        break
+                    lane = self._next_lane(lanes)
+                if lane is None:
+                    continue
+                future, context, fn, args, kwargs, queued_at = self._queues[lane].popleft()
+                self._busy += 1
+
+            waited = time.monotonic() - queued_at
+            metrics.LANE_QUEUE_WAIT_SECONDS.observe(waited, lane=lane)
+            metrics.LANE_JOBS_STARTED.inc(lane=lane)
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(context.run(fn, *args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._busy -= 1
+
+    def resize(self, workers: int):
+        """Change the worker count; workers beyond the new size exit after their current job"""
+        with self._condition:
+            minimum = sum(self.reserved.values()) + 1
+            workers = max(minimum, workers)
+            current = self.workers - self._retiring
+            if workers > current:
+                cancelled = min(self._retiring, workers - current)
+                self._retiring -= cancelled
+                for _ in range(workers - current - cancelled):
+                    self._start_worker(LANES)
+                    self.workers += 1
+            elif workers < current:
+                self._retiring += current - workers
+                self._condition.notify_all()
+            logger.info("%s pool resized to %s workers", self.name, workers)
+
+    def load(self) -> Dict[str, Any]:
+        """Pool size, busy workers and queue backlog for the autoscaler"""
+        with self._condition:
+            heads = [queue[0][5] for queue in self._queues.values() if queue]
+            return {
+                'workers': self.workers - self._retiring,
+                'busy': self._busy,
+                'queued': sum(len(queue) for queue in self._queues.values()),
+                'oldest_wait': time.monotonic() - min(heads) if heads else 0.0
+            }
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depths and worker usage for health and debug endpoints"""
+        with self._condition:
+            return {
+                'workers': self.workers - self._retiring,
+                'busy': self._busy,
+                'weights': dict(self.weights),
+                'reserved': dict(self.reserved),
+                'queued': {lane: len(queue) for lane, queue in self._queues.items()}
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; workers exit once the queues are drained"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in list(self._threads):
+                thread.join()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Load Test for OCR Testing Backend
+Drives the upload -> process -> result workflow with concurrent virtual clients
+
+Usage:
+    # Start a local server with fake engines and run 8 clients for 30 seconds
+    python load_test.py --start-server --clients 8 --duration 30
+
+    # Open-loop arrivals at 5 workflows/second against a running server
+    python load_test.py --url http://127.0.0.1:5000 --rate 5 --duration 60
+
+    # Same workload against the async (Quart) server
+    python load_test.py --start-server --async-server --clients 200 --duration 30
+
+    # Custom document mix (path[:weight]) and JSON report
+    python load_test.py --start-server --doc bill.pdf:3 --doc receipt.png:1 --json report.json
+
+Reports throughput and p50/p95/p99 latency for each endpoint and end to end.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import requests
+from PIL import Image, ImageDraw
+
+
+def create_test_document(name: str, size: Tuple[int, int], lines: int) -> bytes:
+    """Create an in-memory PNG that looks like a bill or receipt"""
+    img = Image.new('RGB', size, color='white')
+    draw = ImageDraw.Draw(img)
+
+    y_position = 20
+    for i in range(lines):
+        draw.text((30, y_position), f"{name.upper()} LINE {i + 1}: Amount RM {random.randint(1, 999)}.00", fill='black')
+        y_position += 25
+
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def default_document_mix() -> List[Tuple[str, bytes, float]]:
+    """Small receipts dominate, with some full-page bills"""
+    return [
+        ('receipt.png', create_test_document('receipt', (600, 800), 12), 3.0),
+        ('bill.png', create_test_document('bill', (1240, 1754), 40), 1.0)
+    ]
+
+
+def load_document_mix(specs: List[str]) -> List[Tuple[str, bytes, float]]:
+    """Load documents from 'path[:weight]' specs"""
+    documents = []
+    for spec in specs:
+        path, _, weight = spec.partition(':')
+        with open(path, 'rb') as f:
+            documents.append((os.path.basename(path), f.read(), float(weight or 1)))
+    return documents
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class LoadStats:
+    """Thread-safe latency and outcome collection"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.workflows_ok = 0
+        self.workflows_failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, status_code):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.status_codes[endpoint][str(status_code)] += 1
+
+    def record_error(self, endpoint: str, message: str):
+        with self._lock:
+            self.errors[f"{endpoint}: {message}"] += 1
+
+    def record_workflow(self, ok: bool, seconds: float):
+        with self._lock:
+            if ok:
+                self.workflows_ok += 1
+                self.latencies['end_to_end'].append(seconds)
+            else:
+                self.workflows_failed += 1
+
+    def report(self, elapsed: float) -> Dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, values in self.latencies.items():
+                endpoints[endpoint] = {
+                    'count': len(values),
+                    'throughput_per_sec': round(len(values) / elapsed, 2) if elapsed else 0.0,
+                    'p50_ms': round(percentile(values, 50) * 1000, 1),
+                    'p95_ms': round(percentile(values, 95) * 1000, 1),
+                    'p99_ms': round(percentile(values, 99) * 1000, 1),
+                    'max_ms': round(max(values) * 1000, 1) if values else 0.0,
+                    'status_codes': dict(self.status_codes.get(endpoint, {}))
+                }
+            return {
+                'elapsed_seconds': round(elapsed, 2),
+                'workflows_ok': self.workflows_ok,
+                'workflows_failed': self.workflows_failed,
+                'workflows_per_sec': round(self.workflows_ok / elapsed, 2) if elapsed else 0.0,
+                'endpoints': endpoints,
+                'errors': dict(self.errors)
+            }
+
+
+class VirtualClient:
+    """Runs one upload -> process -> poll result workflow at a time"""
+
+    def __init__(self, base_url: str, stats: LoadStats, service: str,
+                 poll_interval: float, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.service = service
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _timed(self, endpoint: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.stats.record(endpoint, time.perf_counter() - start, 'exception')
+            self.stats.record_error(endpoint, type(e).__name__)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    def run_workflow(self, document: Tuple[str, bytes, float]):
+        filename, content, _ = document
+        start = time.perf_counter()
+
+        response = self._timed('upload', 'POST', f"{self.base_url}/api/upload",
+                               files={'file': (filename, content)})
+        if response is None or response.status_code != 200:
+            self.stats.record_workflow(False, 0)
+            return
+        file_id = response.json()['file_id']
+
+        response = self._timed('process', 'POST', f"{self.base_url}/api/process/{file_id}",
+                               json={'service': self.service})
+        if response is None or response.status_code != 200:
+            self.stats.record_workflow(False, 0)
+            return
+        process_id = response.json()['process_id']
+
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            response = self._timed('result', 'GET', f"{self.base_url}/api/result/{process_id}")
+            if response is None:
+                break
+            if response.status_code == 202:
+                time.sleep(self.poll_interval)
+                continue
+            ok = response.status_code == 200 and response.json().get('status') == 'success'
+            if not ok:
+                self.stats.record_error('result', response.json().get('error') or str(response.status_code))
+            self.stats.record_workflow(ok, time.perf_counter() - start)
+            return
+
+        self.stats.record_error('result', 'timeout')
+        self.stats.record_workflow(False, 0)
+
+
+def run_load(base_url: str, documents: List[Tuple[str, bytes, float]], clients: int,
+             duration: float, rate: float = None, service: str = 'tesseract',
+             poll_interval: float = 0.1, timeout: float = 60.0) -> Dict:
+    """
+    Run the load test
+
+    With rate set, workflows arrive open-loop (Poisson arrivals) and are
+    picked up by the client pool. Without it, every client loops
+    back-to-back (closed loop).
+    """
+    stats = LoadStats()
+    weights = [weight for _, _, weight in documents]
+    stop_at = time.perf_counter() + duration
+    arrivals = queue.Queue()
+
+    def pick_document():
+        return random.choices(documents, weights=weights)[0]
+
+    def client_loop():
+        client = VirtualClient(base_url, stats, service, poll_interval, timeout)
+        while True:
+            if rate:
+                document = arrivals.get()
+                if document is None:
+                    return
+            else:
+                if time.perf_counter() >= stop_at:
+                    return
+                document = pick_document()
+            client.run_workflow(document)
+
+    threads = [threading.Thread(target=client_loop, daemon=True) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    if rate:
+        next_arrival = time.perf_counter()
+        while next_arrival < stop_at:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            arrivals.put(pick_document())
+            next_arrival += random.expovariate(rate)
+        for _ in threads:
+            arrivals.put(None)
+
+    for thread in threads:
+        thread.join()
+
+    report = stats.report(time.perf_counter() - start)
+    report['config'] = {
+        'clients': clients,
+        'duration': duration,
+        'rate': rate,
+        'service': service,
+        'documents': [{'name': name, 'bytes': len(content), 'weight': weight}
+                      for name, content, weight in documents]
+    }
+    if rate:
+        report['config']['backlog_at_end'] = arrivals.qsize()
+    return report
+
+
+def start_local_server(port: int, page_latency: float, async_server: bool = False):
+    """Start server.py (or server_async.py) with fake engines and wait for the health check"""
+    env = dict(os.environ)
+    env.update({
+        'FAKE_ENGINES': 'true',
+        'FAKE_PAGE_LATENCY': str(page_latency),
+        'FLASK_PORT': str(port),
+        'FLASK_DEBUG': 'false',
+        'LOG_MODE': 'async',
+        'LOG_LEVEL': 'WARNING'
+    })
+    server_process = subprocess.Popen(
+        [sys.executable, 'server_async.py' if async_server else 'server.py'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if requests.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return server_process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+
+    server_process.terminate()
+    raise RuntimeError("Local server did not start")
+
+
+def print_report(report: Dict):
+    print("\n📊 Load Test Results")
+    print("=" * 78)
+    print(f"Elapsed: {report['elapsed_seconds']}s   "
+          f"Workflows: {report['workflows_ok']} ok / {report['workflows_failed']} failed   "
+          f"Throughput: {report['workflows_per_sec']}/s")
+    print()
+    print(f"{'endpoint':<12}{'count':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  codes")
+    for endpoint, data in sorted(report['endpoints'].items()):
+        codes = ', '.join(f"{code}={count}" for code, count in sorted(data['status_codes'].items()))
+        print(f"{endpoint:<12}{data['count']:>8}{data['throughput_per_sec']:>9}{data['p50_ms']:>10}"
+              f"{data['p95_ms']:>10}{data['p99_ms']:>10}{data['max_ms']:>10}  {codes}")
+    if report['errors']:
+        print("\n❌ Errors:")
+        for error, count in report['errors'].items():
+            print(f"   {count} x {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the OCR backend workflow')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Server base URL')
+    parser.add_argument('--start-server', action='store_true', help='Start a local server with fake engines')
+    parser.add_argument('--async-server', action='store_true', help='Start server_async.py instead of server.py')
+    parser.add_argument('--port', type=int, default=5055, help='Port for --start-server')
+    parser.add_argument('--fake-page-latency', type=float, default=0.05, help='Fake engine seconds per page')
+    parser.add_argument('--clients', type=int, default=4, help='Concurrent virtual clients')
+    parser.add_argument('--duration', type=float, default=20, help='Test duration in seconds')
+    parser.add_argument('--rate', type=float, help='Open-loop arrival rate (workflows/second)')
+    parser.add_argument('--service', default='tesseract', help='OCR service to request')
+    parser.add_argument('--doc', action='append', default=[], help='Document path[:weight], repeatable')
+    parser.add_argument('--json', help='Write the report as JSON to this path')
+    args = parser.parse_args()
+
+    documents = load_document_mix(args.doc) if args.doc else default_document_mix()
+
+    server_process = None
+    base_url = args.url
+    if args.start_server:
+        print(f"🚀 Starting local server with fake engines on port {args.port}...")
+        server_process, base_url = start_local_server(args.port, args.fake_page_latency, args.async_server)
+
+    try:
+        mode = f"open loop at {args.rate}/s" if args.rate else "closed loop"
+        print(f"🧪 Running {args.clients} clients for {args.duration}s ({mode}) against {base_url}")
+        report = run_load(base_url, documents, args.clients, args.duration,
+                          rate=args.rate, service=args.service)
+    finally:
+        if server_process:
+            server_process.terminate()
+            server_process.wait()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📁 Report written to {args.json}")
+
+    return report['workflows_failed'] == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
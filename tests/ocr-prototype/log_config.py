@@ -0,0 +1,158 @@
+"""
+Logging Configuration Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Sets up application logging in one of two modes:
+- sync: plain logging.basicConfig to stderr (the original behaviour)
+- async: records are put on an in-memory queue by the request thread and
+  formatted/written by a background QueueListener, so request latency does
+  not include stderr I/O
+
+Records are kept lazy: the message is only merged with its arguments, and
+the JSON document only built, on the listener thread.
+
+Success-path records below WARNING can be sampled per route. The decision
+is made once per request, so a sampled request keeps all its log lines and
+an unsampled one keeps only warnings and errors.
+"""
+
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+import tracing
+
+_route = ContextVar('log_route', default=None)
+_sampled = ContextVar('log_sampled', default=True)
+
+# LogRecord attributes that are not user-supplied 'extra' fields
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'route', 'trace_id'}
+
+_listener = None
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse 'route=rate,route=rate' into a dict"""
+    rates = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        route, rate = item.rsplit('=', 1)
+        rates[route.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Drop success-path records of unsampled requests; always keep warnings and errors"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.route = _route.get()
+        record.trace_id = tracing.current_trace_id()
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LazyQueueHandler.dropped += 1
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName
+        }
+
+        route = getattr(record, 'route', None)
+        if route:
+            document['route'] = route
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id:
+            document['trace_id'] = trace_id
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith('_'):
+                document[key] = value
+
+        if record.exc_info:
+            document['exc_info'] = self.formatException(record.exc_info)
+
+        return json.dumps(document, default=str)
+
+
+def begin_request(route: Optional[str], sample_rates: Dict[str, float], default_rate: float = 1.0):
+    """Record the current route and make the sampling decision for this request"""
+    _route.set(route)
+    rate = sample_rates.get(route, default_rate) if route else 1.0
+    _sampled.set(rate >= 1.0 or random.random() < rate)
+
+
+def setup_logging(mode: str = 'sync', log_format: str = 'text', level: str = 'INFO',
+                  queue_size: int = 10000):
+    """
+    Configure root logging
+
+    Args:
+        mode: 'sync' or 'async'
+        log_format: 'text' or 'json'
+        level: Root log level
+        queue_size: Maximum queued records in async mode; further records
+            are dropped rather than blocking the request thread
+    """
+    global _listener
+
+    if log_format == 'json':
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter('%(levelname)s:%(name)s:%(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if mode == 'async':
+        log_queue = queue.Queue(maxsize=queue_size)
+        handler = LazyQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter())
+        root.addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+    else:
+        stream_handler.addFilter(SamplingFilter())
+        root.addHandler(stream_handler)
+
+
+def shutdown():
+    """Flush and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
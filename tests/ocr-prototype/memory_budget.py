@@ -0,0 +1,175 @@
+"""
+Memory Budget Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Process-wide budget for decoded page pixels. Rasterizing a PDF or decoding
+an image holds width x height x channels bytes per page; a handful of large
+documents arriving together can exhaust memory even though each one alone
+fits. Before rendering or decoding, a job reserves the estimated size of
+the pages it will hold at once; reservations that would exceed the budget
+wait until earlier ones are released.
+
+A single reservation larger than the whole budget is admitted when nothing
+else is reserved, so an oversized document runs alone instead of never.
+
+Configured once at startup:
+    memory_budget.configure(limit_mb=1024, pages_in_flight=4, wait_timeout=300)
+"""
+
+import re
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Bytes per pixel by Pillow mode (RGB for anything not listed)
+MODE_BYTES = {'1': 1, 'L': 1, 'P': 1, 'LA': 2, 'I;16': 2, 'RGB': 3, 'YCbCr': 3, 'LAB': 3, 'HSV': 3,
+              'RGBA': 4, 'CMYK': 4, 'I': 4, 'F': 4}
+
+# pdf2image holds pdftoppm's raw output and the decoded image at the same time
+# (pages rendered straight to disk hold one copy)
+RASTER_COPIES = 2
+
+DEFAULT_PAGE_POINTS = (612.0, 792.0)  # US Letter, when the PDF page size can't be read
+
+
+class MemoryBudgetTimeout(RuntimeError):
+    """Raised when a reservation waits longer than the configured timeout"""
+
+    def __init__(self, requested: int, reserved: int, limit: int, waited: float):
+        self.requested = requested
+        self.reserved = reserved
+        self.limit = limit
+        self.waited = waited
+        super().__init__(
+            f"Memory budget exhausted: needed {requested / MB:.1f}MB, "
+            f"{reserved / MB:.1f}MB of {limit / MB:.1f}MB reserved after waiting {waited:.1f}s"
+        )
+
+
+class MemoryBudget:
+    """Counting reservation budget shared by every job in the process"""
+
+    def __init__(self, limit_bytes: int = 0, pages_in_flight: int = 4, wait_timeout: Optional[float] = None):
+        """
+        Args:
+            limit_bytes: Budget in bytes; 0 disables the limit (reservations are still counted)
+            pages_in_flight: Pages a job renders or decodes per reservation
+            wait_timeout: Seconds a reservation may wait before MemoryBudgetTimeout (None waits forever)
+        """
+        self.limit_bytes = limit_bytes
+        self.pages_in_flight = max(1, pages_in_flight)
+        self.wait_timeout = wait_timeout
+        self.reserved_bytes = 0
+        self.reservations = 0
+        self._condition = threading.Condition()
+
+    def _fits(self, nbytes: int) -> bool:
+        if not self.limit_bytes or self.reservations == 0:
+            return True
+        return self.reserved_bytes + nbytes <= self.limit_bytes
+
+    def acquire(self, nbytes: int, purpose: str = 'raster'):
+        """Block until nbytes can be reserved"""
+        nbytes = max(0, int(nbytes))
+        with self._condition:
+            if not self._fits(nbytes):
+                metrics.MEMORY_BUDGET_WAITS.inc(purpose=purpose)
+                start = time.monotonic()
+                deadline = None if self.wait_timeout is None else start + self.wait_timeout
+                while not self._fits(nbytes):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise MemoryBudgetTimeout(nbytes, self.reserved_bytes, self.limit_bytes,
+                                                  time.monotonic() - start)
+                    self._condition.wait(remaining)
+                waited = time.monotonic() - start
+                metrics.MEMORY_BUDGET_WAIT_SECONDS.observe(waited, purpose=purpose)
+                logger.info("Waited %.2fs for %.1fMB of memory budget (%s)", waited, nbytes / MB, purpose)
+            if self.limit_bytes and nbytes > self.limit_bytes:
+                logger.warning("Reservation of %.1fMB exceeds the %.1fMB budget; running it alone",
+                               nbytes / MB, self.limit_bytes / MB)
+            self.reserved_bytes += nbytes
+            self.reservations += 1
+            metrics.MEMORY_RESERVED_BYTES.set(self.reserved_bytes)
+            metrics.MEMORY_RESERVATIONS.set(self.reservations)
+
+    def release(self, nbytes: int):
+        """Return a reservation made with acquire"""
+        nbytes = max(0, int(nbytes))
+        with self._condition:
+            self.reserved_bytes -= nbytes
+            self.reservations -= 1
+            metrics.MEMORY_RESERVED_BYTES.set(self.reserved_bytes)
+            metrics.MEMORY_RESERVATIONS.set(self.reservations)
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int, purpose: str = 'raster'):
+        """Hold a reservation of nbytes for the duration of the block"""
+        nbytes = max(0, int(nbytes))
+        self.acquire(nbytes, purpose)
+        try:
+            yield nbytes
+        finally:
+            self.release(nbytes)
+
+    def status(self) -> dict:
+        """Current budget usage for health and debug endpoints"""
+        with self._condition:
+            return {
+                'limit_bytes': self.limit_bytes,
+                'reserved_bytes': self.reserved_bytes,
+                'reservations': self.reservations,
+                'pages_in_flight': self.pages_in_flight
+            }
+
+
+budget = MemoryBudget()
+
+
+def configure(limit_mb: float = 0, pages_in_flight: int = 4, wait_timeout: Optional[float] = None):
+    """Configure the module-level budget"""
+    budget.limit_bytes = int(limit_mb * MB)
+    budget.pages_in_flight = max(1, pages_in_flight)
+    budget.wait_timeout = wait_timeout
+    metrics.MEMORY_BUDGET_BYTES.set(budget.limit_bytes)
+
+
+def reserve(nbytes: int, purpose: str = 'raster'):
+    """Reserve from the module-level budget"""
+    return budget.reserve(nbytes, purpose)
+
+
+def image_bytes(width: int, height: int, mode: str = 'RGB') -> int:
+    """Decoded size of a width x height image in the given Pillow mode"""
+    return width * height * MODE_BYTES.get(mode, 3)
+
+
+def raster_page_bytes(page_points: Tuple[float, float], dpi: int, grayscale: bool = False,
+                      copies: int = RASTER_COPIES) -> int:
+    """Peak bytes to rasterize one PDF page of page_points (width, height in pt) at dpi"""
+    width = int(page_points[0] * dpi / 72) + 1
+    height = int(page_points[1] * dpi / 72) + 1
+    return image_bytes(width, height, 'L' if grayscale else 'RGB') * copies
+
+
+def pdf_page_points(content: bytes) -> Optional[Tuple[float, float]]:
+    """Largest /MediaBox in raw PDF bytes, or None when none is readable"""
+    largest = None
+    for box in re.findall(rb'/MediaBox\s*\[\s*([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s*\]', content):
+        try:
+            x0, y0, x1, y1 = (float(value) for value in box)
+        except ValueError:
+            continue
+        size = (abs(x1 - x0), abs(y1 - y0))
+        if largest is None or size[0] * size[1] > largest[0] * largest[1]:
+            largest = size
+    return largest
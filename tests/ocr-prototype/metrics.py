@@ -0,0 +1,333 @@
+"""
+Metrics Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Minimal Prometheus-style counters, gauges and histograms with no external
+dependencies. Recording a sample is one lock, one bisect and a couple of
+integer increments, so instrumentation can stay on in production.
+
+All pipeline metrics are defined at the bottom of this module so every
+other module imports the same instances. render() produces the Prometheus
+text exposition format served by /api/metrics.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    """Format a label set as {a="x",b="y"}"""
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}']
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Increment counter for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """Current value for a label set"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}'
+                for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback"""
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value: float, **labels):
+        """Set gauge value for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase gauge value"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """Decrease gauge value"""
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Read the gauge value from a callback at render time"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def get(self, **labels) -> float:
+        """Current value for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            function = self._functions.get(key)
+            value = self._values.get(key, 0)
+        return function() if function else value
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Increment while the block runs"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}'
+                for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket_counts, sum, count]
+
+    def observe(self, value: float, **labels):
+        """Record one observation"""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels) -> int:
+        """Number of observations for a label set"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Register a metric, returning the existing one if the name is taken"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a metric by name"""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def render() -> str:
+    """Render the default registry"""
+    return REGISTRY.render()
+
+
+# Pipeline metrics
+
+UPLOADS_TOTAL = REGISTRY.register(Counter(
+    'ocr_uploads_total', 'File uploads by outcome', ('status',)))
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'ocr_stage_seconds',
+    'Pipeline stage latency (upload, rasterize, preprocess)', ('stage',)))
+
+PAGE_OCR_SECONDS = REGISTRY.register(Histogram(
+    'ocr_page_seconds', 'Per-page OCR latency by engine', ('engine',)))
+
+ENGINE_CALL_SECONDS = REGISTRY.register(Histogram(
+    'ocr_engine_call_seconds', 'Whole-document engine call latency', ('engine', 'outcome')))
+
+JOBS_TOTAL = REGISTRY.register(Counter(
+    'ocr_jobs_total', 'Finished OCR jobs by engine and outcome', ('engine', 'status')))
+
+PAGES_TOTAL = REGISTRY.register(Counter(
+    'ocr_pages_total', 'Pages processed by engine', ('engine',)))
+
+BYTES_PROCESSED = REGISTRY.register(Counter(
+    'ocr_bytes_processed_total', 'Bytes handled by pipeline stage', ('stage',)))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    'ocr_cache_requests_total', 'Cache lookups by cache and result (hit/miss)', ('cache', 'result')))
+
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'ocr_queue_depth', 'Jobs waiting to be processed'))
+
+JOBS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'ocr_jobs_in_flight', 'Jobs currently being processed'))
+
+MEMORY_BUDGET_BYTES = REGISTRY.register(Gauge(
+    'ocr_memory_budget_bytes', 'Configured page pixel memory budget (0 = unlimited)'))
+
+PAGE_BYTES_COPIED = REGISTRY.register(Counter(
+    'ocr_page_bytes_copied_total', 'Page image bytes copied through this process or to disk, by stage', ('stage',)))
+
+PAGE_BUFFER_SHARED_BYTES = REGISTRY.register(Counter(
+    'ocr_page_buffer_shared_bytes_total', 'Page image bytes handed between processes as shared-memory segments'))
+
+PAGE_BUFFER_BYTES = REGISTRY.register(Gauge(
+    'ocr_page_buffer_bytes', 'Page image bytes currently held in shared-memory segments'))
+
+RESULT_CACHE_BYTES = REGISTRY.register(Gauge(
+    'ocr_result_cache_bytes', 'Job result bytes held in the memory tier of the result store'))
+
+CPU_BUDGET = REGISTRY.register(Gauge(
+    'ocr_cpu_budget', 'Configured CPU split for Tesseract (cores, processes, threads per process)', ('setting',)))
+
+MEMORY_RESERVED_BYTES = REGISTRY.register(Gauge(
+    'ocr_memory_reserved_bytes', 'Page pixel memory currently reserved'))
+
+MEMORY_RESERVATIONS = REGISTRY.register(Gauge(
+    'ocr_memory_reservations', 'Page pixel memory reservations currently held'))
+
+MEMORY_BUDGET_WAITS = REGISTRY.register(Counter(
+    'ocr_memory_budget_waits_total', 'Reservations that had to wait for memory budget', ('purpose',)))
+
+MEMORY_BUDGET_WAIT_SECONDS = REGISTRY.register(Histogram(
+    'ocr_memory_budget_wait_seconds', 'Time reservations waited for memory budget', ('purpose',)))
+
+REQUESTS_DEDUPLICATED = REGISTRY.register(Counter(
+    'ocr_requests_deduplicated_total', 'Process requests answered with an existing job', ('reason',)))
+
+LANE_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'ocr_lane_queue_depth', 'Jobs waiting in each priority lane', ('lane',)))
+
+LANE_QUEUE_WAIT_SECONDS = REGISTRY.register(Histogram(
+    'ocr_lane_queue_wait_seconds', 'Time jobs waited in their priority lane before starting', ('lane',)))
+
+LANE_JOBS_STARTED = REGISTRY.register(Counter(
+    'ocr_lane_jobs_started_total', 'Jobs started by priority lane', ('lane',)))
+
+PAGE_SCHEDULER_JOBS = REGISTRY.register(Gauge(
+    'ocr_page_scheduler_jobs', 'Engine runs with page batches in the page scheduler'))
+
+PAGE_TASKS_TOTAL = REGISTRY.register(Counter(
+    'ocr_page_tasks_total', 'Page batches run by the page scheduler, by runner (owner job thread or stealing worker)',
+    ('runner',)))
+
+POOL_WORKERS = REGISTRY.register(Gauge(
+    'ocr_pool_workers', 'Current worker count of an autoscaled pool', ('pool',)))
+
+AUTOSCALE_DECISIONS = REGISTRY.register(Counter(
+    'ocr_autoscale_decisions_total', 'Autoscaler pool resizes by direction and reason',
+    ('pool', 'direction', 'reason')))
+
+HOST_CPU_UTILIZATION = REGISTRY.register(Gauge(
+    'ocr_host_cpu_utilization', 'Host CPU utilisation (0-1) at the last autoscaler sample'))
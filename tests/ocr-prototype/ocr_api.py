@@ -0,0 +1,734 @@
+"""
+OCR API Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+The part of the HTTP API that does not depend on the web framework, shared
+by server.py (Flask) and server_async.py (Quart). OCRApi owns the job table
+and the services behind it. It validates requests, routes 'auto', joins
+duplicate requests, builds and runs jobs, and shapes response bodies; the
+servers only read requests and write responses.
+
+Methods block (file access, shared queue, OCR), so server_async.py calls
+them on its io pool. Rejected requests raise RequestError, which carries
+the status code, JSON body and headers of the error response.
+
+Usage:
+    api = OCRApi(app.config, workers=app.config['JOB_WORKERS'])
+    submission = api.submit(file_id, request.get_json(), request.headers, request.args)
+"""
+
+import os
+import sys
+import time
+import uuid
+import platform
+import tempfile
+import traceback
+import logging
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from werkzeug.utils import secure_filename
+
+from config import Config
+from file_handler import FileHandler
+from ocr_services import OCRServices
+from circuit_breaker import CircuitOpenError
+from checkpoints import CheckpointStore, PageJournal
+from job_queue import LANES, LaneDispatcher, infer_lane
+from autoscaler import Autoscaler
+from coalescing import (
+    IDEMPOTENCY_HEADER, MAX_KEY_LENGTH, REASON_IDEMPOTENCY_KEY,
+    RequestDeduplicator, IdempotencyConflict, flight_key, request_fingerprint
+)
+import metrics
+import tracing
+import profiling
+import result_store
+import results
+import shared_queue
+
+logger = logging.getLogger(__name__)
+
+
+class RequestError(Exception):
+    """A rejected request, with the status code, JSON body and headers to respond with"""
+
+    def __init__(self, status_code: int, error: str, headers: Dict[str, str] = None, **fields):
+        super().__init__(error)
+        self.status_code = status_code
+        self.body = {'error': error, 'status': 'error', **fields}
+        self.headers = headers or {}
+
+
+class Submission:
+    """A job started by OCRApi.submit, or the existing job the request joined"""
+
+    def __init__(self, process_id: str, wait: bool, job=None, reused: str = None,
+                 body: Dict[str, Any] = None):
+        self.process_id = process_id
+        self.wait = wait
+        self.job = job  # Future of a job run in this process; None in distributed mode or when joined
+        self.reused = reused  # Why an existing job was joined (coalescing REASON_*), or None
+        self.body = body  # Response body of a started job
+
+    @property
+    def status_code(self) -> int:
+        return 200 if self.wait else 202
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {'Idempotent-Replayed': 'true'} if self.reused == REASON_IDEMPOTENCY_KEY else {}
+
+
+class OCRApi:
+    """Jobs and checks behind the API routes"""
+
+    def __init__(self, config, workers: int, name: str = 'jobs'):
+        """
+        Args:
+            config: The app's config mapping (app.config)
+            workers: Job dispatcher workers (OCR jobs running at once in this process)
+            name: Job pool name for worker threads, logs and autoscaler metrics
+        """
+        self.config = config
+        self.file_handler = FileHandler(config['UPLOAD_FOLDER'])
+        if config['FAKE_ENGINES']:
+            from fake_engines import FakeOCRServices
+            self.ocr_services = FakeOCRServices(config['FAKE_PAGE_LATENCY'], config['FAKE_ERROR_RATE'])
+        else:
+            self.ocr_services = OCRServices()
+        self.checkpoint_store = CheckpointStore(config['CHECKPOINT_FOLDER']) if config['CHECKPOINTS_ENABLED'] else None
+        self.job_dispatcher = LaneDispatcher(
+            workers=workers,
+            weights=Config.get_lane_weights(),
+            reserved=Config.get_lane_reserved_workers(),
+            name=name
+        )
+        self.job_autoscaler = Autoscaler(name, self.job_dispatcher, **Config.get_autoscale_options()).start() \
+            if config['AUTOSCALE_ENABLED'] else None
+
+        # Distributed mode: this node only enqueues jobs; worker.py processes run them
+        if config['JOB_MODE'] not in shared_queue.JOB_MODES:
+            raise ValueError(f"Invalid JOB_MODE: {config['JOB_MODE']}. Choose: {', '.join(shared_queue.JOB_MODES)}")
+        self.shared_jobs = shared_queue.open_queue(
+            config['QUEUE_BACKEND'], config['QUEUE_PATH'], config['JOB_MAX_ATTEMPTS']
+        ) if config['JOB_MODE'] == 'distributed' else None
+
+        # In-memory storage for processing status (use Redis in production)
+        self.processing_status = {}
+
+        # Page journals of running jobs, read by streaming /api/result requests
+        self.active_journals = {}
+
+        # Retried and duplicate /api/process requests reuse the job they repeat
+        self.request_dedup = RequestDeduplicator(
+            is_running=self.is_running,
+            ttl_seconds=config['IDEMPOTENCY_TTL_SECONDS'],
+            max_keys=config['IDEMPOTENCY_MAX_KEYS'],
+            coalesce=config['COALESCE_REQUESTS']
+        )
+
+        # Queue depth is derived from the job table so it stays correct however jobs are dispatched
+        if self.shared_jobs:
+            metrics.QUEUE_DEPTH.set_function(lambda: sum(self.shared_jobs.queued().values()))
+            for lane in LANES:
+                metrics.LANE_QUEUE_DEPTH.set_function(lambda lane=lane: self.shared_jobs.queued().get(lane, 0),
+                                                      lane=lane)
+        else:
+            metrics.QUEUE_DEPTH.set_function(
+                lambda: sum(1 for status in list(self.processing_status.values()) if status.get('status') == 'queued')
+            )
+
+    # Health and services
+
+    def availability(self) -> Dict[str, bool]:
+        """Whether each engine is configured, keyed as in /api/health"""
+        return {
+            'tesseract': self.ocr_services.check_tesseract_available(),
+            'google_vision': self.ocr_services.check_google_vision_available(),
+            'aws_textract': self.ocr_services.check_aws_textract_available()
+        }
+
+    def queue_status(self) -> Dict[str, Any]:
+        """Lane queues of this process, or of the shared queue and its workers in distributed mode"""
+        if self.shared_jobs:
+            return {
+                'mode': 'distributed',
+                'queued': self.shared_jobs.queued(),
+                'workers': self.shared_jobs.workers(max_age=self.config['WORKER_LEASE_SECONDS'])
+            }
+        status = dict(self.job_dispatcher.status(), mode='local')
+        if self.job_autoscaler:
+            status['autoscale'] = self.job_autoscaler.status()
+        return status
+
+    def services_status(self) -> Dict[str, Any]:
+        """/api/services body: each engine's availability, breaker and capabilities"""
+        availability = self.availability()
+        breakers = self.ocr_services.breakers.snapshot()
+        engines = self.ocr_services.engines
+        services = {
+            'tesseract': {
+                'name': 'Tesseract (Local)',
+                'available': availability['tesseract'],
+                'description': 'Open-source OCR engine, works offline',
+                'breaker': breakers['tesseract'],
+                'capabilities': engines['tesseract'].capabilities.to_dict()
+            },
+            'google': {
+                'name': 'Google Vision API',
+                'available': availability['google_vision'],
+                'description': 'Google Cloud Vision API, requires API key',
+                'breaker': breakers['google'],
+                'capabilities': engines['google'].capabilities.to_dict()
+            },
+            'aws': {
+                'name': 'AWS Textract',
+                'available': availability['aws_textract'],
+                'description': 'Amazon Textract service, requires AWS credentials',
+                'breaker': breakers['aws'],
+                'capabilities': engines['aws'].capabilities.to_dict()
+            }
+        }
+
+        available = {name: info['available'] for name, info in services.items()}
+        return {
+            'services': services,
+            'recommended': self.ocr_services.recommend_service(available),
+            'router': self.ocr_services.router.snapshot()
+        }
+
+    # Job records
+
+    def job_record(self, process_id: str) -> Optional[Dict[str, Any]]:
+        """Job record from this process, or from the shared queue in distributed mode"""
+        if self.shared_jobs:
+            return self.shared_jobs.get_record(process_id)
+        return self.processing_status.get(process_id)
+
+    def is_running(self, process_id: str) -> bool:
+        """True while a job is queued or processing, or its record is not written yet"""
+        record = self.job_record(process_id)
+        return record is None or record['status'] in shared_queue.RUNNING_STATUSES
+
+    def wait_for_job(self, process_id: str, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """Poll a job record until the job has finished or timeout seconds pass; returns the record"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        record = self.job_record(process_id)
+        while record and record['status'] in shared_queue.RUNNING_STATUSES:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(self.config['WORKER_POLL_SECONDS'])
+            record = self.job_record(process_id)
+        return record
+
+    # Uploads
+
+    def accept_upload(self, file) -> Dict[str, Any]:
+        """
+        Validate and save an uploaded werkzeug FileStorage
+
+        Returns:
+            /api/upload body with the new file_id
+        """
+        if file is None:
+            logger.error("Upload failed: No file in request")
+            raise RequestError(400, 'No file provided')
+
+        logger.info("File received: filename='%s', content_type='%s'", file.filename, file.content_type)
+        if file.filename == '':
+            logger.error("Upload failed: Empty filename")
+            raise RequestError(400, 'No file selected')
+
+        # Get file size by seeking to end
+        file.seek(0, 2)
+        file_size = file.tell()
+        file.seek(0)
+        logger.info("File size: %s bytes (%.2f MB)", file_size, file_size/(1024*1024))
+
+        max_size = self.config['MAX_CONTENT_LENGTH']
+        if file_size > max_size:
+            logger.error("Upload failed: File too large (%s bytes > %s bytes)", file_size, max_size)
+            raise RequestError(
+                413,
+                f'File too large. Maximum size is {max_size/(1024*1024):.1f}MB, your file is {file_size/(1024*1024):.2f}MB',
+                max_size_mb=max_size/(1024*1024),
+                file_size_mb=file_size/(1024*1024)
+            )
+
+        if not self.file_handler.allowed_file(file.filename):
+            logger.error("Upload failed: Invalid file type '%s'", file.filename)
+            raise RequestError(400, 'Invalid file type. Supported: PDF, JPG, JPEG, PNG')
+
+        file_id = str(uuid.uuid4())
+        logger.info("Generated file_id: %s", file_id)
+
+        with tracing.trace(file_id, 'upload', file_id=file_id):
+            saved_path = self.file_handler.save_file(file, file_id)
+        if not os.path.exists(saved_path):
+            logger.error("File verification failed: %s does not exist", saved_path)
+            raise Exception("File was not saved properly")
+        logger.info("File saved successfully: %s -> %s (%s bytes)", file_id, saved_path, os.path.getsize(saved_path))
+
+        metrics.BYTES_PROCESSED.inc(file_size, stage='upload')
+        return {
+            'file_id': file_id,
+            'filename': secure_filename(file.filename),
+            'file_size': file_size,
+            'saved_path': saved_path,
+            'status': 'uploaded',
+            'message': 'File uploaded successfully. Use /api/process/{file_id} to start OCR processing.'
+        }
+
+    # Processing
+
+    def submit(self, file_id: str, data: Optional[Dict[str, Any]], headers, args) -> Submission:
+        """
+        Start the job an /api/process request asks for, or join the job it repeats
+
+        Args:
+            file_id: Uploaded file to process
+            data: JSON body, or None if the request was not JSON
+            headers: Request headers (Idempotency-Key, X-Profile, X-Admin-Token)
+            args: Query parameters (profile)
+
+        Returns:
+            Submission; the caller waits for submission.job (or polls the
+            record) when submission.wait is set, then responds with
+            submission_body()
+        """
+        if data is None:
+            logger.error("Processing failed: Request is not JSON")
+            raise RequestError(400, 'Content-Type must be application/json')
+        if not isinstance(data, dict):
+            logger.error("Processing failed: Request body is not a JSON object")
+            raise RequestError(400, 'Request body must be a JSON object')
+
+        service = str(data.get('service', 'tesseract')).lower()
+        allow_fallback = bool(data.get('allow_fallback', False))
+        resume = bool(data.get('resume', True))
+        wait = bool(data.get('wait', True))
+        priority = data.get('priority')
+        logger.info("Requested service: %s (allow_fallback=%s)", service, allow_fallback)
+
+        if priority is not None and priority not in LANES:
+            logger.error("Processing failed: Invalid priority '%s'", priority)
+            raise RequestError(400, f"Invalid priority. Choose: {', '.join(LANES)}")
+
+        if service != 'auto' and service not in self.ocr_services.engines:
+            logger.error("Processing failed: Invalid service '%s'", service)
+            raise RequestError(400, f"Invalid service. Choose: {', '.join(self.ocr_services.engines)}, or auto")
+
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            logger.error("Processing failed: Invalid Idempotency-Key")
+            raise RequestError(400, f'{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters')
+
+        # Profiling is opt-in and restricted to admins
+        profile_mode = profiling.requested_mode(headers, args)
+        if profile_mode and not profiling.is_admin(headers, self.config['ADMIN_TOKEN']):
+            logger.error("Processing failed: Profiling requested without admin token")
+            raise RequestError(403, 'Profiling requires a valid X-Admin-Token')
+
+        if not self.file_handler.file_exists(file_id):
+            logger.error("Processing failed: File not found '%s'", file_id)
+            raise RequestError(404, f'File not found: {file_id}')
+
+        file_path = self.file_handler.get_file_path(file_id)
+        file_info = self.file_handler.get_file_info(file_path)
+        logger.info("File info: size=%s bytes, type=%s, is_pdf=%s", file_info['size'], file_info['extension'], file_info['is_pdf'])
+
+        # Page count drives the router and the default priority lane
+        page_count = None
+        if service == 'auto' or priority is None:
+            page_count = self.file_handler.get_page_count(file_path)
+        if priority is None:
+            priority = infer_lane(page_count, self.config['PRIORITY_INTERACTIVE_MAX_PAGES'])
+
+        requested_service = service
+        routing = None
+        if service == 'auto':
+            routing = self._route(file_info['size'], page_count, data)
+            service = routing['chosen']
+            logger.info("Router selected service: %s (%s)", service, routing['reason'])
+
+        # Fail fast when the engine's circuit breaker is open
+        if self.ocr_services.breakers.is_open(service) and not allow_fallback:
+            retry_after = self.ocr_services.breakers.get(service).retry_after()
+            logger.error("Processing rejected: circuit breaker open for '%s'", service)
+            raise RequestError(
+                503,
+                f'{service} is temporarily unavailable (circuit breaker open). '
+                f'Retry later or set allow_fallback to use tesseract.',
+                headers={'Retry-After': str(int(retry_after) + 1)},
+                breaker_state='open',
+                retry_after=round(retry_after, 1)
+            )
+
+        # Generate process ID, or reuse the job this request repeats (profiled requests need their own run)
+        try:
+            process_id, reused = self.request_dedup.claim(
+                str(uuid.uuid4()),
+                None if profile_mode else flight_key(file_id, service, allow_fallback, resume),
+                idempotency_key=idempotency_key,
+                fingerprint=request_fingerprint(file_id, data)
+            )
+        except IdempotencyConflict as e:
+            logger.error("Processing failed: %s", e)
+            raise RequestError(422, str(e))
+        if reused:
+            return Submission(process_id, wait, reused=reused)
+        logger.info("Generated process_id: %s", process_id)
+
+        record = {
+            'file_id': file_id,
+            'service': requested_service,
+            'engine': service,
+            'routing': routing,
+            'service_used': None,
+            'allow_fallback': allow_fallback,
+            'priority': priority,
+            'status': 'queued',
+            'created_at': datetime.utcnow().isoformat(),
+            'queue_wait': None,
+            'processing_time': None,
+            'confidence': None,
+            'error': None,
+            'file_info': file_info,
+            'page_states': []
+        }
+
+        logger.info("Queueing OCR processing: %s with %s (%s lane)", process_id, service, priority)
+        try:
+            if self.shared_jobs:
+                # A worker picks the job up from the shared queue and reads the file from shared storage
+                self.shared_jobs.enqueue(process_id, priority, {
+                    'file_id': file_id,
+                    'service': service,
+                    'allow_fallback': allow_fallback,
+                    'resume': resume,
+                    'profile_mode': profile_mode
+                }, record)
+                job = None
+            else:
+                self.processing_status[process_id] = record
+                journal = self._page_journal(process_id, file_id, file_path, resume)
+                job = self.job_dispatcher.submit(priority, self.run_job, process_id, file_id, file_path, service,
+                                                 allow_fallback, journal, profile_mode, time.time())
+        except Exception:
+            # Let a retry start the job instead of joining one that never started
+            self.request_dedup.forget(process_id)
+            raise
+
+        return Submission(process_id, wait, job=job, body={
+            'process_id': process_id,
+            'file_id': file_id,
+            'service': requested_service,
+            'engine': service,
+            'priority': priority,
+            'status': 'started',
+            'message': f'OCR processing started with {service}. Use /api/status/{process_id} to check progress.'
+        })
+
+    def _route(self, file_size: int, page_count: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Routing decision for 'auto'; RequestError when the options are invalid or no engine is eligible"""
+        try:
+            routing = self.ocr_services.route(
+                file_size, page_count,
+                target=data.get('target'),
+                latency_slo=data.get('latency_slo'),
+                budget=data.get('budget')
+            )
+        except ValueError as e:
+            logger.error("Processing failed: Invalid routing options: %s", e)
+            raise RequestError(400, str(e))
+        if routing['chosen'] is None:
+            logger.error("Processing rejected: %s", routing['reason'])
+            retry_after = routing['retry_after']
+            raise RequestError(
+                503,
+                'No OCR engine is available for auto (not configured or circuit breaker open). Retry later.',
+                headers={'Retry-After': str(int(retry_after) + 1)} if retry_after is not None else None,
+                routing=routing,
+                retry_after=retry_after
+            )
+        return routing
+
+    def submission_body(self, submission: Submission) -> Dict[str, Any]:
+        """/api/process body; a joined job is described from its record"""
+        if not submission.reused:
+            return submission.body
+        process_id, reason = submission.process_id, submission.reused
+        record = self.job_record(process_id) or {}
+        return {
+            'process_id': process_id,
+            'file_id': record.get('file_id'),
+            'service': record.get('service'),
+            'engine': record.get('engine'),
+            'priority': record.get('priority'),
+            'status': 'started',
+            'deduplicated': reason,
+            'message': f'Joined existing OCR job {process_id} ({reason}). Use /api/status/{process_id} to check progress.'
+        }
+
+    def _page_journal(self, process_id: str, file_id: str, file_path: str, resume: bool) -> PageJournal:
+        """PageJournal that mirrors per-page state into the job record"""
+        def update_record(states):
+            self.processing_status[process_id]['page_states'] = states
+        journal = PageJournal(self.checkpoint_store, file_id, file_path, resume=resume, listener=update_record)
+        self.active_journals[process_id] = journal
+        return journal
+
+    def run_job(self, process_id: str, file_id: str, file_path: str, service: str, allow_fallback: bool,
+                journal: PageJournal, profile_mode: Optional[str], queued_at: float):
+        """Run one OCR job and record the outcome (runs on a job dispatcher worker)"""
+        record = self.processing_status[process_id]
+        start_time = time.time()
+        record.update({
+            'status': 'processing',
+            'started_at': datetime.utcnow().isoformat(),
+            'queue_wait': round(start_time - queued_at, 3)
+        })
+        metrics.JOBS_IN_FLIGHT.inc()
+        metrics.BYTES_PROCESSED.inc(record['file_info']['size'], stage='ocr')
+        profile_info = None
+
+        try:
+            logger.info("Calling OCR service: %s", service)
+            if profile_mode:
+                profiler = profiling.profile(
+                    profile_mode,
+                    profiling.profile_path(self.config['PROFILE_FOLDER'], process_id, profile_mode),
+                    sample_interval=self.config['PROFILE_SAMPLE_INTERVAL']
+                )
+            else:
+                profiler = nullcontext()
+
+            with profiler as profile_info, \
+                    tracing.trace(process_id, 'process', file_id=file_id, process_id=process_id, engine=service):
+                result = self.ocr_services.process(service, file_path, allow_fallback=allow_fallback, journal=journal)
+
+            processing_time = time.time() - start_time
+            logger.info("OCR service completed in %.2fs", processing_time)
+
+            record.update({
+                'status': 'success',
+                'service_used': result.get('service_used', service),
+                'fallback_reason': result.get('fallback_reason'),
+                'processing_time': round(processing_time, 2),
+                'result_bytes': result_store.store.put(process_id, results.page_entries(result)),
+                'confidence': result.get('confidence', 0.0),
+                'completed_at': datetime.utcnow().isoformat(),
+                'words_found': result.get('words_found', 0),
+                'pages_processed': result.get('pages_processed', 1),
+                'resumed_pages': result.get('resumed_pages', 0),
+                'page_states': journal.states()
+            })
+            journal.complete()
+            metrics.JOBS_TOTAL.inc(engine=record['service_used'], status='success')
+            logger.info("OCR processing completed successfully: %s", process_id)
+
+        except Exception as ocr_error:
+            processing_time = time.time() - start_time
+            logger.error("OCR processing failed: %s - %s (%s)\n%s", process_id, ocr_error,
+                         type(ocr_error).__name__, traceback.format_exc())
+
+            record.update({
+                'status': 'error',
+                'processing_time': round(processing_time, 2),
+                'error': str(ocr_error),
+                'error_type': type(ocr_error).__name__,
+                'completed_at': datetime.utcnow().isoformat()
+            })
+            if isinstance(ocr_error, CircuitOpenError):
+                record['breaker_state'] = 'open'
+            metrics.JOBS_TOTAL.inc(engine=service, status='error')
+        finally:
+            metrics.JOBS_IN_FLIGHT.dec()
+            if profile_info:
+                record['profile'] = {
+                    'mode': profile_mode,
+                    'duration': profile_info.get('duration'),
+                    'samples': profile_info.get('samples'),
+                    'download': f'/api/debug/profile/{process_id}'
+                }
+            record['trace'] = {
+                'trace_id': process_id,
+                'stages': tracing.tracer.summarize(process_id),
+                'upload_stages': tracing.tracer.summarize(file_id)
+            }
+            journal.close()
+            self.active_journals.pop(process_id, None)
+            self.request_dedup.finished(process_id)
+
+    # Status and results
+
+    @staticmethod
+    def wants_pages(args) -> bool:
+        """Whether a status request asks for text; plain polls read only the small job record"""
+        return bool(args.get('pages') or args.get('fields'))
+
+    def job_body(self, record: Dict[str, Any], args, process_id: str = None) -> Dict[str, Any]:
+        """
+        Job record projected by ?pages= and ?fields=
+
+        With process_id the job's pages are loaded from the result store if
+        the body needs them.
+        """
+        load_pages = (lambda: result_store.store.get(process_id)) if process_id else None
+        try:
+            return results.render_job(record, args.get('pages'), results.parse_fields(args.get('fields')),
+                                      load_pages)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+
+    def finished_page_events(self, record: Dict[str, Any], process_id: str):
+        """Page events of a job that finished before its result stream started"""
+        return results.record_page_events(record, result_store.store.get(process_id))
+
+    def trace_body(self, trace_id: str) -> Dict[str, Any]:
+        """/api/trace body: recorded spans for a process_id or file_id"""
+        spans = tracing.tracer.get_spans(trace_id)
+        if not spans:
+            raise RequestError(404, f'Trace not found: {trace_id}')
+        return {
+            'trace_id': trace_id,
+            'spans': spans,
+            'stages': tracing.tracer.summarize(trace_id)
+        }
+
+    # Maintenance and debugging
+
+    def cleanup(self, age_hours: float) -> Dict[str, Any]:
+        """Remove uploads, checkpoints, results and job records older than age_hours"""
+        cleaned_files = self.file_handler.cleanup_old_files(age_hours)
+        cleaned_checkpoints = self.checkpoint_store.cleanup(age_hours) if self.checkpoint_store else 0
+        cleaned_results = result_store.store.cleanup(age_hours)
+        cleaned_shared = self.shared_jobs.cleanup(age_hours) if self.shared_jobs else 0
+
+        current_time = datetime.utcnow()
+        old_processes = []
+        for process_id, status in list(self.processing_status.items()):
+            created_at = datetime.fromisoformat(status['created_at'])
+            if (current_time - created_at).total_seconds() / 3600 > age_hours:
+                old_processes.append(process_id)
+                del self.processing_status[process_id]
+                result_store.store.delete(process_id)
+
+        cleaned_processes = len(old_processes) + cleaned_shared
+        logger.info("Cleanup completed: %s files, %s process records", cleaned_files, cleaned_processes)
+        return {
+            'status': 'success',
+            'cleaned_files': cleaned_files,
+            'cleaned_processes': cleaned_processes,
+            'cleaned_checkpoints': cleaned_checkpoints,
+            'cleaned_results': cleaned_results,
+            'age_hours': age_hours
+        }
+
+    def profile_file(self, process_id: str, headers) -> Tuple[str, str]:
+        """(mode, path) of the profile recorded for a job; admins only"""
+        if not profiling.is_admin(headers, self.config['ADMIN_TOKEN']):
+            raise RequestError(403, 'Admin token required')
+
+        job = self.job_record(process_id)
+        if not job or not job.get('profile'):
+            raise RequestError(404, f'Profile not found: {process_id}')
+
+        mode = job['profile']['mode']
+        path = profiling.profile_path(self.config['PROFILE_FOLDER'], process_id, mode)
+        if not os.path.exists(path):
+            raise RequestError(404, f'Profile file missing: {process_id}')
+        return mode, path
+
+    def profile_text(self, path: str, sort: str) -> str:
+        """A cprofile profile as pstats text"""
+        try:
+            return profiling.format_stats(path, sort=sort)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+
+    def self_test(self) -> Dict[str, Any]:
+        """/api/debug/test-ocr body: each engine run on a generated test image, plus system info"""
+        from PIL import Image, ImageDraw
+
+        img = Image.new('RGB', (400, 200), color='white')
+        draw = ImageDraw.Draw(img)
+        draw.text((20, 20), "TEST OCR FUNCTIONALITY\nThis is a debug test.\n123 ABC xyz", fill='black')
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
+            img.save(temp_file.name, 'PNG')
+            temp_path = temp_file.name
+        logger.info("Created test image: %s", temp_path)
+
+        try:
+            test_results = self._test_engines(temp_path)
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+        upload_folder = self.config['UPLOAD_FOLDER']
+        system_info = {
+            'tesseract_version': None,
+            'python_version': sys.version,
+            'platform': platform.platform(),
+            'upload_folder': upload_folder,
+            'upload_folder_exists': os.path.exists(upload_folder),
+            'upload_folder_writable': os.access(upload_folder, os.W_OK),
+            'max_file_size': self.config['MAX_CONTENT_LENGTH']
+        }
+        try:
+            import pytesseract
+            system_info['tesseract_version'] = str(pytesseract.get_tesseract_version())
+        except Exception:
+            system_info['tesseract_version'] = 'Not available'
+
+        return {
+            'status': 'success',
+            'timestamp': datetime.utcnow().isoformat(),
+            'test_results': test_results,
+            'system_info': system_info,
+            'recommendations': [
+                'Tesseract working' if test_results.get('tesseract', {}).get('status') == 'success' else 'Install Tesseract: brew install tesseract',
+                'Upload folder accessible' if system_info['upload_folder_writable'] else 'Check upload folder permissions',
+                'All OCR services tested' if len(test_results) == 3 else 'Some OCR services failed'
+            ]
+        }
+
+    def _test_engines(self, temp_path: str) -> Dict[str, Any]:
+        """Run each engine on the test image; Google and AWS report 'mock' results when not configured"""
+        services = self.ocr_services
+        checks = [
+            ('tesseract', services.check_tesseract_available, services.process_with_tesseract),
+            ('google_vision', services.check_google_vision_available, services.process_with_google_vision),
+            ('aws_textract', services.check_aws_textract_available, services.process_with_aws_textract)
+        ]
+        test_results = {}
+        for name, check, run in checks:
+            try:
+                logger.info("Testing %s...", name)
+                available = check()
+                if name == 'tesseract' and not available:
+                    test_results[name] = {'available': False, 'status': 'not_available',
+                                          'error': 'Tesseract not installed or configured'}
+                    continue
+                result = run(temp_path)
+                if name == 'tesseract':
+                    status = 'success'
+                else:
+                    status = 'success' if result.get('confidence', 0) > 0 else 'mock'
+                test_results[name] = {
+                    'available': available,
+                    'text': result.get('text', ''),
+                    'confidence': result.get('confidence', 0.0),
+                    'processing_time': result.get('processing_time', 0.0),
+                    'status': status
+                }
+            except Exception as e:
+                logger.error("%s test failed: %s", name, e)
+                test_results[name] = {'available': name == 'tesseract', 'status': 'error', 'error': str(e)}
+        return test_results
@@ -7,408 +7,520 @@ Implements OCR processing using multiple services:
 - Google Vision API
 - AWS Textract
 
-Each service returns a standardized result format.
+Each service is an engine plugin (see engines.py) and returns a
+standardized result format. OCRServices schedules work onto engines from
+their declared capabilities: whether a PDF goes whole or page by page, how
+pages are batched, and how many batches run in parallel. Batches of
+concurrent jobs are interleaved page by page (see page_scheduler.py).
+
+Engine SDKs (pytesseract, google-cloud-vision, boto3) are imported the first
+time an engine is used, and engine probes run in a background warm-up
+(ENGINE_WARMUP), so importing this module and starting a worker stays fast.
 """
 
 import os
 import logging
+import threading
+from contextlib import ExitStack
+from functools import partial
 from typing import Dict, Any, List
 import time
 from PIL import Image
 
-# OCR Service imports
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-    pytesseract = None
+from file_handler import FileHandler
+from config import Config
+import metrics
+import tracing
+import memory_budget
+import cpu_budget
+import page_buffers
+import rasterizer
+from circuit_breaker import BreakerRegistry, CircuitOpenError
+from engine_router import EngineRouter
+from engines import (
+    EngineCapabilities, EngineInput, engine_types,
+    INPUT_PDF, INPUT_IMAGE_FILE, INPUT_IMAGE_BYTES, INPUT_PAGE
+)
+from engines import parse_tesseract_data, load_engine_module  # noqa: F401 (re-exported)
+from checkpoints import PageJournal
+from page_scheduler import PageScheduler
 
-try:
-    from google.cloud import vision
-    GOOGLE_VISION_AVAILABLE = True
-except ImportError:
-    GOOGLE_VISION_AVAILABLE = False
-    vision = None
+logger = logging.getLogger(__name__)
 
-try:
-    import boto3
-    from botocore.exceptions import ClientError, NoCredentialsError
-    AWS_AVAILABLE = True
-except ImportError:
-    AWS_AVAILABLE = False
-    boto3 = None
+WARMUP_MODES = ['background', 'eager', 'off']
 
-from file_handler import FileHandler
 
-logger = logging.getLogger(__name__)
+class DocumentInputError(ValueError):
+    """The file could not be turned into engine inputs (corrupt or truncated upload)"""
+
+# Failures that are not the engine's and are kept out of its circuit breaker
+NOT_ENGINE_FAILURES = (DocumentInputError, memory_budget.MemoryBudgetTimeout)
+
+
+def page_entry(item: EngineInput, page: Dict[str, Any]) -> Dict[str, Any]:
+    """Job record entry for one engine page result"""
+    entry = {
+        'page': item.page_number,
+        'text': page['text'],
+        'confidence': round(page['confidence'], 2),
+        'words': page['words']
+    }
+    if page['pages'] > 1:
+        entry['page_count'] = page['pages']
+    if page.get('error'):
+        entry['error'] = page['error']
+    return entry
+
+def attempted_pages(journal: PageJournal = None) -> int:
+    """Pages the engine was given in a call that failed (1 without a journal)"""
+    if journal is None:
+        return 1
+    return max(1, sum(1 for state in journal.states() if not state.get('restored')))
+
+def _remove_files(paths: List[str]):
+    """Delete rasterized pages, ignoring ones already gone"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 class OCRServices:
     """Manages multiple OCR service implementations"""
     
-    def __init__(self):
-        """Initialize OCR services"""
+    SERVICES = ['tesseract', 'google', 'aws']
+    FALLBACK_SERVICE = 'tesseract'
+    
+    def __init__(self, warmup: str = None):
+        """
+        Initialize OCR services
+        
+        Args:
+            warmup: 'background' probes engines on a daemon thread, 'eager'
+                probes before returning, 'off' waits for first use.
+                Defaults to Config.ENGINE_WARMUP.
+        """
+        warmup = warmup or Config.ENGINE_WARMUP
+        if warmup not in WARMUP_MODES:
+            raise ValueError(f"Invalid ENGINE_WARMUP: {warmup}. Choose: {', '.join(WARMUP_MODES)}")
+        
         self.file_handler = None  # Will be set by server
-        self._setup_services()
+        self.engines = self._create_engines()
+        self.breakers = BreakerRegistry(list(self.engines), **Config.get_breaker_options())
+        self.router = EngineRouter(**Config.get_router_options())
+        self._file_handlers = {}
+        self._page_scheduler = PageScheduler(Config.ENGINE_PAGE_WORKERS)
+        self.warmed_up = threading.Event()
+        
+        if warmup == 'eager':
+            self._warm_up()
+        elif warmup == 'background':
+            threading.Thread(target=self._warm_up, name='ocr-warmup', daemon=True).start()
+    
+    def _create_engines(self) -> Dict[str, Any]:
+        """Instantiate registered engines, applying the CPU budget and ENGINE_CONCURRENCY overrides"""
+        overrides = Config.get_engine_concurrency()
+        engines = {}
+        for name, engine_class in engine_types().items():
+            capabilities = None
+            concurrency = overrides.get(name)
+            if concurrency is None and engine_class.uses_cpu_budget:
+                concurrency = cpu_budget.budget.processes
+            if concurrency is not None:
+                declared = engine_class.capabilities
+                capabilities = EngineCapabilities(
+                    declared.input_kinds, concurrency, declared.batch_size,
+                    declared.max_pages, declared.max_bytes
+                )
+            engines[name] = engine_class(capabilities)
+        return engines
+    
+    def _warm_up(self):
+        """Import engine SDKs and run startup probes"""
+        start_time = time.perf_counter()
+        try:
+            self._setup_services()
+        except Exception as e:
+            logger.warning("OCR warm-up failed: %s", e)
+        finally:
+            self.warmed_up.set()
+            logger.info("OCR warm-up finished in %.2fs", time.perf_counter() - start_time)
     
     def _setup_services(self):
         """Setup and validate OCR services"""
         logger.info("Setting up OCR services...")
-        
-        # Test Tesseract
-        if TESSERACT_AVAILABLE:
-            try:
-                # Try to get Tesseract version
-                version = pytesseract.get_tesseract_version()
-                logger.info(f"Tesseract available: {version}")
-            except Exception as e:
-                logger.warning(f"Tesseract setup issue: {str(e)}")
-        
-        # Test Google Vision
-        if GOOGLE_VISION_AVAILABLE:
+        for name, engine in self.engines.items():
             try:
-                # Check if credentials are available
-                if os.getenv('GOOGLE_APPLICATION_CREDENTIALS') or os.getenv('GOOGLE_CLOUD_PROJECT'):
-                    logger.info("Google Vision API credentials found")
-                else:
-                    logger.info("Google Vision API available but no credentials configured")
+                engine.warm_up()
             except Exception as e:
-                logger.warning(f"Google Vision setup issue: {str(e)}")
-        
-        # Test AWS
-        if AWS_AVAILABLE:
-            try:
-                # Check if AWS credentials are available
-                if os.getenv('AWS_ACCESS_KEY_ID') or os.path.exists(os.path.expanduser('~/.aws/credentials')):
-                    logger.info("AWS credentials found")
-                else:
-                    logger.info("AWS Textract available but no credentials configured")
-            except Exception as e:
-                logger.warning(f"AWS setup issue: {str(e)}")
+                logger.warning("%s setup issue: %s", engine.display_name, e)
+    
+    def get_engine(self, service: str):
+        """Get the engine plugin for an API service name"""
+        engine = self.engines.get(service)
+        if engine is None:
+            raise ValueError(f"Unknown OCR service: {service}")
+        return engine
     
     def check_tesseract_available(self) -> bool:
         """Check if Tesseract is available and working"""
-        if not TESSERACT_AVAILABLE:
-            return False
-        
-        try:
-            # Try to run a simple OCR test
-            pytesseract.get_tesseract_version()
-            return True
-        except Exception as e:
-            logger.error(f"Tesseract not available: {str(e)}")
-            return False
+        return self.engines['tesseract'].is_available()
     
     def check_google_vision_available(self) -> bool:
         """Check if Google Vision API is available"""
-        if not GOOGLE_VISION_AVAILABLE:
-            return False
-        
-        try:
-            # Check for API key or credentials
-            import os
-            api_key = os.getenv('GOOGLE_VISION_API_KEY')
-            credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-            
-            if api_key or credentials_path:
-                # Try to create a client
-                client = vision.ImageAnnotatorClient()
-                return True
-            else:
-                logger.info("No Google Vision credentials found")
-                return False
-        except Exception as e:
-            logger.error(f"Google Vision not available: {str(e)}")
-            return False
+        return self.engines['google'].is_available()
     
     def check_aws_textract_available(self) -> bool:
         """Check if AWS Textract is available"""
-        if not AWS_AVAILABLE:
-            return False
+        return self.engines['aws'].is_available()
+    
+    def check_service_available(self, service: str) -> bool:
+        """Check availability of a service by its API name"""
+        engine = self.engines.get(service)
+        return engine.is_available() if engine else False
+    
+    def recommend_service(self, available: Dict[str, bool] = None) -> str:
+        """
+        Pick the recommended service from availability and breaker state
+        
+        Google Vision is preferred while it is available and its breaker
+        is not open; otherwise Tesseract is recommended.
+        """
+        if available is None:
+            available = {'google': self.check_google_vision_available()}
         
+        if available.get('google') and not self.breakers.is_open('google'):
+            return 'google'
+        return self.FALLBACK_SERVICE
+    
+    def route(self, file_size: int, page_count: int, target: str = None,
+              latency_slo: float = None, budget: float = None) -> Dict[str, Any]:
+        """
+        Choose an engine for the 'auto' service option
+        
+        Returns:
+            Routing decision from EngineRouter.choose, with the chosen
+            engine under 'chosen'. When no engine is eligible, 'chosen' is
+            None and 'retry_after' is the time until the first open breaker
+            allows a probe (None if no breaker is open).
+        """
+        candidates = {
+            service: {
+                'available': self.check_service_available(service),
+                'breaker_state': self.breakers.get(service).state
+            }
+            for service in self.SERVICES
+        }
+        decision = self.router.choose(file_size, page_count, candidates,
+                                      target=target, latency_slo=latency_slo, budget=budget)
+        if decision['chosen'] is None:
+            waits = [self.breakers.get(service).retry_after() for service, state in candidates.items()
+                     if state['breaker_state'] == 'open']
+            decision['retry_after'] = round(min(waits), 1) if waits else None
+        return decision
+    
+    def _call_service(self, service: str, file_path: str, journal: PageJournal = None) -> Dict[str, Any]:
+        """Run a service's engine without breaker checks"""
+        engine = self.get_engine(service)
+        logger.info("Processing with %s...", engine.display_name)
+        if not engine.is_available():
+            return engine.unavailable_result(file_path)
         try:
-            # Try to create a client
-            client = boto3.client('textract')
-            return True
+            return self.run_engine(engine, file_path, journal)
+        except NOT_ENGINE_FAILURES:
+            raise
         except Exception as e:
-            logger.error(f"AWS Textract not available: {str(e)}")
-            return False
+            logger.error("%s processing error: %s", engine.display_name, e)
+            raise RuntimeError(f"{engine.display_name} OCR failed: {str(e)}")
     
-    def process_with_tesseract(self, file_path: str) -> Dict[str, Any]:
+    def _file_handler_for(self, file_path: str) -> FileHandler:
+        folder = os.path.dirname(file_path) or '.'
+        if folder not in self._file_handlers:
+            self._file_handlers[folder] = FileHandler(folder)
+        return self._file_handlers[folder]
+    
+    def plan_inputs(self, engine, file_path: str, held: ExitStack = None, skip_pages=()):
         """
-        Process file with Tesseract OCR
+        Turn a file into engine inputs according to the engine's capabilities
+        
+        Engines that take decoded pages keep them in memory until they
+        finish, so the decoded size is reserved on the memory budget up
+        front. The reservation is entered on held (released when the caller
+        closes it) or, without held, covers decoding only.
+        
+        Pages in skip_pages (already checkpointed) are neither rasterized
+        nor planned; a whole-PDF input is planned unless every page is skipped.
+        
+        Rasterized pages go to shared-memory page buffers when they fit (see
+        page_buffers.py); each input then holds its page's buffer until
+        released.
         
-        Args:
-            file_path: Path to file (PDF will be converted to images)
-            
         Returns:
-            Standardized OCR result
+            (inputs, temp_paths) where temp_paths are rasterized pages on
+            disk to delete once the engine is done
         """
+        capabilities = engine.capabilities
+        is_pdf = file_path.lower().endswith('.pdf')
+        skip_pages = set(skip_pages)
+        
+        if is_pdf:
+            file_handler = self._file_handler_for(file_path)
+            page_count = file_handler.get_page_count(file_path)
+            if capabilities.accepts_pdf(page_count, os.path.getsize(file_path)):
+                if skip_pages >= set(range(1, page_count + 1)):
+                    return [], []
+                return [EngineInput(INPUT_PDF, page_count=page_count, path=file_path)], []
+            page_numbers = [page for page in range(1, page_count + 1) if page not in skip_pages]
+            image_paths, buffers = self._render_pages(file_handler, file_path, page_numbers, bool(skip_pages))
+            temp_paths = [] if buffers else image_paths
+        else:
+            page_numbers = [] if 1 in skip_pages else [1]
+            image_paths = [file_path] if page_numbers else []
+            buffers = []
+            temp_paths = []
+        buffers = buffers or [None] * len(image_paths)
+        
         try:
-            if not self.check_tesseract_available():
-                raise RuntimeError("Tesseract is not available")
-            
-            logger.info(f"Processing with Tesseract: {file_path}")
-            start_time = time.time()
-            
-            # Prepare file(s) for OCR
-            if file_path.lower().endswith('.pdf'):
-                # Use FileHandler to convert PDF to images
-                temp_file_handler = FileHandler(os.path.dirname(file_path))
-                image_paths = temp_file_handler.convert_pdf_to_images(file_path)
-            else:
-                image_paths = [file_path]
-            
-            # Process each image
-            all_text = []
-            total_confidence = 0
-            
-            for image_path in image_paths:
-                try:
-                    # Get text with confidence data
-                    data = pytesseract.image_to_data(
-                        image_path,
-                        output_type=pytesseract.Output.DICT,
-                        config='--psm 6'  # Uniform block of text
-                    )
-                    
-                    # Extract text and calculate confidence
-                    page_text = []
-                    confidences = []
-                    
-                    for i, word in enumerate(data['text']):
-                        if word.strip():  # Only non-empty words
-                            page_text.append(word)
-                            conf = int(data['conf'][i]) if data['conf'][i] != '-1' else 0
-                            confidences.append(conf)
-                    
-                    page_text_str = ' '.join(page_text)
-                    if page_text_str.strip():
-                        all_text.append(page_text_str)
-                        
-                        # Calculate average confidence for this page
-                        if confidences:
-                            page_confidence = sum(confidences) / len(confidences)
-                            total_confidence += page_confidence
-                    
-                    logger.info(f"Tesseract processed page: {len(page_text)} words")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing image {image_path}: {str(e)}")
-                    # Continue with other images
-                    continue
-            
-            # Clean up temporary images if PDF was converted
-            if file_path.lower().endswith('.pdf'):
-                for img_path in image_paths:
-                    try:
-                        os.remove(img_path)
-                    except Exception:
-                        pass
-            
-            # Combine results
-            full_text = '\n\n'.join(all_text)
-            avg_confidence = (total_confidence / len(image_paths)) / 100.0 if image_paths else 0.0
-            
-            processing_time = time.time() - start_time
-            
-            logger.info(f"Tesseract completed in {processing_time:.2f}s, confidence: {avg_confidence:.2f}")
-            
-            return {
-                'text': full_text,
-                'confidence': round(avg_confidence, 2),
-                'service': 'tesseract',
-                'processing_time': round(processing_time, 2),
-                'pages_processed': len(image_paths),
-                'words_found': len(full_text.split()) if full_text else 0
-            }
-            
-        except Exception as e:
-            logger.error(f"Tesseract processing error: {str(e)}")
-            raise RuntimeError(f"Tesseract OCR failed: {str(e)}")
+            return self._page_inputs(capabilities.page_input_kind(), page_numbers, image_paths, buffers,
+                                     held), temp_paths
+        except Exception:
+            # The caller never sees these pages, so their buffers and files are still ours to drop
+            for buffer in buffers:
+                if buffer is not None:
+                    buffer.release()
+            _remove_files(temp_paths)
+            raise
     
-    def process_with_google_vision(self, file_path: str) -> Dict[str, Any]:
+    def _page_inputs(self, kind: str, page_numbers: List[int], image_paths: List[str], buffers: list,
+                     held: ExitStack = None) -> List[EngineInput]:
+        """Engine inputs for rendered or uploaded pages; INPUT_PAGE decodes them under a memory reservation"""
+        if kind in (INPUT_IMAGE_FILE, INPUT_IMAGE_BYTES):
+            return [EngineInput(kind, page_number, path=image_path, buffer=buffer)
+                    for page_number, image_path, buffer in zip(page_numbers, image_paths, buffers)]
+        
+        decoded_bytes = 0
+        for image_path in image_paths:
+            with Image.open(image_path) as img:  # header only, no pixels decoded
+                decoded_bytes += memory_budget.image_bytes(img.width, img.height, img.mode)
+        
+        with ExitStack() as decoding:
+            (held if held is not None else decoding).enter_context(
+                memory_budget.reserve(decoded_bytes, purpose='decode'))
+            inputs = []
+            for page_number, image_path, buffer in zip(page_numbers, image_paths, buffers):
+                with Image.open(image_path) as img:
+                    img.load()
+                    inputs.append(EngineInput(INPUT_PAGE, page_number, path=image_path, data=img.copy(),
+                                              buffer=buffer))
+                metrics.PAGE_BYTES_COPIED.inc(memory_budget.image_bytes(img.width, img.height, img.mode),
+                                              stage='decode')
+        return inputs
+    
+    def _render_pages(self, file_handler: FileHandler, file_path: str, page_numbers: List[int], subset: bool):
         """
-        Process file with Google Vision API - Now with REAL implementation
+        Rasterize pages into page buffers if the pool has room, else into the upload folder
+        
+        subset is True when page_numbers leaves out some pages (others are checkpointed).
         
-        Args:
-            file_path: Path to file (PDF, JPG, PNG)
-            
         Returns:
-            Standardized OCR result
+            (image_paths, buffers); buffers is empty when the pages went to disk
         """
+        pages = page_numbers if subset else None
+        page_bytes = memory_budget.raster_page_bytes(
+            file_handler.get_page_points(file_path), FileHandler.RENDER_DPI,
+            grayscale=rasterizer.rasterizer.grayscale, copies=1)
+        pool = page_buffers.pool
+        if not pool.reserve(page_bytes * len(page_numbers)):
+            image_paths = file_handler.convert_pdf_to_images(file_path, pages=pages)
+            metrics.PAGE_BYTES_COPIED.inc(sum(os.path.getsize(path) for path in image_paths), stage='disk')
+            return image_paths, []
+        
         try:
-            if not self.check_google_vision_available():
-                # Return mock response if API not available
-                return self._mock_google_response(file_path)
-            
-            logger.info(f"Processing with Google Vision API (REAL): {file_path}")
-            start_time = time.time()
-            
-            client = vision.ImageAnnotatorClient()
+            image_paths = file_handler.convert_pdf_to_images(file_path, pages=pages, output_folder=pool.folder)
+        except Exception:
+            pool.unreserve(page_bytes * len(page_numbers))
+            raise
+        pool.unreserve(page_bytes * (len(page_numbers) - len(image_paths)))
+        return image_paths, [pool.adopt(path, page_bytes) for path in image_paths]
+    
+    def _run_batch(self, engine, batch: List[EngineInput], journal: PageJournal = None) -> List[Dict[str, Any]]:
+        """Run one batch; the caller holds one of the engine's concurrency slots"""
+        page_numbers = [item.page_number for item in batch]
+        try:
+            with tracing.span('engine.batch', engine=engine.name, pages=page_numbers):
+                if journal:
+                    journal.started(page_numbers)
+                results = engine.recognize(batch)
+            if len(results) != len(batch):
+                raise RuntimeError(f"{engine.display_name} returned {len(results)} results for {len(batch)} inputs")
+        except Exception as e:
+            if journal:
+                journal.failed(page_numbers, str(e))
+            raise
+        finally:
+            # Free the batch's pages now rather than when the whole document is done
+            for item in batch:
+                item.release()
+        
+        entries = [page_entry(item, page) for item, page in zip(batch, results)]
+        if journal:
+            journal.finished(entries, {item.page_number: page['error']
+                                       for item, page in zip(batch, results) if page.get('error')})
+        return entries
+    
+    def run_engine(self, engine, file_path: str, journal: PageJournal = None) -> Dict[str, Any]:
+        """
+        Run an engine over a file: plan inputs, batch them, run batches in
+        parallel up to the engine's max_concurrency and combine the pages
+        into a standardized result
+        
+        Multi-batch documents go through the page scheduler, which shares
+        the engine's slots fairly between jobs one batch at a time.
+        
+        With a journal, pages checkpointed by an earlier attempt are reused
+        and each finished batch is checkpointed as it completes.
+        """
+        start_time = time.time()
+        restored = journal.begin(engine.name) if journal else {}
+        covered = {page + offset for page, entry in restored.items()
+                   for offset in range(entry.get('page_count', 1))}
+        
+        # held keeps decoded pages' memory reservation until the engine is done
+        with ExitStack() as held:
+            try:
+                inputs, temp_paths = self.plan_inputs(engine, file_path, held, skip_pages=covered)
+            except memory_budget.MemoryBudgetTimeout:
+                raise
+            except Exception as e:
+                logger.error("Could not prepare %s for %s: %s", file_path, engine.display_name, e)
+                raise DocumentInputError(f"Could not read document: {e}") from e
+            if journal:
+                journal.planned([item.page_number for item in inputs])
             
-            # Handle PDFs natively with Google Vision - NO pdf2image conversion needed!
-            if file_path.lower().endswith('.pdf'):
-                logger.info("Using Google Vision native PDF processing")
-                
-                with open(file_path, 'rb') as file:
-                    content = file.read()
-                
-                image = vision.Image(content=content)
-                
-                # Use document_text_detection for PDFs (better for documents)
-                response = client.document_text_detection(image=image)
-                
-                if response.error.message:
-                    raise Exception(f"Google Vision PDF error: {response.error.message}")
-                
-                # Extract full document text
-                if response.full_text_annotation:
-                    full_text = response.full_text_annotation.text
-                    # Count pages from response
-                    pages_count = len(response.full_text_annotation.pages) if response.full_text_annotation.pages else 1
-                else:
-                    full_text = ""
-                    pages_count = 1
-                
-                logger.info(f"Google Vision processed PDF: {len(full_text)} chars, {pages_count} pages")
-                
-            else:
-                # Handle images
-                logger.info("Processing image with Google Vision")
-                
-                with open(file_path, 'rb') as file:
-                    content = file.read()
-                
-                image = vision.Image(content=content)
-                
-                # Use text_detection for images
-                response = client.text_detection(image=image)
-                
-                if response.error.message:
-                    raise Exception(f"Google Vision image error: {response.error.message}")
+            try:
+                batch_size = engine.capabilities.batch_size
+                batches = [inputs[i:i + batch_size] for i in range(0, len(inputs), batch_size)]
                 
-                texts = response.text_annotations
-                if texts:
-                    full_text = texts[0].description
+                if len(batches) <= 1:
+                    entries = []
+                    for batch in batches:
+                        with engine.slots:
+                            entries += self._run_batch(engine, batch, journal)
                 else:
-                    full_text = ""
-                
-                pages_count = 1
-                logger.info(f"Google Vision processed image: {len(full_text)} chars")
-            
-            processing_time = time.time() - start_time
-            
-            # Calculate confidence - Google Vision is highly accurate
-            confidence = 0.95 if full_text.strip() else 0.0
-            words_found = len(full_text.split()) if full_text else 0
-            
-            logger.info(f"Google Vision completed in {processing_time:.2f}s, confidence: {confidence:.2f}")
-            
-            return {
-                'text': full_text,
-                'confidence': round(confidence, 2),
-                'service': 'google_vision',
-                'processing_time': round(processing_time, 2),
-                'pages_processed': pages_count,
-                'words_found': words_found
-            }
-            
-        except Exception as e:
-            logger.error(f"Google Vision processing error: {str(e)}")
-            raise RuntimeError(f"Google Vision OCR failed: {str(e)}")
+                    tasks = [partial(self._run_batch, engine, batch, journal) for batch in batches]
+                    entries = [entry for batch_entries in self._page_scheduler.run(engine.slots, tasks)
+                               for entry in batch_entries]
+            finally:
+                for item in inputs:
+                    item.release()
+                _remove_files(temp_paths)
+        
+        # Engines report per-page errors instead of raising; a run where every page failed is an engine failure
+        failed = [entry for entry in entries if entry.get('error')]
+        if entries and len(failed) == len(entries):
+            raise RuntimeError(f"{engine.display_name} failed on every page: {failed[0]['error']}")
+        
+        pages = sorted(list(restored.values()) + entries, key=lambda entry: entry['page'])
+        
+        full_text = '\n\n'.join(page['text'] for page in pages if page['text'].strip())
+        pages_processed = sum(page.get('page_count', 1) for page in pages)
+        confidence = sum(page['confidence'] for page in pages) / len(pages) if pages else 0.0
+        processing_time = time.time() - start_time
+        
+        logger.info("%s completed in %.2fs, confidence: %.2f", engine.display_name, processing_time, confidence)
+        
+        result = {
+            'text': full_text,
+            'confidence': round(confidence, 2),
+            'service': engine.result_service,
+            'processing_time': round(processing_time, 2),
+            'pages_processed': pages_processed,
+            'words_found': sum(page['words'] for page in pages),
+            'pages': pages
+        }
+        if covered:
+            result['resumed_pages'] = len(covered)
+        return result
     
-    def process_with_aws_textract(self, file_path: str) -> Dict[str, Any]:
+    def _call_with_breaker(self, service: str, file_path: str, journal: PageJournal = None) -> Dict[str, Any]:
+        """Call a service through its circuit breaker, recording the outcome"""
+        breaker = self.breakers.get(service)
+        if not breaker.allow_request():
+            raise CircuitOpenError(service, breaker.retry_after())
+        
+        start_time = time.time()
+        try:
+            with tracing.span(f'engine.{service}'):
+                result = self._call_service(service, file_path, journal)
+        except NOT_ENGINE_FAILURES:
+            # A bad upload or a busy host says nothing about the engine's health
+            breaker.record_ignored()
+            metrics.ENGINE_CALL_SECONDS.observe(time.time() - start_time, engine=service, outcome='input_error')
+            raise
+        except Exception:
+            elapsed = time.time() - start_time
+            breaker.record_failure(elapsed, attempted_pages(journal))
+            metrics.ENGINE_CALL_SECONDS.observe(elapsed, engine=service, outcome='error')
+            raise
+        elapsed = time.time() - start_time
+        # Pages restored from a checkpoint cost nothing this time
+        pages = result.get('pages_processed', 1) - result.get('resumed_pages', 0)
+        breaker.record_success(elapsed, pages)
+        metrics.ENGINE_CALL_SECONDS.observe(elapsed, engine=service, outcome='success')
+        metrics.PAGES_TOTAL.inc(pages, engine=service)
+        if pages > 0:
+            self.router.record_latency(service, elapsed, pages)
+        return result
+    
+    def process(self, service: str, file_path: str, allow_fallback: bool = False,
+                journal: PageJournal = None) -> Dict[str, Any]:
         """
-        Process file with AWS Textract
+        Process file with the requested service, honouring circuit breakers
         
         Args:
+            service: API service name (tesseract, google, aws)
             file_path: Path to file
+            allow_fallback: Route to Tesseract when the requested service's
+                breaker is open or the call fails
+            journal: Checkpoints pages and tracks their state (see checkpoints.py)
             
         Returns:
-            Standardized OCR result
+            Standardized OCR result with 'service_used' and, when the
+            fallback was taken, 'fallback_reason'
+            
+        Raises:
+            CircuitOpenError: breaker is open and fallback is not allowed
         """
         try:
-            if not self.check_aws_textract_available():
-                # Return mock response if API not available
-                return self._mock_aws_response(file_path)
-            
-            logger.info(f"Processing with AWS Textract: {file_path}")
-            start_time = time.time()
-            
-            client = boto3.client('textract')
+            result = self._call_with_breaker(service, file_path, journal)
+            result['service_used'] = service
+            return result
+        except Exception as e:
+            if not allow_fallback or service == self.FALLBACK_SERVICE:
+                raise
             
-            # Prepare file(s) for OCR
-            if file_path.lower().endswith('.pdf'):
-                # For PDF, AWS Textract can handle it directly
-                with open(file_path, 'rb') as document:
-                    response = client.detect_document_text(
-                        Document={'Bytes': document.read()}
-                    )
+            if isinstance(e, CircuitOpenError):
+                fallback_reason = 'circuit_open'
             else:
-                # For images
-                with open(file_path, 'rb') as document:
-                    response = client.detect_document_text(
-                        Document={'Bytes': document.read()}
-                    )
-            
-            # Extract text from response
-            all_text = []
-            total_confidence = 0
-            word_count = 0
-            
-            for block in response['Blocks']:
-                if block['BlockType'] == 'LINE':
-                    all_text.append(block['Text'])
-                elif block['BlockType'] == 'WORD':
-                    total_confidence += block['Confidence']
-                    word_count += 1
-            
-            full_text = '\n'.join(all_text)
-            avg_confidence = (total_confidence / word_count / 100.0) if word_count > 0 else 0.0
-            
-            processing_time = time.time() - start_time
-            
-            logger.info(f"AWS Textract completed in {processing_time:.2f}s, confidence: {avg_confidence:.2f}")
-            
-            return {
-                'text': full_text,
-                'confidence': round(avg_confidence, 2),
-                'service': 'aws_textract',
-                'processing_time': round(processing_time, 2),
-                'pages_processed': 1,  # AWS handles multi-page PDFs as one request
-                'words_found': word_count
-            }
-            
-        except Exception as e:
-            logger.error(f"AWS Textract processing error: {str(e)}")
-            raise RuntimeError(f"AWS Textract OCR failed: {str(e)}")
-    
-    def _mock_google_response(self, file_path: str) -> Dict[str, Any]:
-        """Generate mock response for Google Vision when API is not available"""
-        logger.info("Generating mock Google Vision response (API not configured)")
+                fallback_reason = f'{type(e).__name__}: {str(e)}'
+            logger.warning("Falling back from %s to %s: %s", service, self.FALLBACK_SERVICE, fallback_reason)
         
-        return {
-            'text': 'MOCK RESPONSE - Google Vision API\n\nThis is a simulated OCR result for testing purposes.\n\nActual file: ' + os.path.basename(file_path) + '\n\nTo get real results, configure Google Vision API credentials.',
-            'confidence': 0.0,
-            'service': 'google_vision_mock',
-            'processing_time': 0.5,
-            'pages_processed': 1,
-            'words_found': 20
-        }
+        result = self._call_with_breaker(self.FALLBACK_SERVICE, file_path, journal)
+        result['service_used'] = self.FALLBACK_SERVICE
+        result['fallback_reason'] = fallback_reason
+        return result
     
-    def _mock_aws_response(self, file_path: str) -> Dict[str, Any]:
-        """Generate mock response for AWS Textract when API is not available"""
-        logger.info("Generating mock AWS Textract response (API not configured)")
-        
-        return {
-            'text': 'MOCK RESPONSE - AWS Textract\n\nThis is a simulated OCR result for testing purposes.\n\nActual file: ' + os.path.basename(file_path) + '\n\nTo get real results, configure AWS credentials.',
-            'confidence': 0.0,
-            'service': 'aws_textract_mock',
-            'processing_time': 0.7,
-            'pages_processed': 1,
-            'words_found': 18
-        }
+    def process_with_tesseract(self, file_path: str) -> Dict[str, Any]:
+        """Process file with Tesseract OCR (PDFs are rasterized page by page)"""
+        return self._call_service('tesseract', file_path)
+    
+    def process_with_google_vision(self, file_path: str) -> Dict[str, Any]:
+        """Process file with Google Vision API, or a mock result if it is not configured"""
+        return self._call_service('google', file_path)
+    
+    def process_with_aws_textract(self, file_path: str) -> Dict[str, Any]:
+        """Process file with AWS Textract, or a mock result if it is not configured"""
+        return self._call_service('aws', file_path)
     
     def get_service_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all OCR services"""
@@ -416,16 +528,22 @@ class OCRServices:
             'tesseract': {
                 'available': self.check_tesseract_available(),
                 'type': 'local',
-                'requires_api_key': False
+                'requires_api_key': False,
+                'breaker': self.breakers.get('tesseract').snapshot(),
+                'capabilities': self.engines['tesseract'].capabilities.to_dict()
             },
             'google_vision': {
                 'available': self.check_google_vision_available(),
                 'type': 'cloud',
-                'requires_api_key': True
+                'requires_api_key': True,
+                'breaker': self.breakers.get('google').snapshot(),
+                'capabilities': self.engines['google'].capabilities.to_dict()
             },
             'aws_textract': {
                 'available': self.check_aws_textract_available(),
                 'type': 'cloud',
-                'requires_api_key': True
+                'requires_api_key': True,
+                'breaker': self.breakers.get('aws').snapshot(),
+                'capabilities': self.engines['aws'].capabilities.to_dict()
             }
         }
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Page Buffers Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Shared-memory page buffers between the rasterizer and the OCR processes.
+
+pdftoppm and Tesseract run as separate processes. Without page buffers,
+rendered pages travel between them as files in UPLOAD_FOLDER. Each page
+bitmap (tens of MB at 200 DPI) is written to disk, often shared network
+storage in distributed mode, and read back. The 'single' rasterizer also
+pipes every bitmap through this process and re-encodes it.
+
+With page buffers, pages are rendered into named shared-memory segments.
+These are files under /dev/shm, which is how Linux exposes POSIX shared
+memory. Only the segment name crosses a process boundary: pdftoppm writes
+the bitmap in place, and Tesseract opens it by name.
+
+Segments are reference counted. The job holds one reference per page until
+the page's batch is done. Anything that keeps a page longer calls retain().
+The segment is unlinked when the last reference is released.
+
+Segments count against PAGE_BUFFER_MAX_MB and the free space in the
+folder. A document whose pages don't fit renders to disk as before. Each
+process keeps its segments in <folder>/<pid>. Folders left behind by
+processes that died are removed at startup.
+
+ocr_page_bytes_copied_total{stage} counts page bytes copied through this
+process or to disk. ocr_page_buffer_shared_bytes_total counts bytes handed
+over by name. Together they compare both paths.
+
+Configured once at startup:
+    page_buffers.configure(folder='/dev/shm/sme-pages', limit_mb=512)
+"""
+
+import os
+import atexit
+import shutil
+import logging
+import threading
+from typing import Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class PageBuffer:
+    """One page image in a shared-memory segment, unlinked with its last reference"""
+
+    def __init__(self, pool: 'PageBufferPool', path: str, reserved: int):
+        self.pool = pool
+        self.path = path
+        self.nbytes = os.path.getsize(path)
+        self.reserved = reserved
+        self._refs = 1
+
+    @property
+    def name(self) -> str:
+        """Segment name, relative to the pool folder"""
+        return os.path.basename(self.path)
+
+    def retain(self) -> 'PageBuffer':
+        """Take another reference"""
+        with self.pool._lock:
+            if not self._refs:
+                raise RuntimeError(f"Page buffer {self.name} was already released")
+            self._refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the last one unlinks the segment"""
+        with self.pool._lock:
+            self._refs -= 1
+            if self._refs:
+                return
+        self.pool._free(self)
+
+
+class PageBufferPool:
+    """Shared-memory folder for page images, bounded by a byte limit"""
+
+    def __init__(self, folder: Optional[str] = None, limit_bytes: int = 0):
+        """
+        Args:
+            folder: Shared-memory folder (e.g. /dev/shm/sme-pages); None disables page buffers
+            limit_bytes: Bytes that segments may hold at once; 0 leaves only the free-space check
+        """
+        self.limit_bytes = limit_bytes
+        self.reserved_bytes = 0
+        self.held_bytes = 0
+        self._lock = threading.Lock()
+        self.folder = None
+        if folder:
+            self.folder = self._prepare(folder)
+
+    @property
+    def enabled(self) -> bool:
+        return self.folder is not None
+
+    def _prepare(self, root: str) -> Optional[str]:
+        """Create this process's folder and remove the ones of dead processes"""
+        try:
+            os.makedirs(root, exist_ok=True)
+            for entry in os.listdir(root):
+                if entry.isdigit() and int(entry) != os.getpid() and not _process_alive(int(entry)):
+                    shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+                    logger.info("Removed page buffers left by process %s", entry)
+            folder = os.path.join(root, str(os.getpid()))
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            logger.warning("Page buffers disabled; cannot use %s: %s", root, e)
+            return None
+        atexit.register(shutil.rmtree, folder, True)
+        return folder
+
+    def reserve(self, nbytes: int) -> bool:
+        """Reserve room for a document's pages; False when they should go to disk instead"""
+        if not self.enabled:
+            return False
+        nbytes = max(0, int(nbytes))
+        with self._lock:
+            if self.limit_bytes and self.reserved_bytes + nbytes > self.limit_bytes:
+                return False
+            try:
+                free = shutil.disk_usage(self.folder).free
+            except OSError:
+                return False
+            if self.reserved_bytes - self.held_bytes + nbytes > free:
+                return False
+            self.reserved_bytes += nbytes
+        return True
+
+    def unreserve(self, nbytes: int):
+        """Return reserved room that no buffer took up"""
+        with self._lock:
+            self.reserved_bytes -= max(0, int(nbytes))
+
+    def adopt(self, path: str, reserved: int) -> PageBuffer:
+        """Wrap a page rendered into the pool folder; reserved is its share of a reserve() call"""
+        buffer = PageBuffer(self, path, reserved)
+        with self._lock:
+            self.held_bytes += buffer.nbytes
+        metrics.PAGE_BUFFER_BYTES.inc(buffer.nbytes)
+        metrics.PAGE_BUFFER_SHARED_BYTES.inc(buffer.nbytes)
+        return buffer
+
+    def _free(self, buffer: PageBuffer):
+        try:
+            os.remove(buffer.path)
+        except OSError as e:
+            logger.warning("Could not unlink page buffer %s: %s", buffer.name, e)
+        with self._lock:
+            self.held_bytes -= buffer.nbytes
+            self.reserved_bytes -= buffer.reserved
+        metrics.PAGE_BUFFER_BYTES.dec(buffer.nbytes)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Alive, owned by another user
+    return True
+
+
+pool = PageBufferPool()
+
+
+def configure(folder: Optional[str] = None, limit_mb: float = 0):
+    """Configure the module-level pool; folder None disables page buffers"""
+    global pool
+    pool = PageBufferPool(folder, int(limit_mb * MB))
+    if pool.enabled:
+        logger.info("Page buffers in %s (limit %.0fMB)", pool.folder, limit_mb)
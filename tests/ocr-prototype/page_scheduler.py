@@ -0,0 +1,147 @@
+"""
+Page Scheduler Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Page-granular scheduling of engine batches across jobs.
+
+Each job hands its page batches to the scheduler as one task group.
+Worker threads take one task at a time from the groups in round-robin
+order, so pages of concurrent jobs interleave: a 150-page PDF gets the
+same share of engine slots as a one-page receipt instead of holding them
+until it is done. A group whose engine has no free concurrency slot is
+skipped, and its turn goes to the next group.
+
+The job's own thread does not sit idle while it waits. It works through
+its group from the front, and the scheduler workers steal from the back.
+The job's thread takes its turn like everyone else. It waits while another
+job ahead in the rotation has pages queued for the same engine, so a
+freed slot never goes straight back to the job that just released it.
+Results are put back in task order, whoever ran them.
+
+Usage:
+    scheduler = PageScheduler(workers=16)
+    results = scheduler.run(engine.slots, [partial(run_batch, batch) for batch in batches])
+"""
+
+import logging
+import threading
+from collections import deque
+from contextvars import copy_context
+from typing import Any, Callable, List
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Waiters also re-check on this interval, since engine slots can be released
+# by callers that bypass the scheduler (single-batch documents)
+POLL_SECONDS = 0.05
+
+
+class _TaskGroup:
+    """Page tasks of one engine run"""
+
+    def __init__(self, slots: threading.Semaphore, tasks: List[Callable[[], Any]]):
+        self.slots = slots
+        self.pending = deque((index, copy_context(), task) for index, task in enumerate(tasks))
+        self.results = [None] * len(tasks)
+        self.errors = {}
+        self.running = 0
+
+    def done(self) -> bool:
+        return not self.pending and not self.running
+
+
+class PageScheduler:
+    """Interleaves page tasks of concurrent jobs with per-job round-robin and work stealing"""
+
+    def __init__(self, workers: int, name: str = 'ocr-page'):
+        self.workers = max(1, workers)
+        self._groups = deque()
+        self._condition = threading.Condition()
+        metrics.PAGE_SCHEDULER_JOBS.set_function(lambda: len(self._groups))
+        for index in range(self.workers):
+            threading.Thread(target=self._worker, name=f'{name}-{index}', daemon=True).start()
+
+    def run(self, slots: threading.Semaphore, tasks: List[Callable[[], Any]]) -> List[Any]:
+        """
+        Run tasks, each while holding one of slots, and return their results in order
+
+        Every task runs even if an earlier one fails (finished pages are
+        checkpointed); the first failure in task order is raised afterwards.
+        """
+        group = _TaskGroup(slots, tasks)
+        with self._condition:
+            self._groups.append(group)
+            self._condition.notify_all()
+
+        try:
+            while True:
+                with self._condition:
+                    if group.done():
+                        break
+                    task = self._take(group, steal=False) if self._owner_turn(group) else None
+                    if task is None:
+                        self._condition.wait(POLL_SECONDS)
+                        continue
+                    # Go to the back of the rotation, as a worker's pick would
+                    self._groups.remove(group)
+                    self._groups.append(group)
+                self._execute(group, task, runner='owner')
+        finally:
+            with self._condition:
+                if group in self._groups:
+                    self._groups.remove(group)
+
+        for index in sorted(group.errors):
+            raise group.errors[index]
+        return group.results
+
+    def _owner_turn(self, group: _TaskGroup) -> bool:
+        """Whether no job ahead of group in the rotation has pages waiting for the same engine"""
+        for other in self._groups:
+            if other is group:
+                return True
+            if other.slots is group.slots and other.pending:
+                return False
+        return True
+
+    def _take(self, group: _TaskGroup, steal: bool):
+        """Pop a task from the front (owner) or back (thief) if the engine has a free slot"""
+        if not group.pending or not group.slots.acquire(blocking=False):
+            return None
+        group.running += 1
+        return group.pending.pop() if steal else group.pending.popleft()
+
+    def _next_task(self):
+        """Round-robin over groups: one task from the first group that can run one"""
+        for _ in range(len(self._groups)):
+            group = self._groups[0]
+            self._groups.rotate(-1)
+            task = self._take(group, steal=True)
+            if task is not None:
+                return group, task
+        return None, None
+
+    def _execute(self, group: _TaskGroup, task, runner: str):
+        index, context, fn = task
+        metrics.PAGE_TASKS_TOTAL.inc(runner=runner)
+        try:
+            group.results[index] = context.run(fn)
+        except Exception as e:
+            group.errors[index] = e
+        finally:
+            group.slots.release()
+            with self._condition:
+                group.running -= 1
+                self._condition.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                group, task = self._next_task()
+                if task is None:
+                    # Sleep until a job arrives; poll for free slots while jobs are waiting
+                    self._condition.wait(POLL_SECONDS if self._groups else None)
+                    continue
+            self._execute(group, task, runner='worker')
@@ -0,0 +1,157 @@
+"""
+Profiling Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Opt-in profiling of a single request.
+
+Two modes are supported:
+- cprofile: deterministic profiling with cProfile, saved as a pstats file
+- sample: a background thread samples the request thread's stack and
+  writes collapsed stacks ("frame;frame;frame count") for flamegraph tools
+
+Requests that do not ask for profiling never touch this module beyond a
+header/query check, so there is no overhead on the normal path.
+"""
+
+import os
+import sys
+import time
+import hmac
+import pstats
+import cProfile
+import logging
+import threading
+from io import StringIO
+from contextlib import contextmanager
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'sample')
+
+EXTENSIONS = {
+    'cprofile': 'prof',
+    'sample': 'collapsed'
+}
+
+# Every sort key pstats accepts, including abbreviations such as 'tottime'
+SORT_KEYS = frozenset(pstats.Stats.sort_arg_dict_default)
+
+
+def requested_mode(headers, args) -> Optional[str]:
+    """
+    Get the profiling mode asked for by a request
+
+    Looks at the X-Profile header first, then the 'profile' query
+    parameter. '1' or 'true' selects cprofile.
+    """
+    value = headers.get('X-Profile') or args.get('profile')
+    if not value:
+        return None
+
+    value = value.lower()
+    if value in ('1', 'true', 'yes'):
+        return 'cprofile'
+    if value in MODES:
+        return value
+    return None
+
+
+def is_admin(headers, admin_token: Optional[str]) -> bool:
+    """Check the X-Admin-Token header; profiling is disabled when no token is configured"""
+    if not admin_token:
+        return False
+    supplied = headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(supplied.encode('utf-8'), admin_token.encode('utf-8'))
+
+
+def profile_path(profile_folder: str, process_id: str, mode: str) -> str:
+    """Location of a job's profile file"""
+    return os.path.join(profile_folder, f"{process_id}.{EXTENSIONS[mode]}")
+
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: str):
+        """Write collapsed stacks for flamegraph tools"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile(mode: str, output_path: str, sample_interval: float = 0.005):
+    """
+    Profile the enclosed block and write the result to output_path
+
+    Yields a dict that is filled with profile metadata when the block exits.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Invalid profiling mode: {mode}. Choose: {', '.join(MODES)}")
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    info = {'mode': mode, 'path': output_path}
+    start_time = time.time()
+
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield info
+        finally:
+            profiler.disable()
+            profiler.dump_stats(output_path)
+            info['duration'] = round(time.time() - start_time, 3)
+    else:
+        sampler = StackSampler(threading.get_ident(), interval=sample_interval)
+        sampler.start()
+        try:
+            yield info
+        finally:
+            sampler.stop()
+            sampler.write(output_path)
+            info['duration'] = round(time.time() - start_time, 3)
+            info['samples'] = sampler.samples
+
+    logger.info("Profile written: %s (%s)", output_path, mode)
+
+
+def format_stats(path: str, sort: str = 'cumulative', limit: int = 50) -> str:
+    """Render a pstats file as text; ValueError for a sort key pstats does not know"""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Invalid sort key: {sort}. Choose: {', '.join(sorted(SORT_KEYS))}")
+    stream = StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,172 @@
+"""
+Rasterizer Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Renders PDF pages to image files for engines that need page images.
+
+Backends:
+- single: one pdftoppm call per chunk of pages, decoded into Pillow and
+  re-encoded as optimized PNG (the original path)
+- parallel: the document is split into page ranges rendered by several
+  pdftoppm processes at once, written straight to disk in a cheap format
+  (raw PPM, or PGM when grayscale) without passing through Pillow
+
+Both backends reserve their pixel buffers on the memory budget (see
+memory_budget.py). benchmarks.py times both at several page counts.
+
+Configured once at startup:
+    rasterizer.configure(backend='parallel', processes=4, fmt='ppm', grayscale=True)
+"""
+
+import os
+import logging
+from typing import List, Optional, Tuple
+
+from pdf2image import convert_from_path
+
+import metrics
+import tracing
+import memory_budget
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('single', 'parallel')
+FORMATS = ('ppm', 'png', 'jpeg')
+
+
+class Rasterizer:
+    """Renders PDF pages with the configured backend"""
+
+    def __init__(self, backend: str = 'single', processes: Optional[int] = None,
+                 fmt: str = 'ppm', grayscale: bool = False):
+        """
+        Args:
+            backend: 'single' or 'parallel'
+            processes: pdftoppm processes for 'parallel' (default CPU count)
+            fmt: 'parallel' output format: 'ppm' (raw; PGM when grayscale), 'png' or 'jpeg'
+            grayscale: Render one channel instead of RGB ('parallel' only)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown raster backend: {backend!r} (expected one of {', '.join(BACKENDS)})")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown raster format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+        self.backend = backend
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.fmt = fmt
+        self.grayscale = grayscale
+
+    def render(self, pdf_path: str, output_folder: str, dpi: int, page_count: int,
+               page_points: Tuple[float, float], pages: Optional[List[int]] = None) -> List[str]:
+        """
+        Render pages of a PDF into output_folder
+
+        Args:
+            pages: Page numbers to render (default every page)
+
+        Returns:
+            Page image paths in page order, named <pdf name>_page_<n>.<ext>
+        """
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        runs = page_runs(pages) if pages is not None else [(1, page_count)]
+        image_paths = []
+        for first_page, last_page in runs:
+            if self.backend == 'parallel':
+                image_paths += self._render_parallel(pdf_path, output_folder, base_name, dpi,
+                                                     first_page, last_page, page_points)
+            else:
+                image_paths += self._render_single(pdf_path, output_folder, base_name, dpi,
+                                                   first_page, last_page, page_points)
+        return image_paths
+
+    def _render_single(self, pdf_path: str, output_folder: str, base_name: str, dpi: int,
+                       run_first: int, run_last: int, page_points: Tuple[float, float]) -> List[str]:
+        page_bytes = memory_budget.raster_page_bytes(page_points, dpi)
+        chunk_pages = memory_budget.budget.pages_in_flight
+        image_paths = []
+
+        # Render a few pages at a time under the memory budget so decoded
+        # pages never pile up for the whole document
+        for first_page in range(run_first, run_last + 1, chunk_pages):
+            last_page = min(first_page + chunk_pages - 1, run_last)
+            with memory_budget.reserve(page_bytes * (last_page - first_page + 1), purpose='rasterize'):
+                with metrics.STAGE_SECONDS.time(stage='rasterize'), \
+                        tracing.span('pdf2image.convert_from_path', dpi=dpi,
+                                     first_page=first_page, last_page=last_page):
+                    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+                metrics.PAGE_BYTES_COPIED.inc(sum(memory_budget.image_bytes(image.width, image.height, image.mode)
+                                                  for image in images), stage='pipe')
+
+                # Save images temporarily
+                for offset, image in enumerate(images):
+                    page = first_page + offset
+                    image_path = os.path.join(output_folder, f"{base_name}_page_{page}.png")
+
+                    # Save as PNG for better OCR quality
+                    with metrics.STAGE_SECONDS.time(stage='preprocess'), \
+                            tracing.span('save_page_image', page=page):
+                        image.save(image_path, 'PNG', optimize=True)
+                    metrics.PAGE_BYTES_COPIED.inc(os.path.getsize(image_path), stage='encode')
+                    image_paths.append(image_path)
+
+                    logger.info("Saved PDF page %s: %s", page, image_path)
+                del images
+
+        return image_paths
+
+    def _render_parallel(self, pdf_path: str, output_folder: str, base_name: str, dpi: int,
+                         first_page: int, last_page: int, page_points: Tuple[float, float]) -> List[str]:
+        # pdftoppm writes each page to disk as it goes, so a process holds one page bitmap
+        page_bytes = memory_budget.raster_page_bytes(page_points, dpi, grayscale=self.grayscale, copies=1)
+        processes = min(self.processes, last_page - first_page + 1)
+        limit = memory_budget.budget.limit_bytes
+        if limit:
+            processes = max(1, min(processes, limit // page_bytes))
+
+        with memory_budget.reserve(page_bytes * processes, purpose='rasterize'):
+            with metrics.STAGE_SECONDS.time(stage='rasterize'), \
+                    tracing.span('pdf2image.convert_from_path', dpi=dpi, processes=processes,
+                                 fmt=self.fmt, grayscale=self.grayscale):
+                rendered = convert_from_path(
+                    pdf_path, dpi=dpi, first_page=first_page, last_page=last_page,
+                    output_folder=output_folder, output_file=f"{base_name}_r{first_page}_",
+                    fmt=self.fmt, grayscale=self.grayscale, thread_count=processes, paths_only=True
+                )
+
+        # pdf2image returns pages in order; give them the same names as the single backend
+        image_paths = []
+        for page, rendered_path in enumerate(rendered, start=first_page):
+            extension = os.path.splitext(rendered_path)[1]
+            image_path = os.path.join(output_folder, f"{base_name}_page_{page}{extension}")
+            os.replace(rendered_path, image_path)
+            image_paths.append(image_path)
+
+        logger.info("Rendered %s pages with %s pdftoppm processes", len(image_paths), processes)
+        return image_paths
+
+
+def page_runs(pages: List[int]) -> List[Tuple[int, int]]:
+    """Collapse page numbers into contiguous (first, last) runs"""
+    runs = []
+    for page in sorted(set(pages)):
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+rasterizer = Rasterizer()
+
+
+def configure(backend: str = 'single', processes: Optional[int] = None,
+              fmt: str = 'ppm', grayscale: bool = False):
+    """Configure the module-level rasterizer"""
+    global rasterizer
+    rasterizer = Rasterizer(backend, processes, fmt, grayscale)
+
+
+def render(pdf_path: str, output_folder: str, dpi: int, page_count: int,
+           page_points: Tuple[float, float], pages: Optional[List[int]] = None) -> List[str]:
+    """Render with the module-level rasterizer"""
+    return rasterizer.render(pdf_path, output_folder, dpi, page_count, page_points, pages)
+
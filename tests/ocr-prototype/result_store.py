@@ -0,0 +1,159 @@
+"""
+Result Store Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Keeps job result payloads (the per-page text of finished jobs) apart from
+job records.
+
+Job records used to hold every page's text until /api/cleanup removed the
+record. Server memory grew with every job, and each status poll copied the
+text along with the rest of the record. Now a finished job's pages are
+written to one JSON blob per process_id in RESULT_FOLDER, and the record
+keeps only metadata plus 'result_bytes'. Reads go through an LRU memory
+tier bounded by RESULT_CACHE_MB, so clients fetching a result right after
+the job finishes don't touch the disk.
+
+In distributed mode RESULT_FOLDER must be shared storage. Workers write
+the blobs, and API nodes read them.
+
+Configured once at startup:
+    result_store.configure(folder='job_results', cache_mb=64)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class ResultStore:
+    """Disk-backed result blobs with a size-bounded LRU memory tier"""
+
+    def __init__(self, folder: Optional[str] = None, cache_bytes: int = 0):
+        """
+        Args:
+            folder: Blob folder; None keeps results in memory only, without a bound
+            cache_bytes: Bytes of results kept in memory; 0 reads every result from disk
+        """
+        self.folder = folder
+        self.cache_bytes = cache_bytes
+        self.cached_bytes = 0
+        self._cache = OrderedDict()  # process_id -> (pages, nbytes), least recently used first
+        self._lock = threading.Lock()
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def _path(self, process_id: str) -> str:
+        return os.path.join(self.folder, f"{process_id}.json")
+
+    def put(self, process_id: str, pages: List[Dict[str, Any]]) -> int:
+        """Store a job's page entries; returns the blob size in bytes"""
+        data = json.dumps(pages).encode('utf-8')
+        if self.folder:
+            path = self._path(process_id)
+            # Write then rename, so readers on other nodes never see a partial blob
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        self._remember(process_id, pages, len(data))
+        return len(data)
+
+    def get(self, process_id: str) -> Optional[List[Dict[str, Any]]]:
+        """A job's page entries, or None when the store has none"""
+        with self._lock:
+            entry = self._cache.get(process_id)
+            if entry is not None:
+                self._cache.move_to_end(process_id)
+        if entry is not None:
+            metrics.CACHE_REQUESTS.inc(cache='result_store', result='hit')
+            return entry[0]
+        metrics.CACHE_REQUESTS.inc(cache='result_store', result='miss')
+        if not self.folder:
+            return None
+        try:
+            with open(self._path(process_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        pages = json.loads(data)
+        self._remember(process_id, pages, len(data))
+        return pages
+
+    def _remember(self, process_id: str, pages: List[Dict[str, Any]], nbytes: int):
+        """Put pages in the memory tier, evicting the least recently used beyond the limit"""
+        if self.folder and nbytes > self.cache_bytes:
+            self._forget(process_id)
+            return
+        with self._lock:
+            previous = self._cache.pop(process_id, None)
+            if previous is not None:
+                self.cached_bytes -= previous[1]
+            self._cache[process_id] = (pages, nbytes)
+            self.cached_bytes += nbytes
+            # Without a folder the memory tier is the only copy, so nothing is evicted
+            while self.folder and self.cached_bytes > self.cache_bytes:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self.cached_bytes -= evicted
+            metrics.RESULT_CACHE_BYTES.set(self.cached_bytes)
+
+    def _forget(self, process_id: str):
+        with self._lock:
+            entry = self._cache.pop(process_id, None)
+            if entry is not None:
+                self.cached_bytes -= entry[1]
+                metrics.RESULT_CACHE_BYTES.set(self.cached_bytes)
+
+    def delete(self, process_id: str):
+        self._forget(process_id)
+        if self.folder:
+            try:
+                os.remove(self._path(process_id))
+            except OSError:
+                pass
+
+    def cleanup(self, age_hours: int = 24) -> int:
+        """Delete blobs not written to for age_hours; returns the count"""
+        if not self.folder:
+            return 0
+        cutoff = time.time() - age_hours * 3600
+        deleted = 0
+        for filename in os.listdir(self.folder):
+            path = os.path.join(self.folder, filename)
+            try:
+                if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    self._forget(filename[:-len('.json')])
+                    deleted += 1
+            except OSError:
+                pass
+        return deleted
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'folder': self.folder,
+            'cached_results': len(self._cache),
+            'cached_bytes': self.cached_bytes,
+            'cache_limit_bytes': self.cache_bytes
+        }
+
+
+# Until configure(): results stay in memory, as in job records before
+store = ResultStore()
+
+
+def configure(folder: Optional[str] = None, cache_mb: float = 0) -> ResultStore:
+    """Configure the module-level store; folder None keeps results in memory only"""
+    global store
+    store = ResultStore(folder, int(cache_mb * MB))
+    if folder:
+        logger.info("Job results in %s (memory tier %.0fMB)", folder, cache_mb)
+    return store
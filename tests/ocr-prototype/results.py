@@ -0,0 +1,215 @@
+"""
+Results Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Builds /api/result and /api/status response bodies from job records.
+
+Jobs keep their text per page, in the result store once they finish
+(record['pages'] in records written before it); the joined 'text' field is
+assembled only when a response needs it, and the pages are only loaded
+then. Clients can ask for less:
+- pages=1-3,7,10-   only these pages (text is joined from them)
+- fields=status,confidence,text   only these top-level fields
+and responses are compressed when the client accepts gzip or brotli.
+
+/api/result can also stream a running job as NDJSON (stream=ndjson or
+Accept: application/x-ndjson): one JSON object per line for each engine
+start, finished page and failed page as it happens, then a closing
+'summary' object.
+"""
+
+import gzip
+import json
+import logging
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Always kept by field projection so clients can tell where a job is
+ALWAYS_FIELDS = ('status',)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Job record fields repeated in the summary that closes a result stream
+SUMMARY_FIELDS = ('status', 'service', 'engine', 'service_used', 'fallback_reason', 'confidence',
+                  'processing_time', 'pages_processed', 'words_found', 'resumed_pages',
+                  'error', 'error_type', 'completed_at')
+
+
+def page_entries(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-page entries for an OCR result; results without pages become one page"""
+    if result.get('pages'):
+        return result['pages']
+    return [{
+        'page': 1,
+        'text': result.get('text', '') or '',
+        'confidence': result.get('confidence', 0.0),
+        'words': result.get('words_found', 0)
+    }]
+
+
+def join_pages(pages: List[Dict[str, Any]]) -> str:
+    """Join page texts the way engines join a whole document"""
+    return '\n\n'.join(page['text'] for page in pages if page['text'].strip())
+
+
+def parse_page_ranges(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """
+    Parse a pages= parameter such as '1-3,7,10-'
+
+    Returns:
+        List of (first, last) ranges, last None for open-ended
+
+    Raises:
+        ValueError: malformed range
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        try:
+            start = int(first)
+            end = (int(last) if last else None) if dash else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((start, end))
+    if not ranges:
+        raise ValueError("Empty page range")
+    return ranges
+
+
+def select_pages(pages: List[Dict[str, Any]], ranges: List[Tuple[int, Optional[int]]]) -> List[Dict[str, Any]]:
+    """Pages overlapping any range (entries spanning several pages carry page_count)"""
+    selected = []
+    for page in pages:
+        first = page['page']
+        last = first + page.get('page_count', 1) - 1
+        for start, end in ranges:
+            if last >= start and (end is None or first <= end):
+                selected.append(page)
+                break
+    return selected
+
+
+def parse_fields(spec: Optional[str]) -> Optional[Set[str]]:
+    """Parse a fields= parameter into a set of names (None means all)"""
+    if not spec:
+        return None
+    return {field.strip() for field in spec.split(',') if field.strip()}
+
+
+def render_job(record: Dict[str, Any], pages_spec: Optional[str] = None,
+               fields: Optional[Set[str]] = None,
+               load_pages: Optional[Callable[[], Optional[List[Dict[str, Any]]]]] = None) -> Dict[str, Any]:
+    """
+    Build the response body for a job record
+
+    Without options the body matches the full job record (with 'text'
+    joined from its pages). With pages_spec the text covers only those
+    pages and the selected page entries are included under 'pages'.
+    Pages kept outside the record are fetched with load_pages, and only
+    when the body needs them; without load_pages the body has no text.
+    """
+    view = dict(record)
+    pages = view.pop('pages', None)
+
+    wants = (lambda name: True) if fields is None else (lambda name: name in fields or name in ALWAYS_FIELDS)
+
+    if pages is None and load_pages is not None and (pages_spec or wants('text') or wants('pages')):
+        pages = load_pages()
+
+    if pages is not None:
+        if pages_spec:
+            selected = select_pages(pages, parse_page_ranges(pages_spec))
+            view['page_range'] = pages_spec
+            view['total_pages'] = sum(page.get('page_count', 1) for page in pages)
+            if wants('pages'):
+                view['pages'] = selected
+        else:
+            selected = pages
+            if fields is not None and 'pages' in fields:
+                view['pages'] = pages
+        if wants('text'):
+            view['text'] = join_pages(selected)
+
+    if fields is not None:
+        view = {name: value for name, value in view.items() if wants(name)}
+    return view
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (None for identity)"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def acceptable(name):
+        return accepted.get(name, accepted.get('*', 0.0)) > 0
+
+    if BROTLI_AVAILABLE and acceptable('br'):
+        return 'br'
+    if acceptable('gzip'):
+        return 'gzip'
+    return None
+
+
+def encode_body(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress body for the client if it is worth it; returns (body, content_encoding)"""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+
+def wants_stream(stream_param: Optional[str], accept: Optional[str]) -> bool:
+    """Whether a result request asked for an NDJSON stream"""
+    if stream_param is not None:
+        return stream_param.lower() in ('1', 'true', 'ndjson')
+    return NDJSON_MIMETYPE in (accept or '')
+
+
+def ndjson_line(event: Dict[str, Any]) -> str:
+    return json.dumps(event, separators=(',', ':')) + '\n'
+
+
+def record_page_events(record: Dict[str, Any], pages: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Page events for a job that finished before the stream started (pages default to the record's)"""
+    engine = record.get('service_used') or record.get('engine')
+    if pages is None:
+        pages = record.get('pages')
+    return [dict(page, type='page', engine=engine) for page in pages or []]
+
+
+def summary_event(process_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Closing object of a result stream"""
+    summary = {'type': 'summary', 'process_id': process_id}
+    summary.update({name: record.get(name) for name in SUMMARY_FIELDS if name in record})
+    return summary
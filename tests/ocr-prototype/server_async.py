@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+OCR Testing Backend - Async (ASGI) Application
+Smart Data Extractor (SME) Project
+
+Quart variant of server.py with the same routes and JSON shapes; both
+serve the jobs of an ocr_api.OCRApi. Request handling runs on an event
+loop, so idle connections and status polls cost a coroutine instead of a
+thread. Blocking work is pushed to worker threads:
+
+- io pool: OCRApi calls (uploads, request checks and job starts, result
+  store and shared queue reads) and service probes
+- job dispatcher: OCR jobs in priority lanes, bounded by ASYNC_OCR_WORKERS
+
+Run with:
+    python server_async.py
+    hypercorn server_async:app --bind 127.0.0.1:5000
+"""
+
+from quart import Quart, request, jsonify, send_from_directory, send_file, Response
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime
+from functools import partial
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config import Config
+from ocr_api import OCRApi, RequestError
+import metrics
+import tracing
+import memory_budget
+import cpu_budget
+import page_buffers
+import result_store
+import rasterizer
+import log_config
+import results
+import shared_queue
+
+# Configure logging
+log_config.setup_logging(
+    mode=Config.LOG_MODE,
+    log_format=Config.LOG_FORMAT,
+    level=Config.LOG_LEVEL
+)
+logger = logging.getLogger(__name__)
+
+app = Quart(__name__)
+app.config.from_object(Config)
+
+# Initialize services
+tracing.configure(
+    mode=app.config['TRACE_EXPORT'],
+    path=app.config['TRACE_FILE'],
+    url=app.config['TRACE_COLLECTOR_URL'],
+    max_traces=app.config['TRACE_MAX_TRACES']
+)
+memory_budget.configure(
+    limit_mb=app.config['RASTER_MEMORY_BUDGET_MB'],
+    pages_in_flight=app.config['RASTER_PAGES_IN_FLIGHT'],
+    wait_timeout=app.config['RASTER_MEMORY_WAIT_TIMEOUT']
+)
+cpu_budget.configure(
+    cores=app.config['CPU_BUDGET_CORES'],
+    threads=app.config['TESSERACT_THREADS'],
+    processes=app.config['TESSERACT_PROCESSES'],
+    affinity=app.config['CPU_AFFINITY']
+)
+rasterizer.configure(
+    backend=app.config['RASTER_BACKEND'],
+    processes=app.config['RASTER_PROCESSES'],
+    fmt=app.config['RASTER_FORMAT'],
+    grayscale=app.config['RASTER_GRAYSCALE']
+)
+page_buffers.configure(
+    folder=app.config['PAGE_BUFFER_FOLDER'] if app.config['PAGE_BUFFERS'] else None,
+    limit_mb=app.config['PAGE_BUFFER_MAX_MB']
+)
+result_store.configure(
+    folder=app.config['RESULT_FOLDER'],
+    cache_mb=app.config['RESULT_CACHE_MB']
+)
+io_pool = ThreadPoolExecutor(max_workers=app.config['ASYNC_IO_WORKERS'], thread_name_prefix='io')
+api = OCRApi(app.config, workers=app.config['ASYNC_OCR_WORKERS'], name='ocr')
+
+LOG_SAMPLE_RATES = log_config.parse_sample_rates(app.config['LOG_SAMPLE_RATES'])
+
+# How often a streaming /api/result checks its job's journal
+STREAM_POLL_SECONDS = 0.1
+
+
+async def run_in(pool: ThreadPoolExecutor, func, *args, **kwargs):
+    """Run a blocking call on a pool, keeping the request's trace and log context"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, copy_context().run, partial(func, *args, **kwargs))
+
+@app.before_request
+async def sample_request_logs():
+    """Decide once per request whether its success-path logs are kept"""
+    route = request.url_rule.rule if request.url_rule else None
+    log_config.begin_request(route, LOG_SAMPLE_RATES, app.config['LOG_DEFAULT_SAMPLE_RATE'])
+
+@app.after_request
+async def add_cors_headers(response):
+    """Allow cross-origin calls from the frontend (flask-cors defaults)"""
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Headers'] = request.headers.get(
+            'Access-Control-Request-Headers', '*')
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    return response
+
+@app.errorhandler(RequestError)
+async def request_error(error):
+    """Respond to a request OCRApi rejected"""
+    response = jsonify(error.body)
+    response.headers.update(error.headers)
+    return response, error.status_code
+
+@app.errorhandler(413)
+async def request_entity_too_large(error):
+    """Handle file too large error"""
+    return jsonify({
+        'error': 'File too large. Maximum size is 10MB.',
+        'status': 'error'
+    }), 413
+
+@app.errorhandler(400)
+async def bad_request(error):
+    """Handle bad request errors"""
+    return jsonify({
+        'error': 'Bad request. Please check your input.',
+        'status': 'error'
+    }), 400
+
+@app.errorhandler(500)
+async def internal_error(error):
+    """Handle internal server errors"""
+    logger.error("Internal server error: %s", error)
+    return jsonify({
+        'error': 'Internal server error. Please try again later.',
+        'status': 'error'
+    }), 500
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'services': await run_in(io_pool, api.availability),
+        'queues': await run_in(io_pool, api.queue_status)
+    })
+
+async def job_record(process_id):
+    """Job record; read on io_pool in distributed mode, where it comes from the shared queue"""
+    if api.shared_jobs:
+        return await run_in(io_pool, api.job_record, process_id)
+    return api.job_record(process_id)
+
+async def wait_for_job(process_id, timeout=None):
+    """Poll a job record until the job has finished or timeout seconds pass; returns the record"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    record = await job_record(process_id)
+    while record and record['status'] in shared_queue.RUNNING_STATUSES:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(app.config['WORKER_POLL_SECONDS'])
+        record = await job_record(process_id)
+    return record
+
+@app.route('/api/upload', methods=['POST'])
+async def upload_file():
+    """
+    Upload file endpoint
+    Accepts PDF, JPG, PNG files up to 10MB
+    Returns file_id for processing
+    """
+    with metrics.STAGE_SECONDS.time(stage='upload'):
+        response = await _handle_upload()
+    metrics.UPLOADS_TOTAL.inc(status='success' if response[1] == 200 else 'error')
+    return response
+
+async def _handle_upload():
+    """Validate and save the uploaded file, returning (response, status_code)"""
+    try:
+        logger.info("=== FILE UPLOAD REQUEST STARTED ===")
+
+        file = (await request.files).get('file')
+        # Quart's FileStorage.save is a coroutine; FileHandler expects werkzeug's blocking one
+        upload = FileStorage(stream=file.stream, filename=file.filename, content_type=file.content_type) \
+            if file is not None else None
+        body = await run_in(io_pool, api.accept_upload, upload)
+        logger.info("=== FILE UPLOAD COMPLETED SUCCESSFULLY ===")
+        return jsonify(body), 200
+
+    except RequestError as e:
+        return await request_error(e)
+    except RequestEntityTooLarge:
+        logger.error("Upload failed: RequestEntityTooLarge exception")
+        return jsonify({
+            'error': 'File too large. Maximum size is 10MB.',
+            'status': 'error'
+        }), 413
+    except Exception as e:
+        logger.exception("Upload error: %s", e)
+        return jsonify({
+            'error': f'Upload failed: {str(e)}',
+            'status': 'error',
+            'error_type': type(e).__name__
+        }), 500
+
+@app.route('/api/process/<file_id>', methods=['POST'])
+async def process_file(file_id):
+    """
+    Process file with OCR service
+    Body: {"service": "tesseract|google|aws|auto", "allow_fallback": false, "resume": true, "wait": true,
+           "priority": "interactive|bulk"}
+    Same options and response as server.py; the OCR job runs on the job dispatcher.
+    Returns process_id for status tracking
+    """
+    try:
+        logger.info("=== OCR PROCESSING REQUEST STARTED ===")
+        logger.info("File ID: %s", file_id)
+
+        data = await request.get_json() if request.is_json else None
+        submission = await run_in(io_pool, api.submit, file_id, data, request.headers, request.args)
+        if submission.wait:
+            if submission.job:
+                # Like server.py, respond once the job has finished; waiting here holds no thread
+                await asyncio.wrap_future(submission.job)
+            else:
+                await wait_for_job(submission.process_id)
+
+        response = jsonify(await run_in(io_pool, api.submission_body, submission))
+        response.headers.update(submission.headers)
+        return response, submission.status_code
+
+    except RequestError as e:
+        return await request_error(e)
+    except Exception as e:
+        logger.error("Process initiation error: %s", e)
+        return jsonify({
+            'error': f'Failed to start processing: {str(e)}',
+            'status': 'error'
+        }), 500
+
+async def job_response(record, process_id=None):
+    """
+    JSON response for a job record honouring ?pages= and ?fields=, compressed when accepted.
+    With process_id the job's pages are loaded from the result store (on io_pool) if needed.
+    """
+    if process_id:
+        body = await run_in(io_pool, api.job_body, record, request.args, process_id)
+    else:
+        body = api.job_body(record, request.args)
+
+    response = jsonify(body)
+    data, encoding = await run_in(io_pool, results.encode_body, await response.get_data(),
+                                  request.headers.get('Accept-Encoding'))
+    if encoding:
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response, 200
+
+@app.route('/api/status/<process_id>', methods=['GET'])
+async def get_status(process_id):
+    """Get processing status (supports ?pages= and ?fields=; text only when they ask for it)"""
+    record = await job_record(process_id)
+    if record is None:
+        return jsonify({
+            'error': f'Process not found: {process_id}',
+            'status': 'error'
+        }), 404
+
+    return await job_response(record, process_id if api.wants_pages(request.args) else None)
+
+def stream_result(process_id):
+    """
+    NDJSON stream of a job, as in server.py. The journal is polled rather
+    than waited on so open streams don't each hold an io_pool thread.
+    """
+    journal = api.active_journals.get(process_id)
+    heartbeat = app.config['RESULT_STREAM_HEARTBEAT']
+
+    async def generate():
+        if journal:
+            index = 0
+            idle = 0.0
+            while True:
+                events, index, closed = journal.events_since(index)
+                for event in events:
+                    yield results.ndjson_line(event).encode()
+                if closed:
+                    break
+                idle = 0.0 if events else idle + STREAM_POLL_SECONDS
+                if idle >= heartbeat:
+                    idle = 0.0
+                    yield results.ndjson_line({'type': 'heartbeat'}).encode()
+                await asyncio.sleep(STREAM_POLL_SECONDS)
+        else:
+            record = await wait_for_job(process_id, heartbeat)
+            while record['status'] in shared_queue.RUNNING_STATUSES:
+                yield results.ndjson_line({'type': 'heartbeat'}).encode()
+                record = await wait_for_job(process_id, heartbeat)
+            for event in await run_in(io_pool, api.finished_page_events, record, process_id):
+                yield results.ndjson_line(event).encode()
+        yield results.ndjson_line(results.summary_event(process_id, await job_record(process_id) or {})).encode()
+
+    return Response(generate(), mimetype=results.NDJSON_MIMETYPE,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/result/<process_id>', methods=['GET'])
+async def get_result(process_id):
+    """Get processing result (supports ?pages=, ?fields= and ?stream=ndjson)"""
+    result = await job_record(process_id)
+    if result is None:
+        return jsonify({
+            'error': f'Process not found: {process_id}',
+            'status': 'error'
+        }), 404
+
+    if results.wants_stream(request.args.get('stream'), request.headers.get('Accept')):
+        return stream_result(process_id)
+
+    if result['status'] in shared_queue.RUNNING_STATUSES:
+        return jsonify({
+            'process_id': process_id,
+            'status': result['status'],
+            'message': 'Processing still in progress. Please wait.'
+        }), 202
+
+    return await job_response(result, process_id)
+
+@app.route('/api/trace/<trace_id>', methods=['GET'])
+async def get_trace(trace_id):
+    """Get recorded spans for a process_id or file_id"""
+    return jsonify(api.trace_body(trace_id)), 200
+
+@app.route('/api/services', methods=['GET'])
+async def list_services():
+    """List available OCR services and their status"""
+    try:
+        return jsonify(await run_in(io_pool, api.services_status)), 200
+
+    except Exception as e:
+        logger.error("Service listing error: %s", e)
+        return jsonify({
+            'error': f'Failed to list services: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@app.route('/api/metrics', methods=['GET'])
+async def get_metrics():
+    """Expose pipeline metrics in Prometheus text format"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/cleanup', methods=['POST'])
+async def cleanup_files():
+    """Clean up old files and processing records"""
+    try:
+        age_hours = (await request.get_json()).get('age_hours', 24) if request.is_json else 24
+        return jsonify(await run_in(io_pool, api.cleanup, age_hours)), 200
+
+    except Exception as e:
+        logger.error("Cleanup error: %s", e)
+        return jsonify({
+            'error': f'Cleanup failed: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@app.route('/api/debug/test-ocr', methods=['GET'])
+async def test_ocr():
+    """Debug endpoint to test basic OCR functionality"""
+    try:
+        # Runs OCR, so it takes a job worker rather than an io_pool thread
+        body = await asyncio.wrap_future(api.job_dispatcher.submit('interactive', api.self_test))
+        return jsonify(body), 200
+
+    except Exception as e:
+        logger.exception("Debug test error: %s", e)
+        return jsonify({
+            'status': 'error',
+            'error': str(e),
+            'timestamp': datetime.utcnow().isoformat()
+        }), 500
+
+@app.route('/api/debug/profile/<process_id>', methods=['GET'])
+async def download_profile(process_id):
+    """Download the profile recorded for a job (admin only)"""
+    mode, path = await run_in(io_pool, api.profile_file, process_id, request.headers)
+    if mode == 'cprofile' and request.args.get('format') == 'text':
+        text = await run_in(io_pool, api.profile_text, path, request.args.get('sort', 'cumulative'))
+        return Response(text, mimetype='text/plain')
+
+    return await send_file(os.path.abspath(path), as_attachment=True, attachment_filename=os.path.basename(path))
+
+# Frontend serving routes
+@app.route('/')
+async def index():
+    """Serve the frontend HTML page"""
+    return await send_from_directory('.', 'index.html')
+
+@app.route('/<path:path>')
+async def serve_static(path):
+    """Serve static files (CSS, JS, etc.)"""
+    return await send_from_directory('.', path)
+
+@app.before_serving
+async def prepare_folders():
+    # Also needed under `hypercorn server_async:app`, which skips __main__
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    if api.checkpoint_store:
+        os.makedirs(api.checkpoint_store.folder, exist_ok=True)
+
+@app.after_serving
+async def shutdown_pools():
+    io_pool.shutdown(wait=False)
+    api.job_dispatcher.shutdown(wait=True)
+    log_config.shutdown()
+
+if __name__ == '__main__':
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config as HypercornConfig
+
+    print("🚀 Starting OCR Testing Backend (async)")
+    print(f"📍 API endpoints: http://{app.config['HOST']}:{app.config['PORT']}/api/")
+    print(f"🌐 Frontend available at: http://{app.config['HOST']}:{app.config['PORT']}/")
+    print(f"⚙️  OCR workers: {app.config['ASYNC_OCR_WORKERS']}, I/O workers: {app.config['ASYNC_IO_WORKERS']}")
+    print()
+
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f"{app.config['HOST']}:{app.config['PORT']}"]
+    hypercorn_config.backlog = 2048
+    hypercorn_config.keep_alive_timeout = 75
+    asyncio.run(serve(app, hypercorn_config))
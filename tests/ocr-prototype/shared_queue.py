@@ -0,0 +1,293 @@
+"""
+Shared Queue Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Job queue and job records shared between API nodes and worker processes
+for distributed mode (JOB_MODE=distributed).
+
+API nodes enqueue a job with its initial record and read records back
+for /api/status and /api/result. Workers on any node claim jobs with a
+lease, renew the lease while they work, write progress into the record
+and finish the job. A worker that leaves cleanly finishes its current
+job first; a worker that dies stops renewing, its lease expires and
+another worker claims the job again. Thanks to page checkpoints, the next
+attempt only processes the pages that were not done yet. A job whose
+lease expires JOB_MAX_ATTEMPTS times is failed instead of retried.
+
+Backends are pluggable: subclass SharedQueue and register it with
+register_backend(). The built-in 'sqlite' backend keeps everything in one
+SQLite file. It serves tests and single-host setups with several worker
+processes; SQLite locking is not reliable on network filesystems, so
+multi-host deployments need a networked backend.
+
+Usage:
+    queue = open_queue('sqlite', 'shared/queue.db')
+    queue.enqueue(process_id, 'interactive', payload, record)
+    job = queue.claim(worker_id, 'interactive', lease_seconds=60)
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_MODES = ('local', 'distributed')
+
+# Job record statuses before a job has finished
+RUNNING_STATUSES = ('queued', 'processing')
+
+# Record fields a worker reads when it claims a job
+JOB_FIELDS = ('job_id', 'lane', 'payload', 'record', 'enqueued_at', 'attempts')
+
+
+class SharedQueue:
+    """Backend interface for the distributed job queue"""
+
+    def enqueue(self, job_id: str, lane: str, payload: Dict[str, Any], record: Dict[str, Any]):
+        """Queue a job; payload is what the worker needs to run it, record is the job record"""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, lane: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest claimable job in a lane
+
+        Returns:
+            Dict with JOB_FIELDS, or None when the lane has nothing to claim
+        """
+        raise NotImplementedError
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False when the worker no longer holds it"""
+        raise NotImplementedError
+
+    def update_record(self, job_id: str, fields: Dict[str, Any]):
+        """Merge fields into a job record"""
+        raise NotImplementedError
+
+    def finish(self, job_id: str, worker_id: str, fields: Dict[str, Any]) -> bool:
+        """Merge the final fields and mark the job done; False when the lease was lost"""
+        raise NotImplementedError
+
+    def get_record(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def queued(self) -> Dict[str, int]:
+        """Claimable jobs per lane"""
+        raise NotImplementedError
+
+    def oldest_queued(self) -> Optional[float]:
+        """enqueued_at (epoch seconds) of the oldest claimable job, or None"""
+        raise NotImplementedError
+
+    def register_worker(self, worker_id: str, info: Dict[str, Any]):
+        """Add or refresh a worker; also serves as its heartbeat"""
+        raise NotImplementedError
+
+    def remove_worker(self, worker_id: str):
+        raise NotImplementedError
+
+    def workers(self, max_age: float) -> List[Dict[str, Any]]:
+        """Workers seen within max_age seconds"""
+        raise NotImplementedError
+
+    def cleanup(self, age_hours: int = 24) -> int:
+        """Delete finished jobs older than age_hours; returns the count"""
+        raise NotImplementedError
+
+
+class SQLiteQueue(SharedQueue):
+    """SharedQueue in a single SQLite file (tests and single-host deployments)"""
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self._local = threading.local()
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with self._transaction() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                lane TEXT NOT NULL,
+                state TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                record TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                worker_id TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                finished_at REAL
+            )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (lane, state, enqueued_at)")
+            db.execute("""CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            )""")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are per thread
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def enqueue(self, job_id: str, lane: str, payload: Dict[str, Any], record: Dict[str, Any]):
+        with self._transaction() as db:
+            db.execute("INSERT INTO jobs (job_id, lane, state, payload, record, enqueued_at) "
+                       "VALUES (?, ?, 'queued', ?, ?, ?)",
+                       (job_id, lane, json.dumps(payload), json.dumps(record), time.time()))
+
+    def claim(self, worker_id: str, lane: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as db:
+            self._abandon_expired(db, now)
+            row = db.execute(
+                "SELECT job_id, lane, payload, record, enqueued_at, attempts FROM jobs "
+                "WHERE lane = ? AND (state = 'queued' OR (state = 'leased' AND lease_until < ?)) "
+                "ORDER BY enqueued_at LIMIT 1", (lane, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET state = 'leased', worker_id = ?, lease_until = ?, attempts = attempts + 1 "
+                       "WHERE job_id = ?", (worker_id, now + lease_seconds, row[0]))
+        job = dict(zip(JOB_FIELDS, row))
+        job['payload'] = json.loads(job['payload'])
+        job['record'] = json.loads(job['record'])
+        job['attempts'] += 1
+        if job['attempts'] > 1:
+            logger.warning("Reclaimed job %s after an expired lease (attempt %s)", job['job_id'], job['attempts'])
+        return job
+
+    def _abandon_expired(self, db: sqlite3.Connection, now: float):
+        """Fail jobs whose lease expired on their last allowed attempt"""
+        rows = db.execute("SELECT job_id, record, attempts FROM jobs "
+                          "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                          (now, self.max_attempts)).fetchall()
+        for job_id, record, attempts in rows:
+            record = json.loads(record)
+            record.update({
+                'status': 'error',
+                'error': f'Job abandoned: its worker stopped responding on {attempts} attempts',
+                'error_type': 'WorkerLost'
+            })
+            db.execute("UPDATE jobs SET state = 'done', record = ?, finished_at = ? WHERE job_id = ?",
+                       (json.dumps(record), now, job_id))
+            logger.error("Abandoned job %s after %s attempts", job_id, attempts)
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE jobs SET lease_until = ? "
+                                "WHERE job_id = ? AND worker_id = ? AND state = 'leased'",
+                                (time.time() + lease_seconds, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def _merge(self, db: sqlite3.Connection, job_id: str, fields: Dict[str, Any]) -> Optional[str]:
+        row = db.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        record = json.loads(row[0])
+        record.update(fields)
+        return json.dumps(record)
+
+    def update_record(self, job_id: str, fields: Dict[str, Any]):
+        with self._transaction() as db:
+            record = self._merge(db, job_id, fields)
+            if record is not None:
+                db.execute("UPDATE jobs SET record = ? WHERE job_id = ?", (record, job_id))
+
+    def finish(self, job_id: str, worker_id: str, fields: Dict[str, Any]) -> bool:
+        with self._transaction() as db:
+            owner = db.execute("SELECT worker_id, state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if owner is None or owner != (worker_id, 'leased'):
+                return False
+            db.execute("UPDATE jobs SET state = 'done', record = ?, lease_until = NULL, finished_at = ? "
+                       "WHERE job_id = ?", (self._merge(db, job_id, fields), time.time(), job_id))
+            return True
+
+    def get_record(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def queued(self) -> Dict[str, int]:
+        rows = self._connection().execute(
+            "SELECT lane, COUNT(*) FROM jobs WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?) "
+            "GROUP BY lane", (time.time(),)
+        ).fetchall()
+        return dict(rows)
+
+    def oldest_queued(self) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT MIN(enqueued_at) FROM jobs WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?)",
+            (time.time(),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def register_worker(self, worker_id: str, info: Dict[str, Any]):
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO workers (worker_id, info, seen_at) VALUES (?, ?, ?)",
+                       (worker_id, json.dumps(info), time.time()))
+
+    def remove_worker(self, worker_id: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def workers(self, max_age: float) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT worker_id, info, seen_at FROM workers WHERE seen_at >= ? ORDER BY worker_id",
+            (time.time() - max_age,)
+        ).fetchall()
+        return [dict(json.loads(info), worker_id=worker_id, seen_at=seen_at) for worker_id, info, seen_at in rows]
+
+    def cleanup(self, age_hours: int = 24) -> int:
+        cutoff = time.time() - age_hours * 3600
+        with self._transaction() as db:
+            cursor = db.execute("DELETE FROM jobs WHERE state = 'done' AND finished_at < ?", (cutoff,))
+            db.execute("DELETE FROM workers WHERE seen_at < ?", (cutoff,))
+            return cursor.rowcount
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+BACKENDS = {'sqlite': SQLiteQueue}
+
+
+def register_backend(name: str, backend: type):
+    """Make a SharedQueue subclass available to open_queue() under name"""
+    BACKENDS[name] = backend
+
+
+def open_queue(backend: str, path: str, max_attempts: int = 3) -> SharedQueue:
+    """Build the configured backend (QUEUE_BACKEND, QUEUE_PATH)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown queue backend: {backend!r} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](path, max_attempts=max_attempts)
+
+
+def worker_identity() -> Dict[str, Any]:
+    """Host and pid describing a worker process"""
+    return {'host': socket.gethostname(), 'pid': os.getpid()}
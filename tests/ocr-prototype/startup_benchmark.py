@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for OCR Testing Backend
+Measures module import time, OCRServices construction and time-to-first-request
+
+Usage:
+    python startup_benchmark.py                    # all ENGINE_WARMUP modes against server.py
+    python startup_benchmark.py --async-server     # against server_async.py
+    python startup_benchmark.py --runs 10 --json startup.json
+
+Every measurement runs in a fresh interpreter so import caches don't hide
+the cost. Results are written to benchmark-results/startup-<timestamp>-<commit>.json.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from benchmarks import RESULTS_FOLDER, git_commit
+from ocr_services import WARMUP_MODES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_TARGETS = [
+    'config', 'file_handler', 'ocr_services', 'server', 'server_async',
+    'pytesseract', 'google.cloud.vision', 'boto3'
+]
+
+
+def _run_timed_snippet(snippet: str, env: Dict[str, str] = None) -> Optional[float]:
+    """Run snippet in a fresh interpreter; it must print elapsed seconds"""
+    completed = subprocess.run(
+        [sys.executable, '-c', snippet], cwd=HERE, env=env,
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return None
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples: List[float]) -> Dict:
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1)
+    }
+
+
+def _quiet_env(**overrides) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({'LOG_LEVEL': 'WARNING', 'FLASK_DEBUG': 'false'})
+    env.update(overrides)
+    return env
+
+
+def measure_imports(runs: int) -> Dict[str, Dict]:
+    """Median cold import time per module"""
+    results = {}
+    for module in IMPORT_TARGETS:
+        snippet = (
+            "import time; start = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - start)"
+        )
+        samples = [_run_timed_snippet(snippet, _quiet_env(ENGINE_WARMUP='off')) for _ in range(runs)]
+        if None in samples:
+            results[module] = {'skipped': 'import failed (not installed?)'}
+        else:
+            results[module] = _summarize(samples)
+    return results
+
+
+def measure_construction(runs: int) -> Dict[str, Dict]:
+    """Time to construct OCRServices in each warm-up mode"""
+    results = {}
+    for mode in WARMUP_MODES:
+        snippet = (
+            "import time; from ocr_services import OCRServices; start = time.perf_counter(); "
+            f"OCRServices(warmup='{mode}'); print(time.perf_counter() - start)"
+        )
+        samples = [_run_timed_snippet(snippet, _quiet_env()) for _ in range(runs)]
+        results[mode] = {'skipped': 'failed'} if None in samples else _summarize(samples)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> Optional[float]:
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return time.perf_counter()
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def measure_first_request(mode: str, async_server: bool, timeout: float = 60.0) -> Dict:
+    """
+    Seconds from process launch until the server answers
+
+    first_request_ms: first 200 from /api/metrics (no engine work)
+    health_ms: first 200 from /api/health (engines probed)
+    """
+    port = _free_port()
+    env = _quiet_env(ENGINE_WARMUP=mode, FLASK_PORT=str(port))
+    script = 'server_async.py' if async_server else 'server.py'
+
+    start = time.perf_counter()
+    server_process = subprocess.Popen(
+        [sys.executable, script], cwd=HERE, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        first = _wait_for(f"{base_url}/api/metrics", start + timeout)
+        if first is None:
+            return {'error': 'server did not start'}
+        health = _wait_for(f"{base_url}/api/health", start + timeout)
+        return {
+            'first_request_ms': round((first - start) * 1000, 1),
+            'health_ms': round((health - start) * 1000, 1) if health else None
+        }
+    finally:
+        server_process.terminate()
+        server_process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure OCR backend startup cost')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per measurement')
+    parser.add_argument('--async-server', action='store_true', help='Measure server_async.py instead of server.py')
+    parser.add_argument('--json', help='Result file (default: benchmark-results/startup-<timestamp>-<commit>.json)')
+    args = parser.parse_args()
+
+    print("⏱️  OCR Backend Startup Benchmark")
+    print("=" * 78)
+
+    print("\n📦 Cold import time")
+    imports = measure_imports(args.runs)
+    for module, result in imports.items():
+        if 'skipped' in result:
+            print(f"   ⏭️  {module:<24} {result['skipped']}")
+        else:
+            print(f"   {module:<27} median {result['median_ms']:>8.1f} ms")
+
+    print("\n🏗️  OCRServices() construction")
+    construction = measure_construction(args.runs)
+    for mode, result in construction.items():
+        if 'skipped' in result:
+            print(f"   ⏭️  {mode:<24} {result['skipped']}")
+        else:
+            print(f"   ENGINE_WARMUP={mode:<13} median {result['median_ms']:>8.1f} ms")
+
+    server_name = 'server_async.py' if args.async_server else 'server.py'
+    print(f"\n🚀 Time to first request ({server_name})")
+    first_request = {}
+    for mode in WARMUP_MODES:
+        runs = [measure_first_request(mode, args.async_server) for _ in range(args.runs)]
+        ok = [run for run in runs if 'error' not in run]
+        if not ok:
+            first_request[mode] = {'error': runs[0]['error']}
+            print(f"   ❌ ENGINE_WARMUP={mode}: {runs[0]['error']}")
+            continue
+        first_request[mode] = {
+            'runs': len(ok),
+            'first_request_median_ms': statistics.median(run['first_request_ms'] for run in ok),
+            'health_median_ms': statistics.median(run['health_ms'] for run in ok if run['health_ms'] is not None)
+                                if any(run['health_ms'] is not None for run in ok) else None
+        }
+        print(f"   ENGINE_WARMUP={mode:<13} first request {first_request[mode]['first_request_median_ms']:>8.1f} ms"
+              f"   /api/health {first_request[mode]['health_median_ms']} ms")
+
+    commit = git_commit()
+    run = {
+        'commit': commit,
+        'timestamp': datetime.utcnow().isoformat(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'server': server_name,
+        'imports': imports,
+        'construction': construction,
+        'first_request': first_request
+    }
+
+    output = args.json
+    if not output:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output = os.path.join(RESULTS_FOLDER, f"startup-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{commit}.json")
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n📁 Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Circuit Breaker Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_circuit_breaker.py
+"""
+
+import pytest
+
+from circuit_breaker import CircuitBreaker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from engines import EngineInput, INPUT_IMAGE_FILE, page_result
+from fake_engines import FakeOCRServices
+from memory_budget import MemoryBudgetTimeout
+from ocr_services import DocumentInputError
+
+
+def test_healthy_multi_page_calls_keep_breaker_closed():
+    breaker = CircuitBreaker('tesseract')
+    for _ in range(5):
+        breaker.record_success(45.0, pages=15)  # 3s per page
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+
+
+def test_slow_pages_open_breaker():
+    breaker = CircuitBreaker('google', slow_call_seconds=10.0)
+    for _ in range(5):
+        breaker.record_success(60.0, pages=2)
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+
+
+def test_ignored_call_frees_half_open_probe():
+    breaker = CircuitBreaker('aws', min_calls=1, open_seconds=0.0)
+    breaker.record_failure(1.0)
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_ignored()
+    assert breaker.allow_request()
+
+
+@pytest.mark.parametrize('error', [
+    ValueError('Unable to get page count. Is poppler installed and in PATH?'),
+    MemoryBudgetTimeout(1, 1, 1, 1.0),
+])
+def test_input_failures_do_not_count_against_engine(tmp_path, monkeypatch, error):
+    services = FakeOCRServices(page_latency=0.0)
+
+    def fail(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(services, 'plan_inputs', fail)
+    document = tmp_path / 'truncated.pdf'
+    document.write_bytes(b'%PDF-1.4\n')
+
+    for _ in range(10):
+        with pytest.raises((DocumentInputError, MemoryBudgetTimeout)):
+            services.process('tesseract', str(document))
+    assert services.breakers.get('tesseract').state == STATE_CLOSED
+
+
+def test_engine_failures_open_breaker(tmp_path, monkeypatch):
+    services = FakeOCRServices(page_latency=0.0, error_rate=1.0)
+    document = tmp_path / 'page.png'
+    document.write_bytes(b'')
+
+    for _ in range(5):
+        with pytest.raises(RuntimeError):
+            services.process('tesseract', str(document))
+    assert services.breakers.get('tesseract').state == STATE_OPEN
+
+
+def fail_every_page(inputs):
+    return [page_result('', 0.0, 0, error='Failed loading language eng') for _ in inputs]
+
+
+def test_all_pages_failing_counts_as_engine_failure(tmp_path, monkeypatch):
+    services = FakeOCRServices(page_latency=0.0)
+    monkeypatch.setattr(services.engines['tesseract'], 'recognize', fail_every_page)
+    document = tmp_path / 'page.png'
+    document.write_bytes(b'')
+
+    for _ in range(5):
+        with pytest.raises(RuntimeError, match='failed on every page'):
+            services.process('tesseract', str(document))
+    assert services.breakers.get('tesseract').state == STATE_OPEN
+
+
+def test_some_pages_failing_is_still_a_success(tmp_path, monkeypatch):
+    services = FakeOCRServices(page_latency=0.0)
+    engine = services.engines['tesseract']
+    recognize = engine.recognize
+
+    def fail_page_two(inputs):
+        return [page_result('', 0.0, 0, error='bad page') if item.page_number == 2 else result
+                for item, result in zip(inputs, recognize(inputs))]
+
+    monkeypatch.setattr(engine, 'recognize', fail_page_two)
+    monkeypatch.setattr(services, 'plan_inputs', lambda engine, file_path, held=None, skip_pages=(): (
+        [EngineInput(INPUT_IMAGE_FILE, page, path=file_path) for page in (1, 2, 3)], []))
+    document = tmp_path / 'page.png'
+    document.write_bytes(b'')
+
+    result = services.process('tesseract', str(document))
+    assert [page.get('error') for page in result['pages']] == [None, 'bad page', None]
+    assert services.breakers.get('tesseract').snapshot()['error_rate'] == 0.0
@@ -0,0 +1,117 @@
+"""
+Request Coalescing Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_coalescing.py
+"""
+
+import pytest
+
+import coalescing
+from coalescing import (
+    REASON_IDEMPOTENCY_KEY, REASON_IN_FLIGHT, IdempotencyConflict, RequestDeduplicator,
+    flight_key, request_fingerprint
+)
+
+KEY = flight_key('file-1', 'tesseract', False, True)
+BODY = {'service': 'tesseract', 'resume': True}
+
+
+class Jobs:
+    """Stands in for the job table: jobs run until finished() is called"""
+
+    def __init__(self):
+        self.done = set()
+
+    def is_running(self, process_id):
+        return process_id not in self.done
+
+
+def make_dedup(jobs, **options):
+    return RequestDeduplicator(is_running=jobs.is_running, **options)
+
+
+def test_identical_request_joins_running_job():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    assert dedup.claim('p1', KEY) == ('p1', None)
+    assert dedup.claim('p2', KEY) == ('p1', REASON_IN_FLIGHT)
+    assert dedup.claim('p3', flight_key('file-1', 'google', False, True)) == ('p3', None)
+
+
+def test_finished_job_is_not_joined():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    dedup.claim('p1', KEY)
+    dedup.finished('p1')
+    assert dedup.claim('p2', KEY) == ('p2', None)
+
+
+def test_job_that_stopped_running_is_not_joined():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    dedup.claim('p1', KEY)
+    jobs.done.add('p1')  # e.g. finished on a distributed worker
+    assert dedup.claim('p2', KEY) == ('p2', None)
+
+
+def test_none_key_and_coalesce_off_never_join():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    dedup.claim('p1', None)
+    assert dedup.claim('p2', None) == ('p2', None)
+
+    dedup = make_dedup(jobs, coalesce=False)
+    dedup.claim('p1', KEY)
+    assert dedup.claim('p2', KEY) == ('p2', None)
+
+
+def test_idempotency_key_replays_finished_job():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    fingerprint = request_fingerprint('file-1', BODY)
+    assert dedup.claim('p1', KEY, 'key-1', fingerprint) == ('p1', None)
+    dedup.finished('p1')
+    jobs.done.add('p1')
+    assert dedup.claim('p2', KEY, 'key-1', fingerprint) == ('p1', REASON_IDEMPOTENCY_KEY)
+
+
+def test_idempotency_key_reused_for_other_request_conflicts():
+    dedup = make_dedup(Jobs())
+    dedup.claim('p1', KEY, 'key-1', request_fingerprint('file-1', BODY))
+    with pytest.raises(IdempotencyConflict):
+        dedup.claim('p2', KEY, 'key-1', request_fingerprint('file-1', dict(BODY, service='google')))
+
+
+def test_new_key_on_in_flight_request_remembers_running_job():
+    jobs = Jobs()
+    dedup = make_dedup(jobs)
+    dedup.claim('p1', KEY)
+    fingerprint = request_fingerprint('file-1', BODY)
+    assert dedup.claim('p2', KEY, 'key-2', fingerprint) == ('p1', REASON_IN_FLIGHT)
+    dedup.finished('p1')
+    assert dedup.claim('p3', KEY, 'key-2', fingerprint) == ('p1', REASON_IDEMPOTENCY_KEY)
+
+
+def test_forget_lets_retry_start_again():
+    dedup = make_dedup(Jobs())
+    fingerprint = request_fingerprint('file-1', BODY)
+    dedup.claim('p1', KEY, 'key-1', fingerprint)
+    dedup.forget('p1')
+    assert dedup.claim('p2', KEY, 'key-1', fingerprint) == ('p2', None)
+
+
+def test_keys_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(coalescing.time, 'monotonic', lambda: now[0])
+    dedup = make_dedup(Jobs(), ttl_seconds=60)
+    fingerprint = request_fingerprint('file-1', BODY)
+    dedup.claim('p1', KEY, 'key-1', fingerprint)
+    now[0] += 61
+    assert dedup.claim('p2', KEY, 'key-1', fingerprint) == ('p2', None)
+
+
+def test_oldest_keys_dropped_beyond_max_keys():
+    dedup = make_dedup(Jobs(), max_keys=2)
+    for index in range(3):
+        dedup.claim(f'p{index}', None, f'key-{index}', 'same')
+    assert dedup.claim('p9', None, 'key-0', 'same') == ('p9', None)
+    assert dedup.claim('p9', None, 'key-2', 'same') == ('p2', REASON_IDEMPOTENCY_KEY)
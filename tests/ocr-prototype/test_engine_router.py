@@ -0,0 +1,55 @@
+"""
+Engine Router Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_engine_router.py
+"""
+
+import pytest
+
+from engine_router import EngineRouter, TARGET_CHEAPEST
+
+UNIT_COSTS = {'tesseract': 0.0, 'google': 0.0015, 'aws': 0.0015}
+PAGE_LATENCY = {'tesseract': 3.0, 'google': 1.0, 'aws': 1.5}
+
+
+def make_router():
+    return EngineRouter(UNIT_COSTS, PAGE_LATENCY, target=TARGET_CHEAPEST, latency_slo=30.0)
+
+
+def test_cheapest_engine_within_slo():
+    decision = make_router().choose(100_000, 2, {
+        'tesseract': {'available': True, 'breaker_state': 'closed'},
+        'google': {'available': True, 'breaker_state': 'closed'},
+    })
+    assert decision['chosen'] == 'tesseract'
+
+
+def test_open_breaker_is_not_eligible():
+    decision = make_router().choose(100_000, 2, {
+        'tesseract': {'available': True, 'breaker_state': 'open'},
+        'google': {'available': True, 'breaker_state': 'closed'},
+    })
+    assert decision['chosen'] == 'google'
+
+
+def test_no_eligible_engine_chooses_none():
+    decision = make_router().choose(100_000, 2, {
+        'tesseract': {'available': True, 'breaker_state': 'open'},
+        'google': {'available': False, 'breaker_state': 'closed'},
+        'aws': {'available': False, 'breaker_state': 'closed'},
+    })
+    assert decision['chosen'] is None
+    assert not any(candidate['eligible'] for candidate in decision['candidates'])
+
+
+@pytest.mark.parametrize('options', [
+    {'latency_slo': [1]},
+    {'latency_slo': 'abc'},
+    {'budget': {'max': 1}},
+    {'budget': -1},
+    {'latency_slo': float('nan')},
+    {'target': 'slowest'},
+])
+def test_bad_routing_options_raise_value_error(options):
+    with pytest.raises(ValueError):
+        make_router().choose(100_000, 2, {'tesseract': {'available': True, 'breaker_state': 'closed'}},
+                             **options)
@@ -0,0 +1,154 @@
+"""
+Job Queue Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_job_queue.py
+"""
+
+import time
+import threading
+
+import pytest
+
+from job_queue import LaneDispatcher, LanePicker, infer_lane
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class Blocker:
+    """Jobs that hold a worker until released, counting how many run at once"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def job(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+
+
+def test_infer_lane():
+    assert infer_lane(1, 3) == 'interactive'
+    assert infer_lane(4, 3) == 'bulk'
+
+
+def test_picker_follows_weights_while_lanes_compete():
+    picker = LanePicker({'interactive': 4, 'bulk': 1})
+    picks = [picker.pick(['interactive', 'bulk']) for _ in range(10)]
+    assert picks.count('interactive') == 8
+    assert picks.count('bulk') == 2
+    assert picker.pick(['bulk']) == 'bulk'
+    assert picker.pick([]) is None
+
+
+def test_picker_rejects_unknown_lane():
+    with pytest.raises(ValueError):
+        LanePicker({'urgent': 2})
+
+
+def test_reserved_worker_serves_interactive_while_bulk_is_busy():
+    dispatcher = LaneDispatcher(workers=2, reserved={'interactive': 1})
+    bulk = Blocker()
+    try:
+        jobs = [dispatcher.submit('bulk', bulk.job) for _ in range(3)]
+        assert wait_until(lambda: bulk.running == 1)
+        assert dispatcher.submit('interactive', lambda: 'receipt').result(timeout=2) == 'receipt'
+        assert bulk.peak == 1
+    finally:
+        bulk.release.set()
+    for job in jobs:
+        job.result(timeout=2)
+    dispatcher.shutdown()
+
+
+def test_resize_up_runs_more_jobs_at_once():
+    dispatcher = LaneDispatcher(workers=2, reserved={})
+    blocker = Blocker()
+    try:
+        jobs = [dispatcher.submit('bulk', blocker.job) for _ in range(4)]
+        assert wait_until(lambda: blocker.running == 2)
+        dispatcher.resize(4)
+        assert wait_until(lambda: blocker.running == 4)
+        assert dispatcher.load()['workers'] == 4
+    finally:
+        blocker.release.set()
+    for job in jobs:
+        job.result(timeout=2)
+    dispatcher.shutdown()
+
+
+def test_resize_down_retires_workers_after_their_job():
+    dispatcher = LaneDispatcher(workers=4, reserved={})
+    blocker = Blocker()
+    jobs = [dispatcher.submit('bulk', blocker.job) for _ in range(4)]
+    assert wait_until(lambda: blocker.running == 4)
+
+    dispatcher.resize(2)
+    assert dispatcher.load()['workers'] == 2
+    # Running jobs are not interrupted
+    assert len(dispatcher._threads) == 4
+    blocker.release.set()
+    for job in jobs:
+        job.result(timeout=2)
+    assert wait_until(lambda: len(dispatcher._threads) == 2)
+
+    blocker = Blocker()
+    try:
+        jobs = [dispatcher.submit('bulk', blocker.job) for _ in range(4)]
+        assert wait_until(lambda: blocker.running == 2)
+        time.sleep(0.05)
+        assert blocker.peak == 2
+    finally:
+        blocker.release.set()
+    for job in jobs:
+        job.result(timeout=2)
+    dispatcher.shutdown()
+
+
+def test_resize_keeps_reserved_workers_and_one_shared():
+    dispatcher = LaneDispatcher(workers=4, reserved={'interactive': 2})
+    dispatcher.resize(1)
+    assert dispatcher.load()['workers'] == 3
+    assert wait_until(lambda: len(dispatcher._threads) == 3)
+    assert dispatcher.submit('bulk', lambda: 'done').result(timeout=2) == 'done'
+    dispatcher.shutdown()
+
+
+def test_resize_up_cancels_pending_retirements():
+    dispatcher = LaneDispatcher(workers=3, reserved={})
+    blocker = Blocker()
+    jobs = [dispatcher.submit('bulk', blocker.job) for _ in range(3)]
+    assert wait_until(lambda: blocker.running == 3)
+    dispatcher.resize(1)
+    dispatcher.resize(3)
+    blocker.release.set()
+    for job in jobs:
+        job.result(timeout=2)
+    time.sleep(0.05)
+    assert dispatcher.load()['workers'] == 3
+    assert len(dispatcher._threads) == 3
+    dispatcher.shutdown()
+
+
+def test_job_errors_reach_the_future():
+    dispatcher = LaneDispatcher(workers=1, reserved={})
+
+    def fail():
+        raise RuntimeError('engine down')
+
+    with pytest.raises(RuntimeError, match='engine down'):
+        dispatcher.submit('interactive', fail).result(timeout=2)
+    dispatcher.shutdown()
+    with pytest.raises(RuntimeError):
+        dispatcher.submit('interactive', fail)
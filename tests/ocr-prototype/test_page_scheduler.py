@@ -0,0 +1,101 @@
+"""
+Page Scheduler Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_page_scheduler.py
+"""
+
+import time
+import threading
+from functools import partial
+
+import pytest
+
+from page_scheduler import PageScheduler
+
+
+def record(order, lock, job, index, seconds=0.0):
+    if seconds:
+        time.sleep(seconds)
+    with lock:
+        order.append((job, index))
+    return f'{job}{index}'
+
+
+def test_results_come_back_in_task_order():
+    scheduler = PageScheduler(workers=4)
+    slots = threading.Semaphore(3)
+    order, lock = [], threading.Lock()
+    tasks = [partial(record, order, lock, 'a', index, 0.005 * (index % 3)) for index in range(12)]
+
+    assert scheduler.run(slots, tasks) == [f'a{index}' for index in range(12)]
+    assert sorted(order) == [('a', index) for index in range(12)]
+
+
+def test_workers_steal_from_the_back():
+    scheduler = PageScheduler(workers=2)
+    slots = threading.Semaphore(3)
+    runners = {}
+
+    def task(index):
+        time.sleep(0.02)
+        runners[index] = threading.current_thread().name
+
+    scheduler.run(slots, [partial(task, index) for index in range(9)])
+
+    owner = threading.current_thread().name
+    assert runners[0] == owner
+    assert any(name != owner for name in runners.values())
+    stolen = [index for index, name in runners.items() if name != owner]
+    assert max(stolen) == 8
+
+
+def test_short_job_is_not_starved_by_long_job():
+    scheduler = PageScheduler(workers=1)
+    slots = threading.Semaphore(1)
+    order, lock = [], threading.Lock()
+    long_tasks = [partial(record, order, lock, 'long', index, 0.01) for index in range(60)]
+    long_job = threading.Thread(target=scheduler.run, args=(slots, long_tasks))
+    long_job.start()
+
+    while len(order) < 5:
+        time.sleep(0.005)
+    scheduler.run(slots, [partial(record, order, lock, 'short', index, 0.01) for index in range(3)])
+    with lock:
+        long_done = sum(1 for job, _ in order if job == 'long')
+    long_job.join()
+
+    # Round-robin interleaves the short job instead of queueing it behind all 60 pages
+    assert long_done < 30
+    assert len(order) == 63
+
+
+def test_every_task_runs_and_first_failure_is_raised():
+    scheduler = PageScheduler(workers=2)
+    slots = threading.Semaphore(2)
+    ran = []
+
+    def task(index):
+        ran.append(index)
+        if index in (2, 4):
+            raise RuntimeError(f'page {index} failed')
+
+    with pytest.raises(RuntimeError, match='page 2 failed'):
+        scheduler.run(slots, [partial(task, index) for index in range(6)])
+    assert sorted(ran) == list(range(6))
+
+
+def test_engine_slots_bound_concurrency():
+    scheduler = PageScheduler(workers=8)
+    slots = threading.Semaphore(2)
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def task():
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    scheduler.run(slots, [task] * 20)
+    assert running[1] <= 2
@@ -0,0 +1,112 @@
+"""
+Input Planning Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_plan_inputs.py
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+import memory_budget
+import page_buffers
+from engines import EngineCapabilities, INPUT_PAGE
+from fake_engines import FakeEngine, FakeOCRServices
+
+PAGE_ENGINE = FakeEngine('tesseract', 0.0, 0.0, EngineCapabilities(input_kinds=[INPUT_PAGE]))
+
+
+class PdfPages:
+    """Stands in for FileHandler on a two-page PDF"""
+
+    def get_page_count(self, file_path):
+        return 2
+
+
+def render_into(pool, contents):
+    """_render_pages replacement that writes one file per page into the pool and adopts it"""
+    def render(file_handler, file_path, page_numbers, subset):
+        paths, buffers = [], []
+        for page_number, write in zip(page_numbers, contents):
+            path = os.path.join(pool.folder, f'page-{page_number}.png')
+            write(path)
+            paths.append(path)
+            buffers.append(pool.adopt(path, os.path.getsize(path)))
+        return paths, buffers
+    return render
+
+
+def png(path):
+    Image.new('L', (20, 20), 255).save(path, 'PNG')
+
+
+def garbage(path):
+    with open(path, 'wb') as f:
+        f.write(b'not an image')
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    pool = page_buffers.PageBufferPool(str(tmp_path / 'shm'))
+    monkeypatch.setattr(page_buffers, 'pool', pool)
+    return pool
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF-1.4\n')
+    return str(path)
+
+
+@pytest.fixture
+def services(monkeypatch):
+    services = FakeOCRServices(page_latency=0.0)
+    monkeypatch.setattr(services, '_file_handler_for', lambda file_path: PdfPages())
+    return services
+
+
+def test_unreadable_page_releases_buffers(services, pool, monkeypatch, document):
+    monkeypatch.setattr(services, '_render_pages', render_into(pool, [png, garbage]))
+
+    with pytest.raises(OSError):
+        services.plan_inputs(PAGE_ENGINE, document)
+    assert pool.held_bytes == 0
+    assert os.listdir(pool.folder) == []
+
+
+def test_decode_budget_timeout_releases_buffers(services, pool, monkeypatch, document):
+    monkeypatch.setattr(services, '_render_pages', render_into(pool, [png, png]))
+
+    def timeout(nbytes, purpose):
+        raise memory_budget.MemoryBudgetTimeout(nbytes, 0, 0, 1.0)
+
+    monkeypatch.setattr(memory_budget, 'reserve', timeout)
+    with pytest.raises(memory_budget.MemoryBudgetTimeout):
+        services.plan_inputs(PAGE_ENGINE, document)
+    assert pool.held_bytes == 0
+    assert os.listdir(pool.folder) == []
+
+
+def test_pages_rendered_to_disk_are_removed_on_failure(services, monkeypatch, document, tmp_path):
+    paths = [str(tmp_path / 'page-1.png'), str(tmp_path / 'page-2.png')]
+    png(paths[0])
+    garbage(paths[1])
+    monkeypatch.setattr(services, '_render_pages', lambda *args: (paths, []))
+
+    with pytest.raises(OSError):
+        services.plan_inputs(PAGE_ENGINE, document)
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_planned_pages_keep_their_buffers(services, pool, monkeypatch, document):
+    monkeypatch.setattr(services, '_render_pages', render_into(pool, [png, png]))
+
+    inputs, temp_paths = services.plan_inputs(PAGE_ENGINE, document)
+    assert [item.page_number for item in inputs] == [1, 2]
+    assert temp_paths == []
+    assert len(os.listdir(pool.folder)) == 2
+    for item in inputs:
+        item.release()
+    assert pool.held_bytes == 0
+    assert os.listdir(pool.folder) == []
@@ -0,0 +1,102 @@
+"""
+Result Store Tests for OCR Testing Backend
+Runs without a server or OCR dependencies: python -m pytest test_result_store.py
+"""
+
+import json
+import os
+import time
+
+from result_store import ResultStore
+
+
+def pages(text):
+    return [{'page': 1, 'text': text, 'confidence': 0.9, 'words': 1}]
+
+
+def size(entries):
+    return len(json.dumps(entries).encode('utf-8'))
+
+
+def test_put_writes_blob_and_returns_size(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=10_000)
+    entries = pages('hello')
+    assert store.put('p1', entries) == size(entries)
+    with open(tmp_path / 'p1.json') as f:
+        assert json.load(f) == entries
+    assert store.get('p1') == entries
+    assert store.cached_bytes == size(entries)
+
+
+def test_least_recently_used_is_evicted_first(tmp_path):
+    entry_size = size(pages('x' * 50))
+    store = ResultStore(str(tmp_path), cache_bytes=entry_size * 3)
+    for process_id in ('a', 'b', 'c'):
+        store.put(process_id, pages('x' * 50))
+    store.get('a')  # a becomes most recently used
+    store.put('d', pages('x' * 50))
+
+    assert list(store._cache) == ['c', 'a', 'd']
+    assert store.cached_bytes == entry_size * 3
+    # Evicted results are still on disk
+    assert store.get('b') == pages('x' * 50)
+    assert list(store._cache) == ['a', 'd', 'b']
+    assert store.cached_bytes == entry_size * 3
+
+
+def test_result_larger_than_cache_is_not_cached(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=100)
+    store.put('small', pages('x'))
+    store.put('big', pages('x' * 500))
+    assert 'big' not in store._cache
+    assert store.cached_bytes == size(pages('x'))
+    assert store.get('big') == pages('x' * 500)
+    assert store.cached_bytes == size(pages('x'))
+
+
+def test_overwrite_does_not_double_count(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=10_000)
+    store.put('p1', pages('first'))
+    store.put('p1', pages('second run'))
+    assert store.cached_bytes == size(pages('second run'))
+    assert store.get('p1') == pages('second run')
+
+
+def test_zero_cache_reads_from_disk(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=0)
+    store.put('p1', pages('hello'))
+    assert store.cached_bytes == 0
+    assert store.get('p1') == pages('hello')
+    assert store.cached_bytes == 0
+
+
+def test_missing_result(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=1000)
+    assert store.get('nope') is None
+
+
+def test_delete_and_cleanup_release_cached_bytes(tmp_path):
+    store = ResultStore(str(tmp_path), cache_bytes=10_000)
+    store.put('old', pages('old'))
+    store.put('new', pages('new'))
+    store.delete('new')
+    assert store.get('new') is None
+    assert store.cached_bytes == size(pages('old'))
+
+    past = time.time() - 3 * 3600
+    os.utime(tmp_path / 'old.json', (past, past))
+    store.put('fresh', pages('fresh'))
+    assert store.cleanup(age_hours=2) == 1
+    assert store.get('old') is None
+    assert store.cached_bytes == size(pages('fresh'))
+
+
+def test_memory_only_store_never_evicts():
+    store = ResultStore(None)
+    for index in range(20):
+        store.put(f'p{index}', pages('x' * 100))
+    assert store.get('p0') == pages('x' * 100)
+    assert store.cached_bytes == 20 * size(pages('x' * 100))
+    store.delete('p0')
+    assert store.get('p0') is None
+    assert store.cleanup(age_hours=0) == 0
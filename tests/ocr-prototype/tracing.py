@@ -0,0 +1,244 @@
+"""
+Tracing Module
+Smart Data Extractor (SME) - OCR Testing Backend
+
+Lightweight tracing spans for the upload -> OCR pipeline.
+
+A trace is started per request with the file_id (uploads) or process_id
+(OCR jobs) as its trace_id. Code further down the call stack opens child
+spans with span(); when no trace is active span() does nothing, so library
+code can be instrumented unconditionally.
+
+Finished spans are kept in memory for per-stage summaries and, depending
+on configuration, exported as JSON lines to a local file or POSTed in
+batches to a collector URL.
+"""
+
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+import urllib.request
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace = ContextVar('current_trace', default=None)
+_current_span = ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end',
+                 'attributes', 'status', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end = None
+        self.attributes = attributes
+        self.status = 'ok'
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """Span duration in seconds (0 while still open)"""
+        return (self.end - self.start) if self.end else 0.0
+
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute to the span"""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'end': self.end,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'status': self.status,
+            'error': self.error
+        }
+
+
+class FileExporter:
+    """Append finished spans to a local file as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(lines)
+
+
+class CollectorExporter:
+    """POST finished spans to a collector URL from a background thread"""
+
+    def __init__(self, url: str, batch_size: int = 100, timeout: float = 5.0):
+        self.url = url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]):
+        for span in spans:
+            try:
+                self._queue.put_nowait(span.to_dict())
+            except queue.Full:
+                logger.warning("Trace export queue full, dropping span")
+                return
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                body = json.dumps({'spans': batch}, default=str).encode('utf-8')
+                req = urllib.request.Request(self.url, data=body,
+                                             headers={'Content-Type': 'application/json'})
+                urllib.request.urlopen(req, timeout=self.timeout).close()
+            except Exception as e:
+                logger.warning("Trace export to %s failed: %s", self.url, e)
+
+
+class Tracer:
+    """Creates spans and keeps recent traces for summaries"""
+
+    def __init__(self, exporter=None, max_traces: int = 1000):
+        self.exporter = exporter
+        self.max_traces = max_traces
+        self._traces = OrderedDict()  # trace_id -> [Span]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, trace_id: str, name: str, **attributes):
+        """Start a trace and its root span for the current request"""
+        trace_token = _current_trace.set(trace_id)
+        try:
+            with self.span(name, **attributes) as root:
+                yield root
+        finally:
+            _current_trace.reset(trace_token)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Open a child span of the current span; no-op outside a trace"""
+        trace_id = _current_trace.get()
+        if trace_id is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+        span_token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'error'
+            span.error = f'{type(e).__name__}: {str(e)}'
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(span_token)
+            self._finish(span)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+
+        if self.exporter is not None:
+            try:
+                self.exporter.export([span])
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def get_spans(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Get finished spans of a trace"""
+        with self._lock:
+            spans = list(self._traces.get(trace_id, []))
+        return [span.to_dict() for span in spans]
+
+    def summarize(self, trace_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-stage breakdown of a trace
+
+        Returns:
+            span name -> {'count', 'total_ms', 'max_ms', 'errors'}
+        """
+        with self._lock:
+            spans = list(self._traces.get(trace_id, []))
+
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span.name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0})
+            duration_ms = span.duration * 1000
+            stage['count'] += 1
+            stage['total_ms'] += duration_ms
+            stage['max_ms'] = max(stage['max_ms'], duration_ms)
+            if span.status == 'error':
+                stage['errors'] += 1
+
+        for stage in stages.values():
+            stage['total_ms'] = round(stage['total_ms'], 2)
+            stage['max_ms'] = round(stage['max_ms'], 2)
+        return stages
+
+
+def create_exporter(mode: str, path: str = None, url: str = None):
+    """Build an exporter from configuration ('none', 'file' or 'collector')"""
+    if mode == 'file' and path:
+        return FileExporter(path)
+    if mode == 'collector' and url:
+        return CollectorExporter(url)
+    return None
+
+
+tracer = Tracer()
+
+
+def configure(mode: str = 'none', path: str = None, url: str = None, max_traces: int = 1000):
+    """Configure the module-level tracer"""
+    tracer.exporter = create_exporter(mode, path, url)
+    tracer.max_traces = max_traces
+
+
+def trace(trace_id: str, name: str, **attributes):
+    """Start a trace on the module-level tracer"""
+    return tracer.trace(trace_id, name, **attributes)
+
+
+def span(name: str, **attributes):
+    """Open a span on the module-level tracer"""
+    return tracer.span(name, **attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the active trace, if any"""
+    return _current_trace.get()
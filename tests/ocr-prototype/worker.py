@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+OCR Worker
+Smart Data Extractor (SME) Project
+
+Worker process for distributed mode (JOB_MODE=distributed). API nodes only
+accept uploads and enqueue jobs; workers on any node claim jobs from the
+shared queue, read the uploaded files from shared storage (UPLOAD_FOLDER)
+and write results back to the job record the API nodes serve.
+
+Workers can join and leave at any time. SIGINT/SIGTERM stops claiming new
+jobs, finishes the running ones and unregisters the worker. A worker that
+dies stops renewing its leases, so its jobs go back to the queue after
+WORKER_LEASE_SECONDS and resume from their page checkpoints elsewhere.
+
+Usage:
+    # One worker taking jobs from both lanes
+    JOB_MODE=distributed python worker.py
+
+    # Four concurrent jobs, interactive lane only, metrics on :9101/metrics
+    python worker.py --concurrency 4 --lanes interactive --metrics-port 9101
+"""
+
+import os
+import time
+import uuid
+import signal
+import logging
+import argparse
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import Config
+from file_handler import FileHandler
+from ocr_services import OCRServices
+from circuit_breaker import CircuitOpenError
+from checkpoints import CheckpointStore, PageJournal
+from job_queue import LANES, LanePicker
+from autoscaler import Autoscaler
+import metrics
+import tracing
+import profiling
+import memory_budget
+import cpu_budget
+import page_buffers
+import result_store
+import rasterizer
+import log_config
+import results
+import shared_queue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Claims jobs from the shared queue and runs them"""
+
+    def __init__(self, queue: shared_queue.SharedQueue, ocr_services, file_handler: FileHandler,
+                 checkpoint_store: CheckpointStore = None, concurrency: int = 1, lanes=LANES,
+                 weights: dict = None, lease_seconds: float = 60, poll_seconds: float = 1):
+        for lane in lanes:
+            if lane not in LANES:
+                raise ValueError(f"Unknown lane: {lane!r} (expected one of {', '.join(LANES)})")
+        self.queue = queue
+        self.ocr_services = ocr_services
+        self.file_handler = file_handler
+        self.checkpoint_store = checkpoint_store
+        self.concurrency = max(1, concurrency)
+        self.lanes = tuple(lanes)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.identity = shared_queue.worker_identity()
+        self.worker_id = f"{self.identity['host']}-{self.identity['pid']}-{uuid.uuid4().hex[:6]}"
+        self._picker = LanePicker(weights)
+        self._picker_lock = threading.Lock()
+        self._running = {}  # job_id -> lane
+        self._running_lock = threading.Lock()
+        self._threads = []
+        self._retiring = 0
+        self._started = 0
+        self._stopping = threading.Event()
+
+    def run(self):
+        """Work until stop() is called, then finish running jobs and leave"""
+        self._heartbeat()
+        logger.info("Worker %s joined (lanes=%s, concurrency=%s)", self.worker_id, ','.join(self.lanes),
+                    self.concurrency)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='heartbeat', daemon=True)
+        heartbeat.start()
+        with self._running_lock:
+            for _ in range(self.concurrency):
+                self._start_job_thread()
+        self._stopping.wait()
+        while True:
+            with self._running_lock:
+                threads = list(self._threads)
+            if not threads:
+                break
+            for thread in threads:
+                thread.join()
+        self.queue.remove_worker(self.worker_id)
+        logger.info("Worker %s left", self.worker_id)
+
+    def stop(self):
+        self._stopping.set()
+
+    def _start_job_thread(self):
+        thread = threading.Thread(target=self._job_loop, name=f'job-{self._started}')
+        self._started += 1
+        self._threads.append(thread)
+        thread.start()
+
+    def resize(self, concurrency: int):
+        """Change how many jobs run at once; extra job threads exit after their current job"""
+        with self._running_lock:
+            if self._stopping.is_set():
+                return
+            concurrency = max(1, concurrency)
+            # Before run(), only the number of job threads it starts changes
+            if self._started and concurrency > self.concurrency:
+                cancelled = min(self._retiring, concurrency - self.concurrency)
+                self._retiring -= cancelled
+                for _ in range(concurrency - self.concurrency - cancelled):
+                    self._start_job_thread()
+            elif self._started and concurrency < self.concurrency:
+                self._retiring += self.concurrency - concurrency
+            self.concurrency = concurrency
+
+    def load(self) -> dict:
+        """Concurrency, running jobs and shared queue backlog for the autoscaler"""
+        queued = self.queue.queued()
+        oldest = self.queue.oldest_queued()
+        with self._running_lock:
+            return {
+                'workers': self.concurrency,
+                'busy': len(self._running),
+                'queued': sum(queued.get(lane, 0) for lane in self.lanes),
+                'oldest_wait': time.time() - oldest if oldest else 0.0
+            }
+
+    def _heartbeat(self):
+        with self._running_lock:
+            running = dict(self._running)
+        self.queue.register_worker(self.worker_id, dict(self.identity, lanes=list(self.lanes),
+                                                        concurrency=self.concurrency,
+                                                        jobs=sorted(running)))
+        for job_id in running:
+            if not self.queue.renew(job_id, self.worker_id, self.lease_seconds):
+                logger.warning("Lost the lease on job %s; another worker may run it", job_id)
+
+    def _heartbeat_loop(self):
+        # Renew well before the lease runs out
+        while not self._stopping.wait(self.lease_seconds / 3):
+            self._heartbeat()
+        # Keep leases alive while the last jobs finish
+        while self._running:
+            time.sleep(self.lease_seconds / 3)
+            self._heartbeat()
+
+    def _claim(self):
+        """Lease the next job, picking between lanes with work by weight"""
+        queued = self.queue.queued()
+        ready = [lane for lane in self.lanes if queued.get(lane)]
+        with self._picker_lock:
+            first = self._picker.pick(ready)
+        if first is None:
+            return None
+        for lane in [first] + [lane for lane in ready if lane != first]:
+            job = self.queue.claim(self.worker_id, lane, self.lease_seconds)
+            if job:
+                return job
+        return None
+
+    def _job_loop(self):
+        try:
+            self._work()
+        finally:
+            with self._running_lock:
+                self._threads.remove(threading.current_thread())
+
+    def _work(self):
+        while not self._stopping.is_set():
+            with self._running_lock:
+                if self._retiring:
+                    self._retiring -= 1
+                    return
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error("Claiming a job failed: %s", e)
+                job = None
+            if job is None:
+                self._stopping.wait(self.poll_seconds)
+                continue
+            with self._running_lock:
+                self._running[job['job_id']] = job['lane']
+            try:
+                self.run_job(job)
+            finally:
+                with self._running_lock:
+                    self._running.pop(job['job_id'], None)
+
+    def run_job(self, job: dict):
+        """Run one claimed job and write the outcome to its record"""
+        process_id = job['job_id']
+        payload = job['payload']
+        file_id = payload['file_id']
+        service = payload['service']
+        profile_mode = payload.get('profile_mode')
+        start_time = time.time()
+        queue_wait = start_time - job['enqueued_at']
+        metrics.LANE_QUEUE_WAIT_SECONDS.observe(queue_wait, lane=job['lane'])
+        metrics.LANE_JOBS_STARTED.inc(lane=job['lane'])
+        self.queue.update_record(process_id, {
+            'status': 'processing',
+            'started_at': datetime.utcnow().isoformat(),
+            'queue_wait': round(queue_wait, 3),
+            'worker': self.worker_id,
+            'attempts': job['attempts']
+        })
+        logger.info("Running job %s with %s (%s lane, attempt %s)", process_id, service, job['lane'],
+                    job['attempts'])
+
+        metrics.JOBS_IN_FLIGHT.inc()
+        profile_info = None
+        outcome = {}
+        try:
+            if not self.file_handler.file_exists(file_id):
+                raise FileNotFoundError(f'File not found in shared storage: {file_id}')
+            file_path = self.file_handler.get_file_path(file_id)
+            metrics.BYTES_PROCESSED.inc(os.path.getsize(file_path), stage='ocr')
+            journal = PageJournal(
+                self.checkpoint_store, file_id, file_path, resume=payload.get('resume', True),
+                listener=lambda states: self.queue.update_record(process_id, {'page_states': states})
+            )
+            if profile_mode:
+                profiler = profiling.profile(
+                    profile_mode,
+                    profiling.profile_path(Config.PROFILE_FOLDER, process_id, profile_mode),
+                    sample_interval=Config.PROFILE_SAMPLE_INTERVAL
+                )
+            else:
+                profiler = nullcontext()
+
+            try:
+                with profiler as profile_info, \
+                        tracing.trace(process_id, 'process', file_id=file_id, process_id=process_id,
+                                      engine=service, worker=self.worker_id):
+                    result = self.ocr_services.process(service, file_path,
+                                                       allow_fallback=payload.get('allow_fallback', False),
+                                                       journal=journal)
+            finally:
+                journal.close()
+
+            outcome = {
+                'status': 'success',
+                'service_used': result.get('service_used', service),
+                'fallback_reason': result.get('fallback_reason'),
+                'processing_time': round(time.time() - start_time, 2),
+                'result_bytes': result_store.store.put(process_id, results.page_entries(result)),
+                'confidence': result.get('confidence', 0.0),
+                'completed_at': datetime.utcnow().isoformat(),
+                'words_found': result.get('words_found', 0),
+                'pages_processed': result.get('pages_processed', 1),
+                'resumed_pages': result.get('resumed_pages', 0),
+                'page_states': journal.states()
+            }
+            journal.complete()
+            metrics.JOBS_TOTAL.inc(engine=outcome['service_used'], status='success')
+            logger.info("Job %s completed in %.2fs", process_id, outcome['processing_time'])
+
+        except Exception as e:
+            logger.exception("Job %s failed: %s", process_id, e)
+            outcome = {
+                'status': 'error',
+                'processing_time': round(time.time() - start_time, 2),
+                'error': str(e),
+                'error_type': type(e).__name__,
+                'completed_at': datetime.utcnow().isoformat()
+            }
+            if isinstance(e, CircuitOpenError):
+                outcome['breaker_state'] = 'open'
+            metrics.JOBS_TOTAL.inc(engine=service, status='error')
+        finally:
+            metrics.JOBS_IN_FLIGHT.dec()
+            if profile_info:
+                outcome['profile'] = {
+                    'mode': profile_mode,
+                    'duration': profile_info.get('duration'),
+                    'samples': profile_info.get('samples'),
+                    'download': f'/api/debug/profile/{process_id}'
+                }
+            outcome['trace'] = {
+                'trace_id': process_id,
+                'stages': tracing.tracer.summarize(process_id)
+            }
+            if not self.queue.finish(process_id, self.worker_id, outcome):
+                logger.warning("Job %s was reclaimed by another worker; dropping this result", process_id)
+
+
+def serve_metrics(port: int):
+    """Expose this worker's /metrics on a background thread"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', metrics.CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run OCR jobs from the shared queue')
+    parser.add_argument('--concurrency', type=int, default=Config.WORKER_CONCURRENCY,
+                        help='Jobs this worker runs at once')
+    parser.add_argument('--lanes', default=Config.WORKER_LANES, help='Comma-separated lanes to take jobs from')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+    args = parser.parse_args()
+
+    log_config.setup_logging(mode=Config.LOG_MODE, log_format=Config.LOG_FORMAT, level=Config.LOG_LEVEL)
+    tracing.configure(
+        mode=Config.TRACE_EXPORT,
+        path=Config.TRACE_FILE,
+        url=Config.TRACE_COLLECTOR_URL,
+        max_traces=Config.TRACE_MAX_TRACES
+    )
+    memory_budget.configure(
+        limit_mb=Config.RASTER_MEMORY_BUDGET_MB,
+        pages_in_flight=Config.RASTER_PAGES_IN_FLIGHT,
+        wait_timeout=Config.RASTER_MEMORY_WAIT_TIMEOUT
+    )
+    cpu_budget.configure(
+        cores=Config.CPU_BUDGET_CORES,
+        threads=Config.TESSERACT_THREADS,
+        processes=Config.TESSERACT_PROCESSES,
+        affinity=Config.CPU_AFFINITY
+    )
+    rasterizer.configure(
+        backend=Config.RASTER_BACKEND,
+        processes=Config.RASTER_PROCESSES,
+        fmt=Config.RASTER_FORMAT,
+        grayscale=Config.RASTER_GRAYSCALE
+    )
+    page_buffers.configure(
+        folder=Config.PAGE_BUFFER_FOLDER if Config.PAGE_BUFFERS else None,
+        limit_mb=Config.PAGE_BUFFER_MAX_MB
+    )
+    # Workers only write results, so they keep no memory tier
+    result_store.configure(folder=Config.RESULT_FOLDER)
+    if Config.FAKE_ENGINES:
+        from fake_engines import FakeOCRServices
+        ocr_services = FakeOCRServices(Config.FAKE_PAGE_LATENCY, Config.FAKE_ERROR_RATE)
+    else:
+        ocr_services = OCRServices()
+
+    worker = Worker(
+        shared_queue.open_queue(Config.QUEUE_BACKEND, Config.QUEUE_PATH, Config.JOB_MAX_ATTEMPTS),
+        ocr_services,
+        FileHandler(Config.UPLOAD_FOLDER),
+        CheckpointStore(Config.CHECKPOINT_FOLDER) if Config.CHECKPOINTS_ENABLED else None,
+        concurrency=args.concurrency,
+        lanes=[lane.strip() for lane in args.lanes.split(',') if lane.strip()],
+        weights=Config.get_lane_weights(),
+        lease_seconds=Config.WORKER_LEASE_SECONDS,
+        poll_seconds=Config.WORKER_POLL_SECONDS
+    )
+    autoscaler = Autoscaler('worker', worker, **Config.get_autoscale_options()).start() \
+        if Config.AUTOSCALE_ENABLED else None
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    def leave(signum, frame):
+        logger.info("Signal %s received; finishing running jobs before leaving", signum)
+        if autoscaler:
+            autoscaler.stop()
+        worker.stop()
+
+    signal.signal(signal.SIGINT, leave)
+    signal.signal(signal.SIGTERM, leave)
+
+    print(f"🔧 OCR worker {worker.worker_id}")
+    print(f"📬 Queue: {Config.QUEUE_BACKEND} {Config.QUEUE_PATH}, lanes: {', '.join(worker.lanes)}")
+    print(f"📁 Shared uploads: {os.path.abspath(Config.UPLOAD_FOLDER)}")
+    worker.run()
+    log_config.shutdown()
+
+
+if __name__ == '__main__':
+    main()